@@ -1,46 +1,104 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import time
-import json
 import os
-import threading
 import keyboard
-import mouse
-import random
 import pygetwindow as gw
-from PIL import ImageGrab, Image, ImageTk
-import numpy as np
+from PIL import Image, ImageTk
 import socket
 
+from poe_macro.appraisal import appraisal_classifier_path, load_appraisal_classifier
+from poe_macro.config import CONFIG_FILE, load_config, save_config
+from poe_macro.engine import MacroEngine
+from poe_macro.executor import ClickExecutor
+from poe_macro.geometry import canvas_cell
+from poe_macro.logger import get_logger, set_log_level
+from poe_macro.hotkeys import HotkeyDispatcher
+from poe_macro.layouts import DEFAULT_LAYOUT, layouts_config, load_layouts, next_layout
+from poe_macro.pacing import ClickPacer
+from poe_macro.pipeline import stream_cells
+from poe_macro.runner import MacroRunner, wait_for_game
+from poe_macro.timing import RunTimeline
+from poe_macro.uiqueue import UiUpdateQueue
+from poe_macro.thumbnail import ThumbnailCache
+from poe_macro.route import ROUTE_NEAREST, ROUTE_ROW, plan_route, travel_saving
+from poe_macro.reference import ReferenceStore
+from poe_macro.scrolls import ScrollStacks, StackCountReader, appraise_cells
+from poe_macro.tkui import AreaSelector, ask_hotkey
+from poe_macro.window import find_game_window
+
+log = get_logger("final")
+
+# 미리보기 셀 표시: 상태 -> (사각형 옵션, 좌표 텍스트 색)
+CELL_STYLES = {
+    'normal': ({'fill': '', 'stipple': '', 'outline': 'blue', 'width': 1}, 'white'),
+    'excluded': ({'fill': 'gray', 'stipple': 'gray50', 'outline': 'red', 'width': 1}, 'red'),
+    'scroll': ({'fill': 'yellow', 'stipple': 'gray50', 'outline': 'orange', 'width': 2}, 'black'),
+}
+
 class HardwareLevelDragMacro:
     def __init__(self):
         self.start_pos = None
         self.end_pos = None
-        self.grid_width = 12
+        self.grid_width = 12  # 현재 레이아웃의 그리드 크기 (레이아웃 전환 시 변경)
         self.grid_height = 5
+        self.layouts = {}  # 이름 -> LayoutProfile (인벤토리/일반 창고/쿼드 창고 등)
+        self.layout_name = DEFAULT_LAYOUT
         self.excluded_cells = []
-        self.config_file = "hardware_drag_macro_config.json"
+        self.config_file = CONFIG_FILE
         self.inventory_image_path = None
         self.initial_screenshot = None
+        self.reference = None  # 빈 인벤토리 기준 데이터 (PNG + 셀 통계, 지연 로드)
+        self._appraisal_classifier = None  # 미감정 아이템 판별기 (레이아웃별, 지연 로드)
+        self.screen_resolution = None
         self.macro_screenshot = None
+        self.timeline = RunTimeline()  # 최근 실행의 단계별 소요 시간
+        # 캡처/감지/클릭 엔진 (여러 셀 클릭은 전용 클릭 스레드에서 시각표대로 실행)
+        self.engine = MacroEngine(self.grid_width, self.grid_height, timeline=self.timeline,
+                                  executor=ClickExecutor())
         self.initial_tk_image = None
+        # 미리보기 캔버스 캐시 (축소 이미지, 셀 항목 ID)
+        self._preview_item = None
+        self._preview_source = None
+        self._preview_size = None
+        self._grid_key = None
+        self._cell_items = {}  # (x, y) -> (사각형 ID, 텍스트 ID)
+        self._cell_states = {}  # (x, y) -> 마지막으로 표시한 상태
+        self._canvas_cell_size = (0, 0)
+        self._scroll_label_item = None
+        self.thumbnails = None  # 미리보기 축소 캐시 (작업 스레드에서 축소, GUI 생성 시 만듦)
+        self.ui_updates = UiUpdateQueue()  # 작업 스레드 → UI 갱신 채널 (메인 루프가 주기적으로 처리)
         self.macro_tk_image = None
-        self.is_running = False
-        self.dragging = False
+        # 실행 스레드 관리 (실행마다 취소 토큰을 새로 만들고, 끝나면 UI 복원을 UI 스레드로 넘김)
+        self.runner = MacroRunner(schedule=self.ui_updates.post)
+        self.run_mode = None  # 마지막으로 시작한 매크로 ('inventory' 또는 'appraisal')
         self.similarity_threshold = 0  # 이미지 유사성 임계값 (낮을수록 더 엄격함)
         self.run_hotkey = "f6"  # 실행 단축키 기본값
         self.stop_hotkey = "f7"  # 중지 단축키 기본값
         self.appraisal_run_hotkey = "f1"  # 감정 주문서 실행 단축키 기본값
         self.appraisal_stop_hotkey = "f2"  # 감정 주문서 중지 단축키 기본값
         self.area_select_hotkey = "f3"
+        self.layout_hotkey = "f4"  # 레이아웃 전환 단축키 기본값
         self.registered_hotkeys = {}  # 등록된 단축키 추적을 위한 딕셔너리
-        self.polling_active = False
+        self.hotkeys = None  # 키보드 훅 기반 단축키 디스패처
+        self.area_selector = None  # 영역 선택 오버레이 (GUI 생성 시 만듦)
         self._click_delay_value = 0.1
         self._use_ctrl_click_value = True
         self._minimize_window_value = False
         self._detect_items_value = True
+        self._stream_detection_value = True
+        self._merge_items_value = True
+        self._verify_clicks_value = True
+        self._adaptive_pacing_value = True
+        self._skip_identified_value = False
+        self.pacer = ClickPacer()  # 클릭 타이밍 자동 조절 (세션 동안 학습 유지)
+        self.verify_retries = 2  # 클릭 후 아이템이 남은 셀 재시도 횟수
+        self.verify_settle_delay = 0.1  # 재확인 캡처 전 클라이언트 반영 대기 시간(초)
+        self.click_route = ROUTE_NEAREST  # 클릭 순서 결정 방식 (row/serpentine/nearest/exact)
+        self.last_route_saving = 0.0  # 마지막 실행에서 절약한 커서 이동 거리(px)
         self.appraisal_scroll_cell = None  # 감정 주문서 셀 위치
-        self.is_appraisal_running = False  # 감정 주문서 매크로 실행 상태
+        self.appraisal_spare_scroll_cells = []  # 첫 묶음이 비면 이어서 사용할 감정 주문서 묶음 셀
+        self._scroll_select_append = False  # 셀 선택 시 예비 묶음으로 추가할지 여부
+        self.stack_reader = StackCountReader()  # 주문서 수량 글자 견본 (세션 동안 학습 유지)
         
         # 기본 설정 로드
         self.load_config()
@@ -50,65 +108,182 @@ class HardwareLevelDragMacro:
         
     def load_config(self):
         """설정 파일 로드"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    self.start_pos = config.get('start_pos')
-                    self.end_pos = config.get('end_pos')
-                    self.excluded_cells = config.get('excluded_cells', [])
-                    self.inventory_image_path = config.get('inventory_image_path')
-                    self.similarity_threshold = config.get('similarity_threshold', 50)
-                    self.run_hotkey = config.get('run_hotkey', 'f6')
-                    self.stop_hotkey = config.get('stop_hotkey', 'f7')
-                    self.appraisal_run_hotkey = config.get('appraisal_run_hotkey', 'f1')
-                    self.appraisal_stop_hotkey = config.get('appraisal_stop_hotkey', 'f2')
-                    self.appraisal_scroll_cell = config.get('appraisal_scroll_cell')
-                    self.area_select_hotkey = config.get('area_select_hotkey', 'f3')
-                    self._click_delay_value = config.get('click_delay', 0.1)
-                    self._use_ctrl_click_value = config.get('use_ctrl_click', True)
-                    self._minimize_window_value = config.get('minimize_window', False)
-                    self._detect_items_value = config.get('detect_items', True)
-            except Exception as e:
-                print(f"설정 로드 오류: {e}")
+        config = load_config(self.config_file)
+        set_log_level(config.get('log_level', 'INFO'))  # DEBUG면 셀별 진단 로그 출력
+        # 영역/제외 셀/감정 주문서 셀/기준 이미지는 레이아웃별로 저장됨
+        self.layouts = load_layouts(config)
+        layout_name = config.get('active_layout', DEFAULT_LAYOUT)
+        self._load_layout(layout_name if layout_name in self.layouts else DEFAULT_LAYOUT)
+        self.similarity_threshold = config.get('similarity_threshold', 50)
+        self.run_hotkey = config.get('run_hotkey', 'f6')
+        self.stop_hotkey = config.get('stop_hotkey', 'f7')
+        self.appraisal_run_hotkey = config.get('appraisal_run_hotkey', 'f1')
+        self.appraisal_stop_hotkey = config.get('appraisal_stop_hotkey', 'f2')
+        self.area_select_hotkey = config.get('area_select_hotkey', 'f3')
+        self.layout_hotkey = config.get('layout_hotkey', 'f4')
+        self._click_delay_value = config.get('click_delay', 0.1)
+        self._use_ctrl_click_value = config.get('use_ctrl_click', True)
+        self._minimize_window_value = config.get('minimize_window', False)
+        self._detect_items_value = config.get('detect_items', True)
+        self._stream_detection_value = config.get('stream_detection', True)
+        self._merge_items_value = config.get('merge_items', True)
+        self._verify_clicks_value = config.get('verify_clicks', True)
+        self._adaptive_pacing_value = config.get('adaptive_pacing', True)
+        self._skip_identified_value = config.get('skip_identified', False)
+        self.verify_retries = config.get('verify_retries', 2)
+        self.verify_settle_delay = config.get('verify_settle_delay', 0.1)
+        self.click_route = config.get('click_route', ROUTE_NEAREST)
     
     def save_config(self):
         """설정 파일 저장"""
+        self._store_layout()
         config = {
-            'start_pos': self.start_pos,
-            'end_pos': self.end_pos,
-            'excluded_cells': self.excluded_cells,
-            'inventory_image_path': self.inventory_image_path,
+            'active_layout': self.layout_name,
             'similarity_threshold': self.similarity_threshold,
             'run_hotkey': self.run_hotkey,
             'stop_hotkey': self.stop_hotkey,
             'appraisal_run_hotkey': self.appraisal_run_hotkey,
             'appraisal_stop_hotkey': self.appraisal_stop_hotkey,
-            'appraisal_scroll_cell': self.appraisal_scroll_cell,
             'area_select_hotkey': self.area_select_hotkey,
+            'layout_hotkey': self.layout_hotkey,
             'click_delay': float(self.click_delay.get()),
             'use_ctrl_click': bool(self.use_ctrl_click.get()),
             'minimize_window': bool(self.minimize_window.get()),
-            'detect_items': bool(self.detect_items.get())
+            'detect_items': bool(self.detect_items.get()),
+            'stream_detection': bool(self.stream_detection.get()),
+            'merge_items': bool(self.merge_items.get()),
+            'verify_clicks': bool(self.verify_clicks.get()),
+            'adaptive_pacing': bool(self.adaptive_pacing.get()),
+            'skip_identified': bool(self.skip_identified.get()),
+            'verify_retries': self.verify_retries,
+            'verify_settle_delay': self.verify_settle_delay,
+            'click_route': self.click_route
         }
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-        except Exception as e:
-            print(f"설정 저장 오류: {e}")
+        config.update(layouts_config(self.layouts))
+        save_config(self.config_file, config)
+
+    def _load_layout(self, name):
+        """레이아웃 설정을 현재 작업 값으로 불러옴"""
+        layout = self.layouts[name]
+        self.layout_name = name
+        self.grid_width = layout.grid_width
+        self.grid_height = layout.grid_height
+        self.start_pos = layout.start_pos
+        self.end_pos = layout.end_pos
+        self.excluded_cells = list(layout.excluded_cells)
+        self.inventory_image_path = layout.inventory_image_path
+        self.appraisal_scroll_cell = layout.appraisal_scroll_cell
+        self.appraisal_spare_scroll_cells = list(layout.appraisal_spare_scroll_cells)
+        self.engine.set_grid(self.grid_width, self.grid_height)
+
+    def _store_layout(self):
+        """현재 작업 값을 활성 레이아웃에 반영"""
+        layout = self.layouts[self.layout_name]
+        layout.start_pos = tuple(self.start_pos) if self.start_pos else None
+        layout.end_pos = tuple(self.end_pos) if self.end_pos else None
+        layout.excluded_cells = list(self.excluded_cells)
+        layout.inventory_image_path = self.inventory_image_path
+        layout.appraisal_scroll_cell = self.appraisal_scroll_cell
+        layout.appraisal_spare_scroll_cells = list(self.appraisal_spare_scroll_cells)
+
+    @property
+    def appraisal_scroll_cells(self):
+        """사용할 순서대로 감정 주문서 묶음 셀 (첫 셀 + 예비 묶음)"""
+        if not self.appraisal_scroll_cell:
+            return []
+        cells = [tuple(self.appraisal_scroll_cell)]
+        for cell in self.appraisal_spare_scroll_cells:
+            if tuple(cell) not in cells:
+                cells.append(tuple(cell))
+        return cells
+
+    def _scroll_cells_text(self):
+        """감정 주문서 셀 표시 문자열 (예비 묶음은 개수만)"""
+        cells = self.appraisal_scroll_cells
+        if not cells:
+            return "미설정"
+        return str(cells[0]) + (f" +{len(cells) - 1}" if len(cells) > 1 else "")
+
+    def switch_layout(self, name=None):
+        """
+        레이아웃 전환 (영역, 그리드 크기, 제외 셀, 기준 데이터를 함께 바꿈)
+
+        :param name: 레이아웃 이름 (없으면 다음 레이아웃, 단축키용)
+        """
+        if self.is_running or self.is_appraisal_running:
+            log.info("매크로 실행 중에는 레이아웃을 바꿀 수 없습니다.")
+            return
+        if name is None:
+            name = next_layout(self.layouts, self.layout_name)
+
+        self._store_layout()
+        self._load_layout(name)
+        layout = self.layouts[name]
+
+        # 기준 데이터와 감정 판별기는 처음 필요할 때 로드
+        self.initial_screenshot = None
+        self.reference = self.create_reference_store()
+        self._appraisal_classifier = None
+
+        self.layout_var.set(layout.label)
+        self.start_pos_label.config(text=str(self.start_pos) if self.start_pos else "미설정")
+        self.end_pos_label.config(text=str(self.end_pos) if self.end_pos else "미설정")
+        self.update_excluded_text()
+        self.appraisal_cell_label.config(text=self._scroll_cells_text())
+        self._reset_canvas()
+        self.status_label.config(text=f"레이아웃: {layout.label} ({self.grid_width}x{self.grid_height})")
+        log.info(f"레이아웃 전환: {layout.label} ({self.grid_width}x{self.grid_height})")
+
+        self.save_config()
+        self.update_canvas()
             
     def create_gui(self):
         """GUI 생성"""
         self.root = tk.Tk()
         self.root.title("Path of Exile 인벤 매크로")
-        self.root.geometry("300x680")  # 창 너비를 400으로 고정
+        self.root.geometry("300x800")  # 창 너비를 400으로 고정
         self.root.resizable(False, False)  # 창 크기 조절 비활성화
         
+        # 작업 스레드의 UI 변경은 큐에 모았다가 메인 루프에서 한꺼번에 처리
+        self.ui_updates.start(self.root.after, self.root.after_cancel)
+        
+        # 영역 선택 오버레이 (게임 창에 포커스가 있어도 ESC로 취소)
+        self.area_selector = AreaSelector(self.root, self.on_area_selected, self.on_selection_cancel,
+                                          global_esc=True, schedule=self.ui_updates.post)
+        
+        # 미리보기 축소는 작업 스레드에서, PhotoImage 생성은 Tk 메인 스레드에서
+        self.thumbnails = ThumbnailCache(schedule=self.ui_updates.post, convert=ImageTk.PhotoImage)
+        
         # 여기서 Tkinter 변수 초기화
         self.click_delay = tk.DoubleVar(value=self._click_delay_value)
         self.use_ctrl_click = tk.BooleanVar(value=True)  # 항상 True로 고정
         self.minimize_window = tk.BooleanVar(value=self._minimize_window_value)
         self.detect_items = tk.BooleanVar(value=self._detect_items_value)
+        self.stream_detection = tk.BooleanVar(value=self._stream_detection_value)
+        self.merge_items = tk.BooleanVar(value=self._merge_items_value)
+        self.verify_clicks = tk.BooleanVar(value=self._verify_clicks_value)
+        self.adaptive_pacing = tk.BooleanVar(value=self._adaptive_pacing_value)
+        self.skip_identified = tk.BooleanVar(value=self._skip_identified_value)
+        
+        # 저장된 빈 인벤토리 기준 데이터 연결 (실제 로드는 처음 필요할 때)
+        self.screen_resolution = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.reference = self.create_reference_store()
+        
+        # 레이아웃 선택 프레임 (인벤토리/일반 창고/쿼드 창고)
+        layout_frame = tk.Frame(self.root)
+        layout_frame.pack(fill=tk.X, padx=5, pady=3)
+        tk.Label(layout_frame, text="레이아웃:").pack(side=tk.LEFT, padx=5)
+        layout_names = {layout.label: name for name, layout in self.layouts.items()}
+        self.layout_var = tk.StringVar(value=self.layouts[self.layout_name].label)
+        tk.OptionMenu(layout_frame, self.layout_var, *layout_names,
+                      command=lambda label: self.switch_layout(layout_names[label])).pack(side=tk.LEFT)
+        
+        layout_hotkey_frame = tk.Frame(layout_frame)
+        layout_hotkey_frame.pack(side=tk.RIGHT, padx=5)
+        self.layout_hotkey_label = tk.Label(layout_hotkey_frame, text=self.layout_hotkey.upper(), width=3,
+                                relief=tk.SUNKEN, bg="white", padx=2)
+        self.layout_hotkey_label.pack(side=tk.LEFT, padx=2)
+        tk.Button(layout_hotkey_frame, text="변경", command=lambda: self.set_hotkey("layout"), padx=2).pack(side=tk.LEFT)
         
         # 인벤토리 이미지 선택 프레임
         image_select_frame = tk.Frame(self.root)
@@ -189,6 +364,21 @@ class HardwareLevelDragMacro:
         tk.Checkbutton(click_settings_frame, text="아이템 감지", 
                     variable=self.detect_items, command=self.save_config).grid(row=1, column=1, sticky=tk.W, columnspan=2)
         
+        # 세 번째 행: 감지와 클릭 동시 진행
+        tk.Checkbutton(click_settings_frame, text="감지 중 클릭", 
+                    variable=self.stream_detection, command=self.save_config).grid(row=2, column=0, sticky=tk.W, columnspan=2)
+        
+        tk.Checkbutton(click_settings_frame, text="클릭 후 확인", 
+                    variable=self.verify_clicks, command=self.save_config).grid(row=2, column=1, sticky=tk.W, columnspan=2)
+        
+        # 네 번째 행: 클릭 속도 자동 조절
+        tk.Checkbutton(click_settings_frame, text="클릭 속도 자동 조절", 
+                    variable=self.adaptive_pacing, command=self.save_config).grid(row=3, column=0, sticky=tk.W, columnspan=2)
+        
+        # 여러 칸 아이템은 한 번만 클릭 (격자선이 가려진 셀을 한 아이템으로 묶음)
+        tk.Checkbutton(click_settings_frame, text="큰 아이템 한 번만 클릭", 
+                    variable=self.merge_items, command=self.save_config).grid(row=3, column=1, sticky=tk.W, columnspan=2)
+        
     # 제외할 셀 프레임
         excluded_frame = tk.Frame(common_settings_frame)
         excluded_frame.pack(fill=tk.X, pady=2)
@@ -204,6 +394,12 @@ class HardwareLevelDragMacro:
         # 제외할 셀 두 번째 행: 초기화 버튼
         tk.Button(excluded_frame, text="목록 초기화", command=self.clear_excluded).grid(row=2, column=0, sticky=tk.W, padx=5, pady=3)
         
+        # 실행 기록 프레임: 마지막 실행 단계별 소요 시간 보기/내보내기
+        timeline_frame = tk.Frame(common_settings_frame)
+        timeline_frame.pack(fill=tk.X, pady=2)
+        tk.Button(timeline_frame, text="마지막 실행 분석", command=self.show_last_run).pack(side=tk.LEFT, padx=5)
+        tk.Button(timeline_frame, text="기록 내보내기", command=self.export_timeline).pack(side=tk.LEFT)
+        
         # 인벤 정리 설정 프레임
         inventory_frame = tk.LabelFrame(self.root, text="인벤 정리 설정", padx=5, pady=5)
         inventory_frame.pack(fill=tk.X, padx=10, pady=3)
@@ -234,13 +430,31 @@ class HardwareLevelDragMacro:
         tk.Label(appraisal_cell_frame, text="감정 주문서 셀:").pack(side=tk.LEFT, padx=5)
         
         # 감정 주문서 셀 표시
-        self.appraisal_cell_label = tk.Label(appraisal_cell_frame, 
-                                      text=str(self.appraisal_scroll_cell) if self.appraisal_scroll_cell else "미설정",
-                                      width=8, relief=tk.SUNKEN, bg="white", padx=5)
+        self.appraisal_cell_label = tk.Label(appraisal_cell_frame, text=self._scroll_cells_text(),
+                                      width=12, relief=tk.SUNKEN, bg="white", padx=5)
         self.appraisal_cell_label.pack(side=tk.LEFT, padx=5)
         
         # 감정 주문서 셀 설정 버튼
         tk.Button(appraisal_cell_frame, text="설정", command=self.set_appraisal_scroll_cell).pack(side=tk.LEFT)
+        # 예비 묶음 추가/삭제 (첫 묶음이 비면 순서대로 이어서 사용)
+        tk.Button(appraisal_cell_frame, text="추가",
+                  command=lambda: self.set_appraisal_scroll_cell(append=True)).pack(side=tk.LEFT, padx=2)
+        tk.Button(appraisal_cell_frame, text="비우기",
+                  command=self.clear_spare_scroll_cells).pack(side=tk.LEFT)
+        
+        # 감정된 아이템 건너뛰기 (미감정/감정됨 아이템을 각각 인벤토리에 넣고 학습)
+        skip_frame = tk.Frame(appraisal_frame)
+        skip_frame.pack(fill=tk.X, pady=2)
+        tk.Checkbutton(skip_frame, text="감정된 아이템 건너뛰기", variable=self.skip_identified,
+                       command=self.save_config).pack(side=tk.LEFT)
+        
+        learn_frame = tk.Frame(appraisal_frame)
+        learn_frame.pack(fill=tk.X, pady=2)
+        tk.Button(learn_frame, text="미감정 학습",
+                  command=lambda: self.learn_appraisal(True)).pack(side=tk.LEFT, padx=5)
+        tk.Button(learn_frame, text="감정됨 학습",
+                  command=lambda: self.learn_appraisal(False)).pack(side=tk.LEFT)
+        tk.Button(learn_frame, text="초기화", command=self.clear_appraisal_learning).pack(side=tk.LEFT, padx=5)
         
         # 감정 주문서 단축키 프레임
         appraisal_hotkey_frame = tk.Frame(appraisal_frame)
@@ -263,9 +477,11 @@ class HardwareLevelDragMacro:
                                     command=self.toggle_appraisal_macro)
         self.appraisal_run_btn.pack(side=tk.LEFT, padx=5)
         
-        # 단축키 등록
-        #self.register_hotkeys()
-        self.start_hotkey_polling()  # 폴링 방식으로 대체
+        # 단축키 등록 (키보드 훅 이벤트 기반)
+        self.start_hotkey_listener()
+        
+        # 저장된 빈 인벤토리 미리보기 표시
+        self.root.after(100, self.update_canvas)
         
         # 종료 시 정리 작업 설정
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -273,6 +489,104 @@ class HardwareLevelDragMacro:
         # GUI 이벤트 루프 시작 (필수!)
         self.root.mainloop()
         
+    def create_reference_store(self):
+        """현재 영역/해상도에 맞는 빈 인벤토리 기준 데이터 저장소 생성"""
+        if not self.start_pos or not self.end_pos:
+            return None
+        image_path = self.inventory_image_path
+        if image_path and not os.path.exists(image_path):
+            image_path = None
+        return ReferenceStore(
+            self.config_file, self.start_pos, self.end_pos, self.screen_resolution,
+            self.grid_width, self.grid_height, image_path=image_path,
+            layout=self.layouts[self.layout_name].reference_key
+        )
+
+    def get_reference_profile(self):
+        """감지용 빈 인벤토리 셀 통계 (없으면 None)"""
+        if self.reference is None:
+            return None
+        return self.reference.profile
+
+    def _detect_cells(self, reference_profile, screenshot, active, cell_width, cell_height, start=None,
+                      stream=False, merge_items=False):
+        """
+        아이템이 있는 셀을 클릭 순서대로 반환 (감지 중 클릭 모드면 별도 스레드에서 감지하며 전달)
+        
+        :param active: 클릭 대상 셀 마스크 (그리드 계획에서 제외 셀을 뺀 것)
+        :param start: 시작 커서 위치 (캡처 영역 기준 픽셀)
+        :param stream: 감지 중 클릭 모드 여부
+        :param merge_items: 여러 칸 아이템은 왼쪽 위 셀 하나만 반환
+        """
+        def detect(**kwargs):
+            if merge_items:
+                return reference_profile.iter_items(screenshot, active=active, footprints=footprints, **kwargs)
+            return reference_profile.iter_occupied(screenshot, active=active, **kwargs)
+        
+        footprints = {}
+        if stream:
+            # 전체 결과를 기다리지 않으므로 행 단위로 정할 수 있는 지그재그 순서 사용
+            cells = detect(serpentine=self.click_route != ROUTE_ROW)
+            return stream_cells(self.timeline.wrap_iter('detection', cells))
+        
+        with self.timeline.span('detection'):
+            cells = list(detect())
+        merged = sum(w * h for w, h in footprints.values()) - len(footprints)
+        if merged:
+            large = {cell: f"{w}x{h}" for cell, (w, h) in footprints.items() if w * h > 1}
+            log.info(f"여러 칸 아이템 {len(large)}개 ({merged}개 셀 클릭 생략): {large}")
+        log.info(f"총 {len(cells)}개 셀에서 아이템 감지됨: {cells}")
+        self._post_status(f"아이템 감지: {len(cells)}개 셀")
+        try:
+            with self.timeline.span('route', cells=len(cells)):
+                return plan_route(cells, self.click_route, cell_width, cell_height, start)
+        except ValueError as e:
+            log.error(f"클릭 순서 계산 오류: {e}")
+            return cells
+
+    def _report_route(self, clicked_cells, cell_width, cell_height, start=None):
+        """행 우선 순서 대비 절약한 커서 이동 거리 출력"""
+        baseline, planned = travel_saving(clicked_cells, cell_width, cell_height, start)
+        self.last_route_saving = baseline - planned
+        log.info(f"클릭 경로: {baseline:.0f}px → {planned:.0f}px ({baseline - planned:.0f}px 절약)")
+
+    @property
+    def is_running(self):
+        """인벤 정리 매크로 실행 상태 (중지 요청 후에는 False)"""
+        return self.runner.running and self.run_mode == 'inventory'
+
+    @property
+    def is_appraisal_running(self):
+        """감정 주문서 매크로 실행 상태 (중지 요청 후에는 False)"""
+        return self.runner.running and self.run_mode == 'appraisal'
+
+    @property
+    def last_stop_latency(self):
+        """마지막 중지 요청부터 정지까지 걸린 시간(초)"""
+        return self.runner.last_stop_latency
+
+    def _post_status(self, text):
+        """작업 스레드에서 상태 표시줄 변경 (다음 UI 갱신 때 마지막 텍스트만 반영)"""
+        self.ui_updates.post(lambda: self.status_label.config(text=text), key='status')
+
+    def _run_settings(self):
+        """실행 시작 시점의 설정 값 (작업 스레드가 Tk 변수를 직접 읽지 않도록 메인 스레드에서 읽음)"""
+        preview_size = None
+        if self.macro_canvas.winfo_ismapped():
+            preview_size = (self.macro_canvas.winfo_width(), self.macro_canvas.winfo_height())
+        return {
+            'delay': self.click_delay.get(),
+            'use_ctrl': self.use_ctrl_click.get(),
+            'minimize': self.minimize_window.get(),
+            'detect_items': self.detect_items.get(),
+            'stream': self.stream_detection.get(),
+            'merge_items': self.merge_items.get(),
+            'verify': self.verify_clicks.get(),
+            'adaptive': self.adaptive_pacing.get(),
+            'skip_identified': self.skip_identified.get(),
+            'preview_size': preview_size,
+        }
+
     def toggle_macro(self):
         """인벤 정리 매크로 토글"""
         if self.is_running:
@@ -287,12 +601,37 @@ class HardwareLevelDragMacro:
         else:
             self.run_appraisal_macro()
         
+    def show_last_run(self):
+        """마지막 실행의 단계별 소요 시간 표시"""
+        text = self.timeline.format_breakdown()
+        log.info(text)
+        messagebox.showinfo("마지막 실행 분석", text)
+
+    def export_timeline(self):
+        """최근 실행 기록을 Chrome 추적(.json) 또는 JSON Lines(.jsonl) 파일로 저장"""
+        path = filedialog.asksaveasfilename(
+            title="실행 기록 내보내기",
+            defaultextension=".json",
+            filetypes=[("Chrome 추적", "*.json"), ("JSON Lines", "*.jsonl")]
+        )
+        if not path:
+            return
+        try:
+            if path.endswith(".jsonl"):
+                self.timeline.export_jsonl(path)
+            else:
+                self.timeline.export_chrome_trace(path)
+            self.status_label.config(text=f"실행 기록 저장: {os.path.basename(path)}")
+        except Exception as e:
+            log.error(f"실행 기록 저장 오류: {e}")
+            messagebox.showerror("오류", f"실행 기록 저장 중 오류 발생: {e}")
+
     def clear_excluded(self):
         """제외 목록 초기화"""
         self.excluded_cells = []
         self.excluded_label.config(text="[]")
         self.save_config()
-        self.update_canvas()
+        self.update_cells()
         
     # excluded_label 텍스트 업데이트 메서드 추가
     def update_excluded_text(self):
@@ -302,172 +641,35 @@ class HardwareLevelDragMacro:
             cells_str = cells_str[:32] + "..."
         self.excluded_label.config(text=cells_str)
 
-    # 기존 on_canvas_click 메서드 수정 (말줄임표 표시 지원)
-    def on_canvas_click(self, event):
-        """캔버스 클릭 처리 (셀 선택/해제)"""
-        if not self.start_pos or not self.end_pos:
-            return
-        
-        try:
-            # 캔버스 크기
-            canvas_width = self.initial_canvas.winfo_width()
-            canvas_height = self.initial_canvas.winfo_height()
-            
-            # 스크린샷 크기
-            img_width = self.end_pos[0] - self.start_pos[0]
-            img_height = self.end_pos[1] - self.start_pos[1]
-            
-            # 비율 계산
-            scale = min(canvas_width / img_width, canvas_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            # 셀 크기
-            cell_width = new_width / self.grid_width
-            cell_height = new_height / self.grid_height
-            
-            # 클릭한 셀 계산
-            cell_x = int(event.x / cell_width)
-            cell_y = int(event.y / cell_height)
-            
-            # 유효한 셀인지 확인
-            if 0 <= cell_x < self.grid_width and 0 <= cell_y < self.grid_height:
-                # 셀 상태 토글
-                cell = (cell_x, cell_y)
-                if cell in self.excluded_cells:
-                    self.excluded_cells.remove(cell)
-                else:
-                    self.excluded_cells.append(cell)
-                
-                # 표시 업데이트 (말줄임표 처리)
-                self.update_excluded_text()
-                self.save_config()
-                self.update_canvas()
-        except Exception as e:
-            print(f"캔버스 클릭 처리 오류: {e}")
-
-    def set_appraisal_scroll_cell(self):
-        """감정 주문서 셀 설정"""
-        if not self.initial_canvas.winfo_ismapped():
-            messagebox.showwarning("경고", "인벤토리 영역을 먼저 선택해주세요.")
-            return
-            
-        # 상태 메시지 변경
-        self.status_label.config(text="감정 주문서가 있는 셀을 클릭하세요...")
+    def start_hotkey_listener(self):
+        """단축키 디스패처 시작 (키 입력 시에만 동작, 폴링 없음)"""
+        # 동작은 Tk 메인 스레드에서 바로 실행 (훅 스레드에서 Tk 위젯 호출 없음, 갱신 큐를 거치지 않음)
+        self.hotkeys = HotkeyDispatcher(schedule=self.ui_updates.post)
+        
+        # 단축키 표: (이름, 키, 동작)
+        for name, key, action in (
+            ("run", self.run_hotkey, self.toggle_macro),
+            ("appraisal_run", self.appraisal_run_hotkey, self.toggle_appraisal_macro),
+            ("area_select", self.area_select_hotkey, self.select_area),
+            ("layout", self.layout_hotkey, self.switch_layout),
+        ):
+            self.hotkeys.register(name, key, action)
         
-        # 감정 주문서 셀 선택 모드 활성화
-        self.initial_canvas.bind("<Button-1>", self.on_appraisal_cell_select)
-        
-    def on_appraisal_cell_select(self, event):
-        """감정 주문서 셀 선택 처리"""
         try:
-            # 캔버스 크기
-            canvas_width = self.initial_canvas.winfo_width()
-            canvas_height = self.initial_canvas.winfo_height()
-            
-            # 스크린샷 크기
-            img_width = self.end_pos[0] - self.start_pos[0]
-            img_height = self.end_pos[1] - self.start_pos[1]
-            
-            # 비율 계산
-            scale = min(canvas_width / img_width, canvas_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            # 셀 크기
-            cell_width = new_width / self.grid_width
-            cell_height = new_height / self.grid_height
-            
-            # 클릭한 셀 계산
-            cell_x = int(event.x / cell_width)
-            cell_y = int(event.y / cell_height)
-            
-            # 유효한 셀인지 확인
-            if 0 <= cell_x < self.grid_width and 0 <= cell_y < self.grid_height:
-                # 감정 주문서 셀 설정
-                self.appraisal_scroll_cell = (cell_x, cell_y)
-                self.appraisal_cell_label.config(text=str(self.appraisal_scroll_cell))
-                
-                # 상태 메시지 업데이트
-                self.status_label.config(text=f"감정 주문서 셀이 {self.appraisal_scroll_cell}으로 설정되었습니다.")
-                
-                # 설정 저장
-                self.save_config()
-                
-                # 캔버스 업데이트
-                self.update_canvas()
-                
-                # 일반 셀 선택 모드로 복귀
-                self.initial_canvas.bind("<Button-1>", self.on_canvas_click)
+            self.hotkeys.start()
+            log.info(f"단축키 등록: 인벤 토글={self.run_hotkey}, 감정 토글={self.appraisal_run_hotkey}, "
+                     f"영역 선택={self.area_select_hotkey}, 레이아웃 전환={self.layout_hotkey}")
         except Exception as e:
-            print(f"감정 주문서 셀 선택 오류: {e}")
-            self.status_label.config(text="감정 주문서 셀 선택 오류")
-            
-    def start_hotkey_polling(self):
-        """폴링 방식으로 단축키 체크 시작"""
-        self.polling_active = True
-        threading.Thread(target=self._polling_thread, daemon=True).start()
-        print("단축키 폴링 시작됨")
+            log.error(f"단축키 훅 등록 오류: {e}")
 
-    def stop_hotkey_polling(self):
-        """폴링 방식 단축키 체크 중지"""
-        self.polling_active = False
-        print("단축키 폴링 중지됨")
-
-    def _polling_thread(self):
-        """단축키 폴링 스레드"""
-        print(f"단축키 폴링 스레드 시작: 인벤 토글={self.run_hotkey}, 감정 토글={self.appraisal_run_hotkey}")
-        last_run_pressed = False
-        last_appraisal_pressed = False
-        last_area_select_pressed = False
-        
-        while self.polling_active:
-            try:
-                # 인벤 정리 토글 단축키 체크
-                current_run_pressed = keyboard.is_pressed(self.run_hotkey)
-                if current_run_pressed and not last_run_pressed:
-                    print(f"{self.run_hotkey} 단축키 감지!")
-                    # 현재 상태에 따라 실행 또는 중지
-                    if self.is_running:
-                        self.root.after(10, self.stop_macro)
-                    else:
-                        self.root.after(10, self.run_macro)
-                last_run_pressed = current_run_pressed
-                
-                # 감정 주문서 토글 단축키 체크
-                current_appraisal_pressed = keyboard.is_pressed(self.appraisal_run_hotkey)
-                if current_appraisal_pressed and not last_appraisal_pressed:
-                    print(f"{self.appraisal_run_hotkey} 단축키 감지!")
-                    # 현재 상태에 따라 실행 또는 중지
-                    if self.is_appraisal_running:
-                        self.root.after(10, self.stop_appraisal_macro)
-                    else:
-                        self.root.after(10, self.run_appraisal_macro)
-                last_appraisal_pressed = current_appraisal_pressed
-                
-                current_area_select_pressed = keyboard.is_pressed(self.area_select_hotkey)
-                if current_area_select_pressed and not last_area_select_pressed:
-                    print(f"{self.area_select_hotkey} 단축키 감지!")
-                    self.root.after(10, self.select_area)
-                last_area_select_pressed = current_area_select_pressed
-                
-                time.sleep(0.05)
-            except Exception as e:
-                print(f"폴링 오류: {e}")
-                time.sleep(0.5)
-                
-        print("단축키 폴링 스레드 종료")
+    def stop_hotkey_listener(self):
+        """단축키 디스패처 중지"""
+        if self.hotkeys is not None:
+            self.hotkeys.stop()
+            log.info("단축키 훅 해제됨")
 
     def set_hotkey(self, hotkey_type):
         """단축키 설정"""
-        # 단축키 설정 창 생성
-        dialog = tk.Toplevel(self.root)
-        dialog.title("단축키 설정")
-        dialog.geometry("300x150")
-        dialog.resizable(False, False)
-        dialog.transient(self.root)
-        dialog.grab_set()
-        
         # 안내 메시지
         if hotkey_type == "run":
             message = "실행 단축키로 사용할 키를 누르세요"
@@ -479,92 +681,42 @@ class HardwareLevelDragMacro:
             message = "감정 주문서 중지 단축키로 사용할 키를 누르세요"
         elif hotkey_type == "area_select":
             message = "영역 선택 단축키로 사용할 키를 누르세요"
-            
-        tk.Label(dialog, text=message, pady=10).pack()
-        
-        # 선택된 키 표시
-        key_label = tk.Label(dialog, text="", font=("Arial", 14))
-        key_label.pack(pady=10)
-        
-        # 키 입력 이벤트 처리
-        def on_key_press(event):
-            # 특수 키 매핑
-            key_mapping = {
-                "Return": "enter",
-                "Escape": "esc",
-                "Delete": "delete",
-                "BackSpace": "backspace",
-                "Tab": "tab",
-                "space": "space",
-                "F1": "f1", "F2": "f2", "F3": "f3", "F4": "f4", "F5": "f5",
-                "F6": "f6", "F7": "f7", "F8": "f8", "F9": "f9", "F10": "f10",
-                "F11": "f11", "F12": "f12"
-            }
-            
-            key = event.keysym
-            
-            # 특수 키 변환
-            if key in key_mapping:
-                key = key_mapping[key]
-            else:
-                # 일반 키는 소문자로 변환
-                key = key.lower()
+        elif hotkey_type == "layout":
+            message = "레이아웃 전환 단축키로 사용할 키를 누르세요"
+        
+        def confirm(key):
+            if hotkey_type == "run":
+                self.run_hotkey = key
+                self.run_hotkey_label.config(text=key.upper())
+            elif hotkey_type == "stop":
+                self.stop_hotkey = key
+                self.stop_hotkey_label.config(text=key.upper())
+            elif hotkey_type == "appraisal_run":
+                self.appraisal_run_hotkey = key
+                self.appraisal_run_hotkey_label.config(text=key.upper())
+            elif hotkey_type ==  "appraisal_stop":
+                self.appraisal_stop_hotkey = key
+                self.appraisal_stop_hotkey_label.config(text=key.upper())
+            elif hotkey_type == "area_select":
+                self.area_select_hotkey = key
+                self.area_select_hotkey_label.config(text=key.upper())
+            elif hotkey_type == "layout":
+                self.layout_hotkey = key
+                self.layout_hotkey_label.config(text=key.upper())
+            
+            # 디스패처에 새 키 반영
+            if self.hotkeys is not None and hotkey_type in ("run", "appraisal_run", "area_select", "layout"):
+                self.hotkeys.set_key(hotkey_type, key)
                 
-            key_label.config(text=key)
+            # 단축키 저장 및 적용
+            self.save_config()
             
-            # 확인 버튼 활성화
-            confirm_button.config(state=tk.NORMAL)
-            
-            # 선택된 키 저장
-            dialog.selected_key = key
-        
-        dialog.selected_key = None
-        dialog.bind("<KeyPress>", on_key_press)
-        
-        # 확인 버튼
-        def confirm():
-            if dialog.selected_key:
-                if hotkey_type == "run":
-                    self.run_hotkey = dialog.selected_key
-                    self.run_hotkey_label.config(text=dialog.selected_key.upper())
-                elif hotkey_type == "stop":
-                    self.stop_hotkey = dialog.selected_key
-                    self.stop_hotkey_label.config(text=dialog.selected_key.upper())
-                elif hotkey_type == "appraisal_run":
-                    self.appraisal_run_hotkey = dialog.selected_key
-                    self.appraisal_run_hotkey_label.config(text=dialog.selected_key.upper())
-                elif hotkey_type ==  "appraisal_stop":
-                    self.appraisal_stop_hotkey = dialog.selected_key
-                    self.appraisal_stop_hotkey_label.config(text=dialog.selected_key.upper())
-                elif hotkey_type == "area_select":
-                    self.area_select_hotkey = dialog.selected_key
-                    self.area_select_hotkey_label.config(text=dialog.selected_key.upper())
-                    
-                # 단축키 저장 및 적용
-                self.save_config()
-                
-                # 버튼 텍스트 업데이트
-                self.run_btn.config(text=f"매크로 실행 ({self.run_hotkey.upper()})")
-                self.stop_btn.config(text=f"매크로 중지 ({self.stop_hotkey.upper()})")
-                self.appraisal_run_btn.config(text=f"감정 매크로 실행 ({self.appraisal_run_hotkey.upper()})")
-                self.appraisal_stop_btn.config(text=f"감정 매크로 중지 ({self.appraisal_stop_hotkey.upper()})")
-                dialog.destroy()
-        
-        # 취소 버튼
-        def cancel():
-            dialog.destroy()
+            # 버튼 텍스트 업데이트
+            # (중지 버튼은 토글 버튼으로 합쳐졌으므로 실행 버튼만 갱신)
+            self.run_btn.config(text=f"인벤 정리 실행/중지 ({self.run_hotkey.upper()})")
+            self.appraisal_run_btn.config(text=f"감정 주문 실행/중지 ({self.appraisal_run_hotkey.upper()})")
         
-        # 버튼 프레임
-        button_frame = tk.Frame(dialog)
-        button_frame.pack(side=tk.BOTTOM, pady=10)
-        
-        confirm_button = tk.Button(button_frame, text="확인", command=confirm, state=tk.DISABLED)
-        confirm_button.pack(side=tk.LEFT, padx=10)
-        
-        tk.Button(button_frame, text="취소", command=cancel).pack(side=tk.LEFT)
-        
-        # 창에 포커스
-        dialog.focus_force()
+        ask_hotkey(self.root, message, confirm)
  
     def register_hotkeys(self):
         """단축키 등록"""
@@ -580,9 +732,9 @@ class HardwareLevelDragMacro:
                 'run': self.run_hotkey,
                 'stop': self.stop_hotkey
             }
-            print(f"단축키 등록 완료: 실행={self.run_hotkey}, 중지={self.stop_hotkey}")
+            log.info(f"단축키 등록 완료: 실행={self.run_hotkey}, 중지={self.stop_hotkey}")
         except Exception as e:
-            print(f"단축키 등록 오류: {e}")
+            log.error(f"단축키 등록 오류: {e}")
     
     def unregister_hotkeys(self):
         """단축키 해제"""
@@ -592,179 +744,55 @@ class HardwareLevelDragMacro:
                 keyboard.remove_hotkey(self.registered_hotkeys['run'])
             if 'stop' in self.registered_hotkeys:
                 keyboard.remove_hotkey(self.registered_hotkeys['stop'])
-            print("단축키 해제됨")
+            log.info("단축키 해제됨")
         except Exception as e:
-            print(f"단축키 해제 오류: {e}")
+            log.error(f"단축키 해제 오류: {e}")
             
     def on_close(self):
         """프로그램 종료 시 처리"""
+        # 실행 중인 매크로 중지
+        self.runner.stop()
         # 단축키 정리
         self.unregister_hotkeys()
-        self.stop_hotkey_polling()
+        self.stop_hotkey_listener()
+        # 캡처/미리보기 리소스 해제
+        self.engine.close()
+        self.thumbnails.close()
+        self.ui_updates.stop()
         # 창 종료
         self.root.destroy()
     
     def select_area(self):
         """영역 선택 모드 시작"""
-        # 이미 영역 선택 창이 열려 있는지 확인
-        if hasattr(self, 'overlay') and self.overlay.winfo_exists():
-            print("이미 영역 선택 창이 열려 있습니다.")
+        if self.area_selector.is_open:
+            log.info("이미 영역 선택 창이 열려 있습니다.")
             return
-            
         self.status_label.config(text="인벤토리에서 드래그하여 영역을 선택하세요...")
-        
-        # 현재 창 숨기기
-        self.root.withdraw()
-        
-        # ESC 키를 감지하는 전역 이벤트 핸들러 추가
-        def global_esc_handler(e):
-            if e.name == 'esc':
-                print("ESC 키가 눌림 (전역 핸들러)")
-                self.cancel_selection()
-                return False  # 더 이상 처리하지 않음
-                
-        # 전역 핸들러 등록
-        keyboard_hook = keyboard.hook(global_esc_handler)
-        
-        # 전체 화면 오버레이 창 생성
-        self.overlay = tk.Toplevel()
-        self.overlay.attributes('-fullscreen', True)
-        self.overlay.attributes('-alpha', 0.3)
-        self.overlay.attributes('-topmost', True)
-        self.overlay.configure(bg='black')
-        
-        # 닫힐 때 전역 핸들러 해제
-        self.overlay.protocol("WM_DELETE_WINDOW", lambda: keyboard.unhook(keyboard_hook))
-        
-        # 오버레이 캔버스
-        self.overlay_canvas = tk.Canvas(self.overlay, bg="black", highlightthickness=0)
-        self.overlay_canvas.pack(fill=tk.BOTH, expand=True)
-        
-        # 안내 텍스트
-        self.overlay_canvas.create_text(
-            self.overlay.winfo_screenwidth() // 2,
-            self.overlay.winfo_screenheight() // 2,
-            text="드래그하여 영역을 선택하세요. ESC를 눌러 취소합니다.",
-            fill="white", font=("Arial", 16)
-        )
-        
-        # 드래그 변수
-        self.drag_start_x = 0
-        self.drag_start_y = 0
-        self.drag_rect = None
-        self.dragging = False
-        
-        # 이벤트 바인딩
-        self.overlay.bind("<ButtonPress-1>", self.on_drag_start)
-        self.overlay.bind("<B1-Motion>", self.on_drag_motion)
-        self.overlay.bind("<ButtonRelease-1>", self.on_drag_release)
-        
-        # 창에 포커스 설정
-        self.overlay.focus_force()
+        self.area_selector.open()
 
-    def cancel_selection(self, event=None):
-        """선택 취소"""
-        print("cancel_selection 호출됨")
-        try:
-            if hasattr(self, 'overlay') and self.overlay.winfo_exists():
-                self.overlay.destroy()
-            
-            self.root.deiconify()
-            self.root.focus_force()
-            self.status_label.config(text="영역 선택 취소됨")
-        except Exception as e:
-            print(f"선택 취소 중 오류: {e}")
-        
-    def on_drag_start(self, event):
-        """드래그 시작"""
-        self.drag_start_x = event.x
-        self.drag_start_y = event.y
-        self.dragging = True
+    def on_selection_cancel(self):
+        """영역 선택 취소"""
+        self.status_label.config(text="영역 선택 취소됨")
         
-        # 이전 사각형 삭제
-        if self.drag_rect:
-            self.overlay_canvas.delete(self.drag_rect)
-    
-    def on_drag_motion(self, event):
-        """드래그 중"""
-        if not self.dragging:
-            return
-        
-        # 이전 사각형 삭제
-        if self.drag_rect:
-            self.overlay_canvas.delete(self.drag_rect)
-        
-        # 새 사각형 그리기
-        self.drag_rect = self.overlay_canvas.create_rectangle(
-            self.drag_start_x, self.drag_start_y,
-            event.x, event.y,
-            outline="red", width=2
-        )
-    
-    def on_drag_release(self, event):
-        """드래그 완료"""
-        if not self.dragging:
-            return
-                
-        self.dragging = False
-        
-        # 좌표 계산 (시작점이 항상 좌상단, 끝점이 항상 우하단)
-        start_x = min(self.drag_start_x, event.x)
-        start_y = min(self.drag_start_y, event.y)
-        end_x = max(self.drag_start_x, event.x)
-        end_y = max(self.drag_start_y, event.y)
-        
-        # 너무 작은 영역은 무시
-        if end_x - start_x < 10 or end_y - start_y < 10:
-            messagebox.showwarning("경고", "선택한 영역이 너무 작습니다. 다시 시도하세요.")
-            return
-        
-        # 키보드 훅 해제 (전역 핸들러 등록한 경우)
-        try:
-            keyboard.unhook_all()
-        except:
-            pass
-            
-        # 나머지 코드는 그대로 유지...
-    
+    def on_area_selected(self, start_pos, end_pos):
+        """드래그 완료 (오버레이가 닫히기 전에 호출되어 바로 캡처)"""
         # 좌표 저장
-        self.start_pos = (start_x, start_y)
-        self.end_pos = (end_x, end_y)
+        self.start_pos = start_pos
+        self.end_pos = end_pos
     
         # 제외할 셀 목록 초기화 (중복 제거)
         self.excluded_cells = []
         self.excluded_label.config(text="[]")
     
-        # 스크린샷 캡처
-        self.initial_screenshot = ImageGrab.grab((start_x, start_y, end_x, end_y))
-    
-        # 캔버스 크기
-        canvas_width = self.initial_canvas.winfo_width()
-        canvas_height = self.initial_canvas.winfo_height()
-    
-        # 이미지 리사이징
-        resized_img = self.initial_screenshot.resize(
-            (canvas_width, canvas_height), 
-            Image.LANCZOS
-        )
-    
-        # Tkinter 이미지로 변환
-        self.initial_tk_image = ImageTk.PhotoImage(resized_img)
-    
-        # 캔버스에 이미지 표시
-        self.initial_canvas.delete("all")
-        self.initial_canvas.create_image(
-            0, 0, 
-            anchor=tk.NW, 
-            image=self.initial_tk_image
-        )
-    
-        # 오버레이 창 닫기
-        self.overlay.destroy()
-    
-        # 메인 창 복원
-        self.root.deiconify()
-        self.root.focus_force()
+        # 실행 중 캡처와 같은 캡처 경로로 빈 인벤토리 캡처 (캡처 방식이 다르면 두 이미지가 달라짐)
+        self.engine.configure(start_pos, end_pos)
+        self.initial_screenshot = Image.fromarray(self.engine.grab().copy())
+        
+        # 원본과 셀 통계를 한 번만 계산하여 저장 (재시작 후에도 사용)
+        self.inventory_image_path = None
+        self.reference = self.create_reference_store()
+        self.reference.save(self.initial_screenshot)
+        self.inventory_image_path = self.reference.image_path
     
         # 상태 업데이트
         self.status_label.config(text="영역 선택 완료")
@@ -774,7 +802,7 @@ class HardwareLevelDragMacro:
         # 설정 저장
         self.save_config()
     
-        # 캔버스 업데이트 및 그리드 표시
+        # 캔버스 업데이트 및 그리드 표시 (새 캡처이므로 미리보기를 다시 축소)
         self.update_canvas()
         
     def on_canvas_click(self, event):
@@ -783,31 +811,13 @@ class HardwareLevelDragMacro:
             return
         
         try:
-            # 캔버스 크기
-            canvas_width = self.initial_canvas.winfo_width()
-            canvas_height = self.initial_canvas.winfo_height()
-            
-            # 스크린샷 크기
-            img_width = self.end_pos[0] - self.start_pos[0]
-            img_height = self.end_pos[1] - self.start_pos[1]
-            
-            # 비율 계산
-            scale = min(canvas_width / img_width, canvas_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            # 셀 크기
-            cell_width = new_width / self.grid_width
-            cell_height = new_height / self.grid_height
-            
-            # 클릭한 셀 계산
-            cell_x = int(event.x / cell_width)
-            cell_y = int(event.y / cell_height)
+            canvas_size = (self.initial_canvas.winfo_width(), self.initial_canvas.winfo_height())
+            region_size = (self.end_pos[0] - self.start_pos[0], self.end_pos[1] - self.start_pos[1])
+            cell = canvas_cell(event.x, event.y, canvas_size, region_size, self.grid_width, self.grid_height)
             
             # 유효한 셀인지 확인
-            if 0 <= cell_x < self.grid_width and 0 <= cell_y < self.grid_height:
+            if cell is not None:
                 # 셀 상태 토글
-                cell = (cell_x, cell_y)
                 if cell in self.excluded_cells:
                     self.excluded_cells.remove(cell)
                 else:
@@ -816,13 +826,35 @@ class HardwareLevelDragMacro:
                 # 표시 업데이트
                 self.excluded_label.config(text=str(self.excluded_cells))
                 self.save_config()
-                self.update_canvas()
+                self.update_cells([cell])
         except Exception as e:
-            print(f"캔버스 클릭 처리 오류: {e}")
+            log.error(f"캔버스 클릭 처리 오류: {e}")
+
+    def _reset_canvas(self):
+        """미리보기 캔버스 항목과 캐시 초기화 (레이아웃 전환 시)"""
+        self.initial_canvas.delete("all")
+        self._preview_item = None
+        self._preview_source = None
+        self._preview_size = None
+        self._grid_key = None
+        self._cell_items = {}
+        self._cell_states = {}
+        self._scroll_label_item = None
 
     def update_canvas(self):
-        """캔버스 업데이트 (스크린샷 및 그리드)"""
-        if not self.start_pos or not self.end_pos or self.initial_screenshot is None:
+        """
+        캔버스 업데이트 (스크린샷 및 그리드)
+
+        축소한 미리보기는 캡처나 캔버스 크기가 바뀔 때만 다시 만들고,
+        그리드 항목은 한 번만 만든 뒤 셀 상태가 바뀐 항목만 itemconfig로 갱신한다.
+        """
+        if not self.start_pos or not self.end_pos:
+            return
+        
+        # 재시작 후에는 저장된 빈 인벤토리 이미지를 불러와 표시
+        if self.initial_screenshot is None and self.reference is not None:
+            self.initial_screenshot = self.reference.image
+        if self.initial_screenshot is None:
             return
         
         try:
@@ -839,418 +871,391 @@ class HardwareLevelDragMacro:
             new_width = int(img_width * scale)
             new_height = int(img_height * scale)
             
-            # 이미지 리사이징
-            resized_img = self.initial_screenshot.resize((new_width, new_height), Image.LANCZOS)
-            
-            # Tkinter 이미지로 변환
-            self.initial_tk_image = ImageTk.PhotoImage(resized_img)
-            
-            # 캔버스 초기화
-            self.initial_canvas.delete("all")
-            
-            # 이미지 표시
-            self.initial_canvas.create_image(0, 0, anchor=tk.NW, image=self.initial_tk_image)
+            self._update_preview(new_width, new_height)
             
-            # 셀 크기
-            cell_width = new_width / self.grid_width
-            cell_height = new_height / self.grid_height
-            
-            # 그리드 그리기
-            for y in range(self.grid_height):
-                for x in range(self.grid_width):
-                    x1 = x * cell_width
-                    y1 = y * cell_height
-                    x2 = (x + 1) * cell_width
-                    y2 = (y + 1) * cell_height
-                    
-                    # 제외된 셀인지 확인
-                    is_excluded = (x, y) in self.excluded_cells
-                    
-                    # 감정 주문서 셀인지 확인
-                    is_appraisal_scroll = (x, y) == self.appraisal_scroll_cell
-                    
-                    # 셀 사각형 그리기
-                    if is_appraisal_scroll:
-                        # 감정 주문서 셀은 노란색으로 강조
-                        rect_id = self.initial_canvas.create_rectangle(
-                            x1, y1, x2, y2,
-                            fill="yellow", stipple="gray50",
-                            outline="orange", width=2
-                        )
-                    elif is_excluded:
-                        # 제외된 셀은 반투명 회색으로 표시
-                        rect_id = self.initial_canvas.create_rectangle(
-                            x1, y1, x2, y2,
-                            fill="gray", stipple="gray50",
-                            outline="red", width=1
-                        )
-                    else:
-                        # 일반 셀은 테두리만 표시
-                        rect_id = self.initial_canvas.create_rectangle(
-                            x1, y1, x2, y2,
-                            outline="blue", width=1
-                        )
-                    
-                    # 셀 좌표 텍스트
-                    text_color = "black"
-                    if is_appraisal_scroll:
-                        text_color = "black"  # 노란색 바탕에는 검은색 텍스트
-                    elif is_excluded:
-                        text_color = "red"
-                    else:
-                        text_color = "white"
-                        
-                    self.initial_canvas.create_text(
-                        x1 + cell_width/2, y1 + cell_height/2,
-                        text=f"{x},{y}",
-                        fill=text_color
-                    )
-                    
-                    # 감정 주문서 셀인 경우 추가 텍스트
-                    if is_appraisal_scroll:
-                        self.initial_canvas.create_text(
-                            x1 + cell_width/2, y1 + cell_height/2 + 15,
-                            text="감정 주문서",
-                            fill="black",
-                            font=("Arial", 8, "bold")
-                        )
+            # 그리드 크기나 미리보기 크기가 바뀐 경우에만 셀 항목을 새로 만듦
+            grid_key = (self.grid_width, self.grid_height, new_width, new_height)
+            if grid_key != self._grid_key:
+                self._build_grid(new_width, new_height)
+                self._grid_key = grid_key
+            self.update_cells()
             
             # 캔버스에 클릭 이벤트 바인딩
             self.initial_canvas.bind("<Button-1>", self.on_canvas_click)
         
         except Exception as e:
-            print(f"캔버스 업데이트 오류: {e}")
+            log.error(f"캔버스 업데이트 오류: {e}")
+
+    def _update_preview(self, width, height):
+        """미리보기 이미지 표시 (축소는 작업 스레드에서, 같은 캡처/크기면 캐시 재사용)"""
+        if self._preview_source is self.initial_screenshot and self._preview_size == (width, height):
+            return
+        source = self.initial_screenshot
+        self._preview_source = source
+        self._preview_size = (width, height)
+        
+        def show(photo):
+            # 축소하는 사이 다른 캡처나 레이아웃으로 바뀌었으면 무시
+            if self._preview_source is not source or self._preview_size != (width, height):
+                return
+            self.initial_tk_image = photo
+            if self._preview_item is None:
+                self._preview_item = self.initial_canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+                self.initial_canvas.tag_lower(self._preview_item)
+            else:
+                self.initial_canvas.itemconfig(self._preview_item, image=photo)
+        
+        self.thumbnails.request(source, (width, height), show)
+
+    def _build_grid(self, width, height):
+        """셀 사각형과 좌표 텍스트 생성 (항목 ID는 셀 좌표로 보관)"""
+        self.initial_canvas.delete("grid")
+        self._cell_items = {}
+        self._cell_states = {}
+        
+        # 셀 크기
+        cell_width = width / self.grid_width
+        cell_height = height / self.grid_height
+        self._canvas_cell_size = (cell_width, cell_height)
+        
+        # 쿼드 창고처럼 셀이 작으면 좌표 텍스트는 생략
+        show_labels = cell_width >= 20 and cell_height >= 14
+        
+        for y in range(self.grid_height):
+            for x in range(self.grid_width):
+                rect_id = self.initial_canvas.create_rectangle(
+                    x * cell_width, y * cell_height,
+                    (x + 1) * cell_width, (y + 1) * cell_height,
+                    tags="grid"
+                )
+                text_id = None
+                if show_labels:
+                    text_id = self.initial_canvas.create_text(
+                        (x + 0.5) * cell_width, (y + 0.5) * cell_height,
+                        text=f"{x},{y}", tags="grid"
+                    )
+                self._cell_items[(x, y)] = (rect_id, text_id)
+        
+        # 감정 주문서 셀 추가 텍스트 (셀이 바뀌면 위치만 옮김)
+        self._scroll_label_item = None
+        if show_labels:
+            self._scroll_label_item = self.initial_canvas.create_text(
+                0, 0, text="감정 주문서", fill="black",
+                font=("Arial", 8, "bold"), state=tk.HIDDEN, tags="grid"
+            )
+
+    def update_cells(self, cells=None):
+        """
+        셀 표시 상태 갱신 (상태가 바뀐 셀만 itemconfig)
+
+        :param cells: 갱신할 (x, y) 셀 목록 (없으면 전체 셀 비교)
+        """
+        if not self._cell_items:
+            return
+        excluded = set(self.excluded_cells)
+        scroll_cells = set(self.appraisal_scroll_cells)
+        for cell in (self._cell_items if cells is None else cells):
+            items = self._cell_items.get(tuple(cell))
+            if items is None:
+                continue
+            if cell in scroll_cells:
+                state = 'scroll'
+            elif cell in excluded:
+                state = 'excluded'
+            else:
+                state = 'normal'
+            if self._cell_states.get(cell) == state:
+                continue
+            self._cell_states[cell] = state
+            
+            rect_id, text_id = items
+            rect_style, text_color = CELL_STYLES[state]
+            self.initial_canvas.itemconfig(rect_id, **rect_style)
+            if text_id is not None:
+                self.initial_canvas.itemconfig(text_id, fill=text_color)
+        
+        if self._scroll_label_item is not None:
+            if self.appraisal_scroll_cell in self._cell_items:
+                x, y = self.appraisal_scroll_cell
+                cell_width, cell_height = self._canvas_cell_size
+                self.initial_canvas.coords(self._scroll_label_item,
+                                           (x + 0.5) * cell_width, (y + 0.5) * cell_height + 15)
+                self.initial_canvas.itemconfig(self._scroll_label_item, state=tk.NORMAL)
+            else:
+                self.initial_canvas.itemconfig(self._scroll_label_item, state=tk.HIDDEN)
 
     def find_path_of_exile_window(self):
         """Path of Exile 창 찾기"""
         try:
-            # 'Path of Exile' 창 검색 (대소문자 무시)
-            poe_windows = [w for w in gw.getWindowsWithTitle('Path of Exile') if w.title.lower().startswith('path of exile')]
-            
-            if not poe_windows:
+            # 'Path of Exile' 창 검색 및 활성화
+            if find_game_window() is None:
                 messagebox.showwarning("경고", "Path of Exile 창을 찾을 수 없습니다.")
                 return False
             
-            # 첫 번째 창 활성화
-            poe_window = poe_windows[0]
-            poe_window.activate()
-            
-            # 창이 최소화되어 있다면 복원
-            if poe_window.isMinimized:
-                poe_window.restore()
-            
             return True
         except Exception as e:
             messagebox.showerror("오류", f"창 찾기 중 오류 발생: {e}")
             return False
     
-    def compare_cell_images(self, initial_img, current_img, cell_x, cell_y, cell_width, cell_height):
-        """두 이미지의 특정 셀을 비교하여 아이템 감지 (매우 단순화된 버전)"""
-        try:
-            # 셀 이미지 추출
-            cell_left = int(cell_x * cell_width)
-            cell_top = int(cell_y * cell_height)
-            cell_right = int((cell_x + 1) * cell_width)
-            cell_bottom = int((cell_y + 1) * cell_height)
-            
-            # 초기 이미지에서 셀 추출
-            initial_cell = initial_img.crop((cell_left, cell_top, cell_right, cell_bottom))
-            
-            # 현재 이미지에서 셀 추출 
-            current_cell = current_img.crop((cell_left, cell_top, cell_right, cell_bottom))
-            
-            # 흑백 이미지로 변환
-            initial_gray = initial_cell.convert('L')
-            current_gray = current_cell.convert('L')
-            
-            # NumPy 배열로 변환
-            initial_array = np.array(initial_gray)
-            current_array = np.array(current_gray)
-            
-            # 간단한 밝기 임계값
-            bright_threshold = 50
-            
-            # 밝은 픽셀 수 계산
-            initial_bright = np.sum(initial_array > bright_threshold)
-            current_bright = np.sum(current_array > bright_threshold)
-            
-            # 총 픽셀 수
-            total_pixels = initial_array.size
-            
-            # 밝은 픽셀 비율
-            initial_ratio = initial_bright / total_pixels
-            current_ratio = current_bright / total_pixels
-            
-            # 차이 계산
-            diff = current_ratio - initial_ratio
-            
-            # 로그 출력
-            print(f"셀({cell_x},{cell_y}) - 초기: {initial_ratio:.3f}, 현재: {current_ratio:.3f}, 차이: {diff:.3f}")
-            
-            # 아주 단순한 조건: 현재 밝은 픽셀이 20% 이상이고, 차이가 0.15 이상인 경우 아이템으로 간주
-            # 로그를 보니 대부분의 셀에서 현재 값이 0.25 이상이고 차이가 0.2 이상
-            has_item = current_ratio > 0.2 and diff > 0.15
-            
-            # 유사도 반환 (0: 아이템 있음, 100: 아이템 없음)
-            return 0 if has_item else 100
-            
-        except Exception as e:
-            print(f"이미지 비교 오류: {e}")
-            return 100  # 오류 발생 시 아이템 없다고 간주 (변경됨!)
-            
     def run_macro(self):
         """매크로 실행"""
         if not self.start_pos or not self.end_pos:
             messagebox.showwarning("경고", "영역을 먼저 선택해주세요.")
             return
         
-        if self.is_running:
+        if self.is_running or self.is_appraisal_running:
             return
         
         # 현재 포커스된 창 확인 (디버깅용)
         try:
             focused_window = gw.getActiveWindow()
-            print(f"현재 포커스된 창: {focused_window.title}")
+            log.info(f"현재 포커스된 창: {focused_window.title}")
         except Exception as e:
-            print(f"활성 창 확인 오류: {e}")
+            log.error(f"활성 창 확인 오류: {e}")
         
         # 임계값 설정 저장
         self.similarity_threshold = 0
         self.save_config()
         
         # Path of Exile 창 찾기 및 활성화
-        if not self.find_path_of_exile_window():
+        self.timeline.begin("인벤 정리")
+        with self.timeline.span('window_activate'):
+            found = self.find_path_of_exile_window()
+        if not found:
+            self.timeline.end()
             return
         
-        # 실행 상태 설정
-        self.is_running = True
         # 버튼 텍스트 변경
         self.run_btn.config(text=f"인벤 정리 중지 ({self.run_hotkey.upper()})")
         
         # 감정 매크로 버튼 비활성화 (동시 실행 방지)
         self.appraisal_run_btn.config(state=tk.DISABLED)
-        
-        # 실행 스레드 시작
-        macro_thread = threading.Thread(target=self._run_macro_thread, daemon=True)
-        macro_thread.start()
-
-    def _run_macro_thread(self):
-        """매크로 실행 (별도 스레드)"""
         self.status_label.config(text="매크로 실행 중...")
         
         # 창 최소화 (선택적)
-        if self.minimize_window.get():
+        settings = self._run_settings()
+        if settings['minimize']:
             self.root.withdraw()
         
-        # 잠시 대기 (창 전환용)
-        time.sleep(0.5)
+        # 실행 스레드 시작 (대기 오차는 실행마다 새로 집계)
+        self.engine.timer.reset_stats()
+        self.run_mode = 'inventory'
+        self.runner.start(self._run_macro_thread, settings,
+                          on_finish=lambda token: self._finish_run(token, settings))
+
+    def _run_macro_thread(self, token, settings):
+        """
+        매크로 실행 (별도 스레드, Tk는 직접 호출하지 않고 UI 갱신 큐로만 변경)
         
+        :param token: 이 실행의 CancelToken (모든 대기가 중지 요청에 바로 깨어남)
+        :param settings: 실행 시작 시점의 설정 값 (_run_settings)
+        """
         try:
-            # Ctrl 키 해제 (이전에 눌려있을 수 있음)
-            keyboard.release('ctrl')
-            
-            # 새 스크린샷 캡처
-            macro_screenshot = ImageGrab.grab((self.start_pos[0], self.start_pos[1], self.end_pos[0], self.end_pos[1]))
-            
-            # 매크로 캔버스 크기
-            canvas_width = self.macro_canvas.winfo_width()
-            canvas_height = self.macro_canvas.winfo_height()
-            
-            # 이미지 리사이징
-            resized_img = macro_screenshot.resize(
-                (canvas_width, canvas_height), 
-                Image.LANCZOS
+            # 영역/제외 셀이 바뀐 경우에만 그리드 계획을 새로 만듦
+            plan = self.engine.configure(
+                self.start_pos, self.end_pos, self.excluded_cells, self.appraisal_scroll_cells
             )
             
-            # Tkinter 이미지로 변환
-            self.macro_tk_image = ImageTk.PhotoImage(resized_img)
+            # 게임 창이 전면에 오고 인벤토리 화면이 멈출 때까지 대기 (시간 초과면 경고 후 진행)
+            with self.timeline.span('switch_wait'):
+                ready = wait_for_game(self.engine, token)
+            if ready is None:
+                return
             
-            # 기존 캔버스 내용 지우기
-            self.macro_canvas.delete("all")
+            # Ctrl 키 해제 (이전에 눌려있을 수 있음)
+            keyboard.release('ctrl')
             
-            # 이미지 표시
-            self.macro_canvas.create_image(
-                0, 0, 
-                anchor=tk.NW, 
-                image=self.macro_tk_image
-            )
+            # 새 스크린샷 캡처 (재사용 버퍼에 직접 캡처, RGB 배열)
+            with self.timeline.span('capture'):
+                macro_screenshot = self.engine.grab()
+            
+            # 캔버스가 화면에 표시된 경우에만 미리보기 생성 (작업 스레드에서 축소, 캐시하지 않음)
+            preview_size = settings['preview_size']
+            if preview_size is not None:
+                canvas_width, canvas_height = preview_size
+                
+                def show_macro_preview(photo):
+                    self.macro_tk_image = photo
+                    # 클릭 표시는 남기고 이전 미리보기만 교체
+                    self.macro_canvas.delete("preview")
+                    preview_id = self.macro_canvas.create_image(
+                        0, 0, anchor=tk.NW, image=photo, tags="preview"
+                    )
+                    self.macro_canvas.tag_lower(preview_id)
+                
+                self.ui_updates.post(lambda: self.macro_canvas.delete("all"))
+                self.thumbnails.request(macro_screenshot, preview_size, show_macro_preview, cache=False)
             
             # 박스 크기
             box_width = self.end_pos[0] - self.start_pos[0]
             box_height = self.end_pos[1] - self.start_pos[1]
             
             # 셀 크기
-            cell_width = box_width / self.grid_width
-            cell_height = box_height / self.grid_height
+            cell_width, cell_height = self.engine.cell_size
             
             # 설정
-            delay = self.click_delay.get()
-            use_ctrl = self.use_ctrl_click.get()
-            detect_items = self.detect_items.get()
+            delay = settings['delay']
+            use_ctrl = settings['use_ctrl']
+            detect_items = settings['detect_items']
+            reference_profile = self.get_reference_profile() if detect_items else None
             
-            # 아이템이 있는 셀 목록 (비교 모드에서 사용)
+            # 클릭한 아이템 셀 목록 (비교 모드에서 사용)
             item_cells = []
-            
-            # 아이템 감지 모드일 경우 셀별 비교 수행
-            if detect_items and self.initial_screenshot is not None:
-                print("아이템 감지 모드 활성화됨")
-                # 셀별 비교
-                for y in range(self.grid_height):
-                    for x in range(self.grid_width):
-                        # 제외된 셀 건너뛰기
-                        if (x, y) in self.excluded_cells:
-                            print(f"셀({x},{y}) - 제외됨")
-                            continue
-                        
-                        # 빈 인벤토리와 현재 인벤토리의 셀 이미지 비교
-                        similarity = self.compare_cell_images(
-                            self.initial_screenshot, 
-                            macro_screenshot, 
-                            x, y, 
-                            cell_width, cell_height
-                        )
-                        
-                        # 유사도가 임계값보다 낮으면 아이템이 있다고 판단
-                        if similarity < 50:  # 유사도가 낮으면 = 아이템이 있다고 판단
-                            item_cells.append((x, y))
-                            print(f"셀({x},{y}) - 아이템 감지됨!")
-                
-                # 감지된 아이템 표시 (중요: 이 로그 메시지 확인!)
-                print(f"총 {len(item_cells)}개 셀에서 아이템 감지됨: {item_cells}")
-                self.status_label.config(text=f"아이템 감지: {len(item_cells)}개 셀")
+            failed_cells = []  # 재시도 후에도 아이템이 남은 셀
+            
+            # 클릭 결과를 확인할 수 있는 아이템 감지 모드에서만 타이밍 자동 조절
+            pacer = None
+            if reference_profile is not None and settings['adaptive']:
+                pacer = self.pacer
+                pacer.begin_run(delay)
+            
+            # 아이템 감지 모드일 경우 감지된 셀을 클릭 순서대로 받음
+            detected_cells = None
+            if reference_profile is not None:
+                log.info("아이템 감지 모드 활성화됨")
+                # 현재 커서 위치에서 출발하는 경로로 클릭 순서 결정
+                mouse_x, mouse_y = self.engine.clicker.position()
+                route_start = (mouse_x - self.start_pos[0], mouse_y - self.start_pos[1])
+                detected_cells = self._detect_cells(
+                    reference_profile, macro_screenshot, plan.active,
+                    cell_width, cell_height, route_start, settings['stream'],
+                    settings['merge_items']
+                )
+            
+            # 감지하는 사이 중지되었으면 Ctrl을 누르지 않음
+            if token.cancelled:
+                return
             
             # Ctrl 키 누르기
             if use_ctrl:
-                keyboard.press('ctrl')
-                time.sleep(0.1)  # 키 입력 안정화를 위한 짧은 대기
+                with self.timeline.span('ctrl_press'):
+                    keyboard.press('ctrl')
+                    self.engine.sleep(0.1, token)  # 키 입력 안정화를 위한 짧은 대기
             
             try:
                 # 클릭 로직
-                if detect_items and self.initial_screenshot is not None:
-                    if item_cells:
-                        # 아이템 감지 모드: 아이템이 있는 셀만 클릭
-                        print(f"아이템이 있는 {len(item_cells)}개 셀만 클릭합니다.")
-                        for x, y in item_cells:
-                            # 실행 중지 확인
-                            if not self.is_running:
-                                return
-                                
-                            # 셀의 좌상단 좌표 계산
-                            cell_base_x = int(self.start_pos[0] + x * cell_width)
-                            cell_base_y = int(self.start_pos[1] + y * cell_height)
-                            
-                            # 랜덤 클릭 지점 계산
-                            click_x, click_y = self._calculate_random_click_point(
-                                cell_base_x, cell_base_y, cell_width, cell_height
-                            )
-                            
-                            # 하드웨어 수준 마우스 이동 및 클릭
-                            mouse.move(click_x, click_y)
-                            time.sleep(0.02)  # 마우스 이동 안정화
-                            mouse.press(button='left')
-                            time.sleep(0.02)  # 클릭 다운 유지
-                            mouse.release(button='left')
-                            
-                            # 매크로 캔버스에 클릭 표시
-                            if not self.minimize_window.get():
-                                # 캔버스 상의 좌표 계산
-                                canvas_x = int((x * cell_width) * (canvas_width / box_width))
-                                canvas_y = int((y * cell_height) * (canvas_height / box_height))
-                                canvas_cell_w = int(cell_width * (canvas_width / box_width))
-                                canvas_cell_h = int(cell_height * (canvas_height / box_height))
-                                
-                                # 클릭한 셀 표시 (빨간색 테두리)
-                                self.macro_canvas.create_rectangle(
-                                    canvas_x, canvas_y, 
-                                    canvas_x + canvas_cell_w, canvas_y + canvas_cell_h,
-                                    outline="red", width=2
-                                )
+                if reference_profile is not None:
+                    def on_click(x, y):
+                        log.debug("셀(%d,%d) - 아이템 클릭", x, y)
+                        # 매크로 캔버스에 클릭 표시 (UI 갱신 큐에 넣기만 하고 바로 다음 클릭 진행)
+                        if not settings['minimize'] and preview_size is not None:
+                            # 캔버스 상의 좌표 계산
+                            canvas_x = int((x * cell_width) * (canvas_width / box_width))
+                            canvas_y = int((y * cell_height) * (canvas_height / box_height))
+                            canvas_cell_w = int(cell_width * (canvas_width / box_width))
+                            canvas_cell_h = int(cell_height * (canvas_height / box_height))
                             
-                            # 지연
-                            if delay > 0:
-                                time.sleep(delay)
+                            # 클릭한 셀 표시 (빨간색 테두리)
+                            self.ui_updates.post(lambda: self.macro_canvas.create_rectangle(
+                                canvas_x, canvas_y,
+                                canvas_x + canvas_cell_w, canvas_y + canvas_cell_h,
+                                outline="red", width=2
+                            ))
+                    
+                    def on_sample(clicked):
+                        # 자동 조절 중이면 주기적으로 이전 클릭 결과 확인
+                        try:
+                            remaining = self.engine.sample_cleared(reference_profile, pacer, clicked)
+                        except Exception as e:
+                            log.error(f"클릭 결과 샘플 확인 오류: {e}")
+                            return
+                        if remaining:
+                            # 남은 셀은 실행 후 확인 단계에서 다시 클릭
+                            log.info(f"클릭 누락 {len(remaining)}개 감지, 클릭 속도 늦춤: {remaining}")
+                    
+                    # 아이템 감지 모드: 아이템이 있는 셀만 클릭 (감지 중 클릭 모드면 감지와 동시에 진행)
+                    item_cells = self.engine.click_cells(
+                        detected_cells, delay, pacer=pacer, cancel=token,
+                        on_click=on_click, on_sample=on_sample
+                    )
+                    # 실행 중지 확인
+                    if token.cancelled:
+                        return
+                
+                    if not item_cells:
+                        log.info("감지된 아이템이 없습니다. 클릭을 실행하지 않습니다.")
                     else:
-                        print("감지된 아이템이 없습니다. 클릭을 실행하지 않습니다.")
+                        self._report_route(item_cells, cell_width, cell_height, route_start)
+                    
+                    if item_cells and (settings['verify'] or pacer is not None):
+                        # 클릭한 셀만 다시 캡처하여 남은 아이템 재클릭
+                        failed_cells = self.engine.retry_uncleared(
+                            reference_profile, item_cells, delay,
+                            self.verify_retries, self.verify_settle_delay, pacer, cancel=token
+                        )
+                    
+                    if pacer is not None:
+                        log.info(f"클릭 타이밍 자동 조절: {pacer.profile()}")
                 else:
                     # 기존 방식: 모든 셀 순회하며 클릭 (제외된 셀은 건너뜀)
-                    print("일반 모드: 모든 셀을 클릭합니다.")
-                    for y in range(self.grid_height):
-                        for x in range(self.grid_width):
-                            # 실행 중지 확인
-                            if not self.is_running:
-                                return
-                                
-                            # 제외된 셀 건너뛰기
-                            if (x, y) in self.excluded_cells:
-                                continue
-                            
-                            # 셀의 좌상단 좌표 계산
-                            cell_base_x = int(self.start_pos[0] + x * cell_width)
-                            cell_base_y = int(self.start_pos[1] + y * cell_height)
-                            
-                            # 랜덤 클릭 지점 계산
-                            click_x, click_y = self._calculate_random_click_point(
-                                cell_base_x, cell_base_y, cell_width, cell_height
-                            )
-                            
-                            # 현재 마우스 위치 저장
-                            original_pos = mouse.get_position()
-                            
-                            # 하드웨어 수준 마우스 이동 및 클릭
-                            mouse.move(click_x, click_y)
-                            time.sleep(0.02)  # 마우스 이동 안정화
-                            mouse.press(button='left')
-                            time.sleep(0.02)  # 클릭 다운 유지
-                            mouse.release(button='left')
-                            
-                            # 지연
-                            if delay > 0:
-                                time.sleep(delay)
+                    log.info("일반 모드: 모든 셀을 클릭합니다.")
+                    self.engine.click_cells(plan.cells, delay, cancel=token)
+                    # 실행 중지 확인
+                    if token.cancelled:
+                        return
             finally:
                 # Ctrl 키 해제
                 if use_ctrl:
                     keyboard.release('ctrl')
             
             # 아이템 감지 모드인 경우 결과 표시
-            if detect_items and self.initial_screenshot is not None:
-                self.status_label.config(text=f"매크로 실행 완료 - {len(item_cells)}개 셀 클릭됨")
+            if reference_profile is not None and failed_cells:
+                self._post_status(f"매크로 실행 완료 - {len(item_cells)}개 셀 클릭, {len(failed_cells)}개 셀 정리 실패")
+            elif reference_profile is not None:
+                self._post_status(f"매크로 실행 완료 - {len(item_cells)}개 셀 클릭됨")
             else:
-                self.status_label.config(text="매크로 실행 완료")
+                self._post_status("매크로 실행 완료")
         except Exception as e:
-            self.status_label.config(text=f"오류 발생: {str(e)}")
-            print(f"매크로 실행 오류: {e}")
-            
-            # 오류 발생 시에도 Ctrl 키 해제
-            try:
-                keyboard.release('ctrl')
-            except:
-                pass
+            self._post_status(f"오류 발생: {str(e)}")
+            log.error(f"매크로 실행 오류: {e}")
         finally:
-            # UI 상태 복원
-            self.is_running = False
-            if self.minimize_window.get():
-                self.root.deiconify()
-                self.root.focus_force()
-            self.run_btn.config(text=f"인벤 정리 실행 ({self.run_hotkey.upper()})")
-            self.run_btn.config(state=tk.NORMAL)
-            self.appraisal_run_btn.config(state=tk.NORMAL)
-            
-            
+            # 오류/중지 시에도 보조키 해제 (UI 복원은 MacroRunner가 _finish_run을 UI 스레드로 넘김)
+            self._release_modifiers()
+
+    def _release_modifiers(self):
+        """Ctrl/Shift 키 해제 (눌려 있지 않아도 안전)"""
+        for key in ('ctrl', 'shift'):
+            try:
+                keyboard.release(key)
+            except Exception as e:
+                log.error(f"{key} 키 해제 오류: {e}")
+
+    def _finish_run(self, token, settings):
+        """실행 종료 처리 (MacroRunner가 UI 스레드에서 호출): 중지 지연 기록, 창과 버튼 복원"""
+        log.info(f"대기 정밀도: {self.engine.timer.format_stats()}")
+        latency = token.stop_latency
+        if latency is not None:
+            self.status_label.config(text=f"매크로 중지됨 (중지 지연 {latency * 1000:.0f}ms)")
+        
+        # 그 사이 새 실행이 시작됐으면 새 실행의 상태는 건드리지 않음
+        if self.runner.token is not None:
+            return
+        if latency is not None:
+            self.timeline.record('stop_latency', token.cancelled_at, token.finished_at)
+        self.timeline.end()
+        self._restore_ui(settings['minimize'])
+
+    def _restore_ui(self, minimized):
+        """실행 종료 후 창과 버튼 상태 복원 (UI 스레드)"""
+        if minimized:
+            self.root.deiconify()
+            self.root.focus_force()
+        self.run_btn.config(text=f"인벤 정리 실행 ({self.run_hotkey.upper()})", state=tk.NORMAL)
+        self.appraisal_run_btn.config(text=f"감정 주문 실행 ({self.appraisal_run_hotkey.upper()})",
+                                      state=tk.NORMAL)
+
     def stop_macro(self):
         """매크로 중지"""
-        print("매크로 중지 함수 호출됨")
+        log.debug("매크로 중지 함수 호출됨")
         if not self.is_running:
-            print("이미 중지된 상태")
+            log.info("이미 중지된 상태")
             return
             
-        self.is_running = False
         self.status_label.config(text="매크로 중지됨")
         
-        # Ctrl 키 해제
-        try:
-            keyboard.release('ctrl')
-        except:
-            pass
+        # 대기 중인 실행 스레드를 바로 깨우고 보조키 해제
+        self.runner.stop()
+        self._release_modifiers()
             
         # 버튼 텍스트 변경
         self.run_btn.config(text=f"인벤 정리 실행 ({self.run_hotkey.upper()})")
@@ -1258,43 +1263,23 @@ class HardwareLevelDragMacro:
         # 감정 매크로 버튼 활성화
         self.appraisal_run_btn.config(state=tk.NORMAL)
         
-        print("매크로 중지 완료")
+        log.info("매크로 중지 완료")
     
-    def _calculate_random_click_point(self, base_x, base_y, cell_width, cell_height):
+    def set_appraisal_scroll_cell(self, append=False):
         """
-        각 셀의 중앙을 기준으로 랜덤한 클릭 지점 계산
-        
-        :param base_x: 셀의 기준 x 좌표 (좌상단)
-        :param base_y: 셀의 기준 y 좌표 (좌상단)
-        :param cell_width: 셀의 너비
-        :param cell_height: 셀의 높이
-        :return: 랜덤한 클릭 x, y 좌표
+        감정 주문서 셀 설정
+
+        :param append: True면 예비 묶음으로 추가 (첫 묶음이 비면 추가한 순서대로 사용)
         """
-        # 셀 중앙 계산
-        center_x = base_x + cell_width / 2
-        center_y = base_y + cell_height / 2
-        
-        # 랜덤 오차 범위 설정 (셀 크기의 일정 비율)
-        x_offset_range = cell_width * 0.2  # 너비의 20% 이내
-        y_offset_range = cell_height * 0.2  # 높이의 20% 이내
-        
-        # 랜덤 오프셋 생성
-        x_offset = random.uniform(-x_offset_range, x_offset_range)
-        y_offset = random.uniform(-y_offset_range, y_offset_range)
-        
-        # 랜덤 클릭 지점 계산
-        click_x = int(center_x + x_offset)
-        click_y = int(center_y + y_offset)
-        
-        return click_x, click_y
-    
-    def set_appraisal_scroll_cell(self):
-        """감정 주문서 셀 설정"""
         if not self.initial_canvas.winfo_ismapped():
             messagebox.showwarning("경고", "인벤토리 영역을 먼저 선택해주세요.")
             return
+        if append and not self.appraisal_scroll_cell:
+            messagebox.showwarning("경고", "감정 주문서 셀을 먼저 설정해주세요.")
+            return
             
         # 상태 메시지 변경
+        self._scroll_select_append = append
         self.status_label.config(text="감정 주문서가 있는 셀을 클릭하세요...")
         
         # 감정 주문서 셀 선택 모드 활성화
@@ -1326,25 +1311,106 @@ class HardwareLevelDragMacro:
             
             # 유효한 셀인지 확인
             if 0 <= cell_x < self.grid_width and 0 <= cell_y < self.grid_height:
-                # 감정 주문서 셀 설정
-                self.appraisal_scroll_cell = (cell_x, cell_y)
-                self.appraisal_cell_label.config(text=str(self.appraisal_scroll_cell))
+                # 감정 주문서 셀 설정 (예비 묶음과 겹치면 예비 목록에서 뺌)
+                cell = (cell_x, cell_y)
+                if self._scroll_select_append:
+                    if cell not in self.appraisal_scroll_cells:
+                        self.appraisal_spare_scroll_cells.append(cell)
+                    text = f"감정 주문서 예비 묶음 {cell} 추가 (총 {len(self.appraisal_scroll_cells)}개)"
+                else:
+                    self.appraisal_scroll_cell = cell
+                    self.appraisal_spare_scroll_cells = [c for c in self.appraisal_spare_scroll_cells
+                                                         if tuple(c) != cell]
+                    text = f"감정 주문서 셀이 {self.appraisal_scroll_cell}으로 설정되었습니다."
+                self.appraisal_cell_label.config(text=self._scroll_cells_text())
                 
                 # 상태 메시지 업데이트
-                self.status_label.config(text=f"감정 주문서 셀이 {self.appraisal_scroll_cell}으로 설정되었습니다.")
+                self.status_label.config(text=text)
                 
                 # 설정 저장
                 self.save_config()
                 
-                # 캔버스 업데이트
-                self.update_canvas()
+                # 이전/새 감정 주문서 셀만 다시 표시
+                self.update_cells()
                 
                 # 일반 셀 선택 모드로 복귀
                 self.initial_canvas.bind("<Button-1>", self.on_canvas_click)
         except Exception as e:
-            print(f"감정 주문서 셀 선택 오류: {e}")
+            log.error(f"감정 주문서 셀 선택 오류: {e}")
             self.status_label.config(text="감정 주문서 셀 선택 오류")
-            
+
+    def clear_spare_scroll_cells(self):
+        """감정 주문서 예비 묶음 목록 비우기 (첫 묶음 셀은 유지)"""
+        self.appraisal_spare_scroll_cells = []
+        self.appraisal_cell_label.config(text=self._scroll_cells_text())
+        self.status_label.config(text="감정 주문서 예비 묶음을 비웠습니다.")
+        self.save_config()
+        self.update_cells()
+            
+    def get_appraisal_classifier(self):
+        """현재 해상도/레이아웃의 미감정 아이템 판별기 (지연 로드)"""
+        if self._appraisal_classifier is None:
+            self._appraisal_classifier = load_appraisal_classifier(
+                self.config_file, self.screen_resolution, self.layouts[self.layout_name].reference_key)
+        return self._appraisal_classifier
+
+    def _appraisal_classifier_path(self):
+        return appraisal_classifier_path(
+            self.config_file, self.screen_resolution, self.layouts[self.layout_name].reference_key)
+
+    def learn_appraisal(self, unidentified):
+        """
+        현재 인벤토리의 아이템을 미감정 또는 감정됨 예시로 학습
+
+        :param unidentified: True면 지금 인벤토리의 아이템이 모두 미감정, False면 모두 감정됨
+        """
+        if self.is_running or self.is_appraisal_running:
+            return
+        if self.get_reference_profile() is None:
+            messagebox.showwarning("경고", "빈 인벤토리 영역을 먼저 선택해주세요.")
+            return
+        if not self.find_path_of_exile_window():
+            return
+        # 게임 화면이 보이도록 잠시 창을 숨긴 뒤 캡처
+        self.root.withdraw()
+        self.root.after(500, lambda: self._capture_appraisal_samples(unidentified))
+
+    def _capture_appraisal_samples(self, unidentified):
+        try:
+            plan = self.engine.configure(
+                self.start_pos, self.end_pos, self.excluded_cells, self.appraisal_scroll_cells
+            )
+            frame = self.engine.grab()
+            cells = self.engine.detect_cells(self.get_reference_profile().ratios, frame, plan.appraisal_active)
+            classifier = self.get_appraisal_classifier()
+            count = classifier.add(frame, cells, unidentified, self.grid_width, self.grid_height)
+            classifier.save(self._appraisal_classifier_path())
+            kind = "미감정" if unidentified else "감정됨"
+            if classifier.trained:
+                text = f"{kind} 아이템 {count}개 학습됨 (미감정 {len(classifier.unidentified)}개, 감정됨 {len(classifier.identified)}개)"
+            else:
+                text = f"{kind} 아이템 {count}개 학습됨 - 반대 종류도 학습해주세요"
+            self.status_label.config(text=text)
+            log.info(text)
+        except Exception as e:
+            log.error(f"감정 판별기 학습 오류: {e}")
+            self.status_label.config(text=f"학습 오류: {e}")
+        finally:
+            self.root.deiconify()
+
+    def clear_appraisal_learning(self):
+        """미감정 아이템 판별기 학습 데이터 삭제"""
+        if not messagebox.askyesno("확인", "감정 판별 학습 데이터를 초기화할까요?"):
+            return
+        self.get_appraisal_classifier().clear()
+        path = self._appraisal_classifier_path()
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            log.error(f"감정 판별기 삭제 오류: {e}")
+        self.status_label.config(text="감정 판별 학습 데이터 초기화됨")
+
     def run_appraisal_macro(self):
         """감정 주문서 매크로 실행"""
         if not self.start_pos or not self.end_pos:
@@ -1359,204 +1425,185 @@ class HardwareLevelDragMacro:
             return  # 이미 실행 중이면 무시
         
         # Path of Exile 창 찾기 및 활성화
-        if not self.find_path_of_exile_window():
+        self.timeline.begin("감정 주문")
+        with self.timeline.span('window_activate'):
+            found = self.find_path_of_exile_window()
+        if not found:
+            self.timeline.end()
             return
         
-        # 실행 상태 설정
-        self.is_appraisal_running = True
-        
         # 버튼 텍스트 변경
         self.appraisal_run_btn.config(text=f"감정 주문 중지 ({self.appraisal_run_hotkey.upper()})")
         
         # 인벤 정리 버튼 비활성화 (동시 실행 방지)
         self.run_btn.config(state=tk.DISABLED)
-        
-        # 실행 스레드 시작
-        appraisal_thread = threading.Thread(target=self._run_appraisal_macro_thread, daemon=True)
-        appraisal_thread.start()
-    
-    def _run_appraisal_macro_thread(self):
-        """감정 주문서 매크로 실행 (별도 스레드)"""
         self.status_label.config(text="감정 주문서 매크로 실행 중...")
         
         # 창 최소화 (선택적)
-        if self.minimize_window.get():
+        settings = self._run_settings()
+        if settings['minimize']:
             self.root.withdraw()
         
-        # 잠시 대기 (창 전환용)
-        time.sleep(0.5)
+        # 실행 스레드 시작 (대기 오차는 실행마다 새로 집계)
+        self.engine.timer.reset_stats()
+        self.run_mode = 'appraisal'
+        self.runner.start(self._run_appraisal_macro_thread, settings,
+                          on_finish=lambda token: self._finish_run(token, settings))
+    
+    def _run_appraisal_macro_thread(self, token, settings):
+        """
+        감정 주문서 매크로 실행 (별도 스레드, Tk는 직접 호출하지 않고 UI 갱신 큐로만 변경)
         
+        :param token: 이 실행의 CancelToken (모든 대기가 중지 요청에 바로 깨어남)
+        :param settings: 실행 시작 시점의 설정 값 (_run_settings)
+        """
         try:
+            # 영역/제외 셀이 바뀐 경우에만 그리드 계획을 새로 만듦
+            plan = self.engine.configure(
+                self.start_pos, self.end_pos, self.excluded_cells, self.appraisal_scroll_cells
+            )
+            
+            # 게임 창이 전면에 오고 인벤토리 화면이 멈출 때까지 대기 (시간 초과면 경고 후 진행)
+            with self.timeline.span('switch_wait'):
+                ready = wait_for_game(self.engine, token)
+            if ready is None:
+                return
+            
             # 키보드 키 해제 (이전에 눌려있을 수 있음)
             keyboard.release('ctrl')
             keyboard.release('shift')
             
-            # 새 스크린샷 캡처
-            macro_screenshot = ImageGrab.grab((self.start_pos[0], self.start_pos[1], self.end_pos[0], self.end_pos[1]))
-            
-            # 박스 크기
-            box_width = self.end_pos[0] - self.start_pos[0]
-            box_height = self.end_pos[1] - self.start_pos[1]
+            # 새 스크린샷 캡처 (재사용 버퍼에 직접 캡처, RGB 배열)
+            with self.timeline.span('capture'):
+                macro_screenshot = self.engine.grab()
             
             # 셀 크기
-            cell_width = box_width / self.grid_width
-            cell_height = box_height / self.grid_height
+            cell_width, cell_height = self.engine.cell_size
             
             # 설정
-            delay = self.click_delay.get()
-            detect_items = self.detect_items.get()
+            delay = settings['delay']
+            detect_items = settings['detect_items']
+            reference_profile = self.get_reference_profile() if detect_items else None
             
-            # 아이템이 있는 셀 목록 (비교 모드에서 사용)
+            # 감정한 아이템 셀 목록 (비교 모드에서 사용)
             item_cells = []
+            skipped_cells = []  # 이미 감정되어 건너뛴 셀
+            unappraised_cells = []  # 주문서가 모자라 감정하지 못한 셀
+            
+            # 아이템 감지 모드일 경우 감지된 셀을 클릭 순서대로 받음 (감정 주문서 셀 제외)
+            detected_cells = None
+            stacks = None
+            if reference_profile is not None:
+                log.info("아이템 감지 모드 활성화됨")
+                # 주문서 묶음마다 남은 수량을 추적하고 빈 묶음은 건너뜀
+                scroll_cells = plan.scroll_cells
+                stacks = ScrollStacks(scroll_cells, reader=self.stack_reader)
+                first_stack = stacks.select_first(
+                    macro_screenshot, reference_profile.still_occupied(macro_screenshot, list(scroll_cells)),
+                    self.grid_width, self.grid_height
+                )
+                if first_stack is None:
+                    log.info(f"감정 주문서 셀이 모두 비어 있습니다: {list(scroll_cells)}")
+                    self._post_status("감정 주문서가 없습니다.")
+                    return
+                # 감정 주문서 우클릭 후 커서가 주문서 셀에 있으므로 거기서 출발
+                route_start = (
+                    (first_stack[0] + 0.5) * cell_width,
+                    (first_stack[1] + 0.5) * cell_height,
+                )
+                detected_cells = self._detect_cells(
+                    reference_profile, macro_screenshot, plan.appraisal_active,
+                    cell_width, cell_height, route_start, settings['stream'],
+                    settings['merge_items']
+                )
+                # 이미 감정된 아이템은 건너뜀 (판별기가 학습된 경우만)
+                classifier = self.get_appraisal_classifier() if settings['skip_identified'] else None
+                if classifier is not None and classifier.trained:
+                    detected_cells = classifier.filter_cells(
+                        macro_screenshot, detected_cells, self.grid_width, self.grid_height, skipped_cells
+                    )
             
-            # 아이템 감지 모드일 경우 셀별 비교 수행
-            if detect_items and self.initial_screenshot is not None:
-                print("아이템 감지 모드 활성화됨")
-                # 셀별 비교
-                for y in range(self.grid_height):
-                    for x in range(self.grid_width):
-                        # 제외된 셀 건너뛰기
-                        if (x, y) in self.excluded_cells:
-                            print(f"셀({x},{y}) - 제외됨")
-                            continue
-                        
-                        # 감정 주문서 셀 건너뛰기
-                        if (x, y) == self.appraisal_scroll_cell:
-                            print(f"셀({x},{y}) - 감정 주문서 셀")
-                            continue
-                        
-                        # 빈 인벤토리와 현재 인벤토리의 셀 이미지 비교
-                        similarity = self.compare_cell_images(
-                            self.initial_screenshot, 
-                            macro_screenshot, 
-                            x, y, 
-                            cell_width, cell_height
-                        )
-                        
-                        # 유사도가 임계값보다 낮으면 아이템이 있다고 판단
-                        if similarity < 50:  # 유사도가 낮으면 = 아이템이 있다고 판단
-                            item_cells.append((x, y))
-                            print(f"셀({x},{y}) - 아이템 감지됨!")
-                
-                # 감지된 아이템 표시 (중요: 이 로그 메시지 확인!)
-                print(f"총 {len(item_cells)}개 셀에서 아이템 감지됨: {item_cells}")
-                self.status_label.config(text=f"감정할 아이템 감지: {len(item_cells)}개 셀")
+            # 감지하는 사이 중지되었으면 주문서를 사용하지 않음
+            if token.cancelled:
+                return
             
-            # 감정 주문서 셀 좌표 계산
-            appraisal_x, appraisal_y = self.appraisal_scroll_cell
-            appraisal_base_x = int(self.start_pos[0] + appraisal_x * cell_width + cell_width / 2)
-            appraisal_base_y = int(self.start_pos[1] + appraisal_y * cell_height + cell_height / 2)
+            def select_stack(cell):
+                """감정 주문서 묶음 우클릭 후 쉬프트 누르기 (묶음을 바꿀 때는 쉬프트를 먼저 뗌)"""
+                keyboard.release('shift')
+                # 1. 감정 주문서 우클릭 (묶음마다 한 번, 셀 중앙)
+                self.engine.click_cell(cell[0], cell[1], button='right', jitter=0, cancel=token)
+                if self.engine.sleep(0.05, token):  # 약간의 대기 시간 유지
+                    return
+                # 2. 쉬프트 키 누르기 (묶음의 아이템 클릭 동안 유지)
+                with self.timeline.span('shift_press'):
+                    keyboard.press('shift')
+                    self.engine.sleep(0.1, token)
             
             try:
-                # 1. 감정 주문서 우클릭 (한 번만 수행)
-                mouse.move(appraisal_base_x, appraisal_base_y)
-                time.sleep(0.02)  # 0.1초에서 0.02초로 변경
-                mouse.press(button='right')
-                time.sleep(0.02)  # 클릭 다운 유지
-                mouse.release(button='right')
-                time.sleep(0.05)  # 약간의 대기 시간 유지
-                
-                # 2. 쉬프트 키 누르기 (모든 아이템 클릭 동안 유지)
-                keyboard.press('shift')
-                time.sleep(0.1)
-                
-                # 3. 클릭 로직
-                if detect_items and self.initial_screenshot is not None:
-                    if item_cells:
-                        # 아이템 감지 모드: 감정이 필요한 아이템만 감정
-                        print(f"{len(item_cells)}개 아이템에 감정 주문서 사용")
-                        for x, y in item_cells:
-                            # 실행 중지 확인
-                            if not self.is_appraisal_running:
-                                return
-                            
-                            # 감정할 아이템 클릭
-                            cell_base_x = int(self.start_pos[0] + x * cell_width + cell_width / 2)
-                            cell_base_y = int(self.start_pos[1] + y * cell_height + cell_height / 2)
-                            
-                            # 감정할 아이템 클릭
-                            mouse.move(cell_base_x, cell_base_y)
-                            time.sleep(0.02)  # 0.1초 → 0.02초로 단축
-                            mouse.press(button='left')
-                            time.sleep(0.02)  # 클릭 다운 유지
-                            mouse.release(button='left')
-                            
-                            # 지연
-                            if delay > 0:
-                                time.sleep(delay)
+                # 3. 클릭 로직 (감정할 아이템은 셀 중앙 클릭)
+                if reference_profile is not None:
+                    # 아이템 감지 모드: 감정이 필요한 아이템만 감정 (감지 중 클릭 모드면 감지와 동시에 진행)
+                    # 묶음에 남은 수량(읽은 값 또는 추정)만큼 클릭한 뒤 주문서 셀만 다시 확인, 비면 다음 묶음으로
+                    item_cells, unappraised_cells = appraise_cells(
+                        self.engine, reference_profile, stacks, detected_cells, delay, select_stack,
+                        cancel=token, on_click=lambda x, y: log.debug("셀(%d,%d) - 감정 주문서 사용", x, y)
+                    )
+                    # 실행 중지 확인
+                    if token.cancelled:
+                        return
+                    
+                    used = {cell: count for cell, count in stacks.used.items() if count}
+                    if len(used) > 1:
+                        log.info(f"감정 주문서 묶음별 사용 수: {used}")
+                    
+                    if skipped_cells:
+                        log.info(f"이미 감정된 아이템 {len(skipped_cells)}개 건너뜀: {skipped_cells}")
+                    if not item_cells:
+                        log.info("감정할 아이템이 없습니다.")
+                        self._post_status("감정할 아이템이 없습니다.")
                     else:
-                        print("감정할 아이템이 없습니다.")
-                        self.status_label.config(text="감정할 아이템이 없습니다.")
+                        self._report_route(item_cells, cell_width, cell_height, route_start)
                 else:
-                    # 기존 방식: 모든 셀 순회하며 감정 (제외된 셀은 건너뜀)
-                    print("모든 셀에 감정 주문서 사용")
-                    for y in range(self.grid_height):
-                        for x in range(self.grid_width):
-                            # 실행 중지 확인
-                            if not self.is_appraisal_running:
-                                return
-                                
-                            # 제외된 셀 건너뛰기
-                            if (x, y) in self.excluded_cells:
-                                continue
-                            
-                            # 감정 주문서 셀 건너뛰기
-                            if (x, y) == self.appraisal_scroll_cell:
-                                continue
-                            
-                            # 감정할 아이템 클릭
-                            cell_base_x = int(self.start_pos[0] + x * cell_width + cell_width / 2)
-                            cell_base_y = int(self.start_pos[1] + y * cell_height + cell_height / 2)
-                            
-                            # 감정할 아이템 클릭
-                            mouse.move(cell_base_x, cell_base_y)
-                            time.sleep(0.02)  # 0.1초 → 0.02초로 단축
-                            mouse.press(button='left')
-                            time.sleep(0.02)  # 클릭 다운 유지
-                            mouse.release(button='left')
-                            
-                            # 지연
-                            if delay > 0:
-                                time.sleep(delay)
+                    # 기존 방식: 모든 셀 순회하며 감정 (제외된 셀과 감정 주문서 셀은 건너뜀)
+                    log.info("모든 셀에 감정 주문서 사용")
+                    select_stack(self.appraisal_scroll_cell)
+                    if token.cancelled:
+                        return
+                    self.engine.click_cells(plan.appraisal_cells, delay, jitter=0, cancel=token)
+                    # 실행 중지 확인
+                    if token.cancelled:
+                        return
             finally:
                 # 키보드 키 해제
                 keyboard.release('shift')
             
-            self.status_label.config(text="감정 주문서 매크로 실행 완료")
+            if unappraised_cells:
+                self._post_status(f"감정 주문서 소진 - {len(item_cells)}개 감정, "
+                                  f"{len(unappraised_cells)}개 남음")
+            elif skipped_cells:
+                self._post_status(f"감정 주문서 매크로 실행 완료 - {len(item_cells)}개 감정, "
+                                  f"{len(skipped_cells)}개 건너뜀")
+            elif item_cells or reference_profile is None:
+                self._post_status("감정 주문서 매크로 실행 완료")
         except Exception as e:
-            self.status_label.config(text=f"오류 발생: {str(e)}")
-            print(f"감정 주문서 매크로 실행 오류: {e}")
-            
-            # 오류 발생 시에도 키 해제
-            try:
-                keyboard.release('shift')
-            except:
-                pass
+            self._post_status(f"오류 발생: {str(e)}")
+            log.error(f"감정 주문서 매크로 실행 오류: {e}")
         finally:
-            # UI 상태 복원
-            self.is_appraisal_running = False
-            if self.minimize_window.get():
-                self.root.deiconify()
-                self.root.focus_force()
-            self.appraisal_run_btn.config(text=f"감정 주문 실행 ({self.appraisal_run_hotkey.upper()})")
-            self.appraisal_run_btn.config(state=tk.NORMAL)
-            self.run_btn.config(state=tk.NORMAL)
+            # 오류/중지 시에도 보조키 해제 (UI 복원은 MacroRunner가 _finish_run을 UI 스레드로 넘김)
+            self._release_modifiers()
             
     def stop_appraisal_macro(self):
         """감정 주문서 매크로 중지"""
-        print("감정 주문서 매크로 중지 함수 호출됨")
+        log.debug("감정 주문서 매크로 중지 함수 호출됨")
         if not self.is_appraisal_running:
-            print("이미 중지된 상태")
+            log.info("이미 중지된 상태")
             return
             
-        self.is_appraisal_running = False
         self.status_label.config(text="감정 주문서 매크로 중지됨")
         
-        # 키보드 키 해제
-        try:
-            keyboard.release('shift')
-        except:
-            pass
+        # 대기 중인 실행 스레드를 바로 깨우고 보조키 해제
+        self.runner.stop()
+        self._release_modifiers()
             
         # 버튼 텍스트 변경
         self.appraisal_run_btn.config(text=f"감정 주문 실행 ({self.appraisal_run_hotkey.upper()})")
@@ -1564,7 +1611,7 @@ class HardwareLevelDragMacro:
         # 인벤 정리 버튼 활성화
         self.run_btn.config(state=tk.NORMAL)
         
-        print("감정 주문서 매크로 중지 완료")
+        log.info("감정 주문서 매크로 중지 완료")
 
 # 앱 싱글 인스턴스 보장을 위한 클래스
 class SingleInstanceApp:
@@ -1574,16 +1621,16 @@ class SingleInstanceApp:
         try:
             # 5000 포트에 바인딩 시도
             self.lock_socket.bind(('localhost', 5000))
-            print("프로그램 새 인스턴스 시작됨")
+            log.info("프로그램 새 인스턴스 시작됨")
             self.is_running_already = False
         except socket.error:
-            print("이미 다른 인스턴스가 실행 중입니다")
+            log.info("이미 다른 인스턴스가 실행 중입니다")
             self.is_running_already = True
 
 # 메인 실행 부분
 if __name__ == "__main__":
     try:
-        print("하드웨어 수준 Path of Exile 클릭 매크로를 시작합니다...")
+        log.info("하드웨어 수준 Path of Exile 클릭 매크로를 시작합니다...")
         
         # 싱글 인스턴스 확인
         single_instance = SingleInstanceApp()
@@ -1596,7 +1643,7 @@ if __name__ == "__main__":
             sys.exit(0)
         
         # 프로그램 시작
-        print(f"단축키 정보: F6=매크로 실행, F7=매크로 중지, F1=감정 매크로 실행, F2=감정 매크로 중지")
+        log.info(f"단축키 정보: F6=매크로 실행, F7=매크로 중지, F1=감정 매크로 실행, F2=감정 매크로 중지")
         HardwareLevelDragMacro()
     except Exception as e:
         # 오류 로깅
@@ -1,14 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
 import time
-import json
-import os
 import threading
 import keyboard
-import mouse
-import pygetwindow as gw
 from PIL import ImageGrab, Image, ImageTk
 
+from poe_macro.config import CONFIG_FILE, load_config, save_config
+from poe_macro.engine import MacroEngine
+from poe_macro.window import find_game_window
+
 class HardwareLevelDragMacro:
     def __init__(self):
         self.start_pos = None
@@ -16,7 +16,8 @@ class HardwareLevelDragMacro:
         self.grid_width = 12
         self.grid_height = 5
         self.excluded_cells = []
-        self.config_file = "hardware_drag_macro_config.json"
+        self.config_file = CONFIG_FILE
+        self.engine = MacroEngine(self.grid_width, self.grid_height, jitter=0)  # 셀 중앙 클릭
         self.screenshot = None
         self.tk_image = None
         self.is_running = False
@@ -30,15 +31,11 @@ class HardwareLevelDragMacro:
     
     def load_config(self):
         """설정 파일 로드"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    self.start_pos = config.get('start_pos')
-                    self.end_pos = config.get('end_pos')
-                    self.excluded_cells = config.get('excluded_cells', [])
-            except Exception as e:
-                print(f"설정 로드 오류: {e}")
+        config = load_config(self.config_file)
+        self.start_pos = config.get('start_pos')
+        self.end_pos = config.get('end_pos')
+        # JSON에는 [x, y] 리스트로 저장되므로 (x, y) 튜플로 맞춤
+        self.excluded_cells = [tuple(cell) for cell in config.get('excluded_cells', [])]
     
     def save_config(self):
         """설정 파일 저장"""
@@ -47,30 +44,16 @@ class HardwareLevelDragMacro:
             'end_pos': self.end_pos,
             'excluded_cells': self.excluded_cells
         }
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-        except Exception as e:
-            print(f"설정 저장 오류: {e}")
+        save_config(self.config_file, config)
     
     def find_path_of_exile_window(self):
         """Path of Exile 창 찾기"""
         try:
-            # 'Path of Exile' 창 검색 (대소문자 무시)
-            poe_windows = [w for w in gw.getWindowsWithTitle('Path of Exile') if w.title.lower().startswith('path of exile')]
-            
-            if not poe_windows:
+            # 'Path of Exile' 창 검색 및 활성화
+            if find_game_window() is None:
                 messagebox.showwarning("경고", "Path of Exile 창을 찾을 수 없습니다.")
                 return False
             
-            # 첫 번째 창 활성화
-            poe_window = poe_windows[0]
-            poe_window.activate()
-            
-            # 창이 최소화되어 있다면 복원
-            if poe_window.isMinimized:
-                poe_window.restore()
-            
             return True
         except Exception as e:
             messagebox.showerror("오류", f"창 찾기 중 오류 발생: {e}")
@@ -446,13 +429,8 @@ class HardwareLevelDragMacro:
             # Ctrl 키 해제 (이전에 눌려있을 수 있음)
             keyboard.release('ctrl')
             
-            # 박스 크기
-            box_width = self.end_pos[0] - self.start_pos[0]
-            box_height = self.end_pos[1] - self.start_pos[1]
-            
-            # 셀 크기
-            cell_width = box_width / self.grid_width
-            cell_height = box_height / self.grid_height
+            # 영역/제외 셀이 바뀐 경우에만 그리드 계획을 새로 만듦
+            plan = self.engine.configure(self.start_pos, self.end_pos, self.excluded_cells)
             
             # 설정
             delay = self.click_delay.get()
@@ -464,34 +442,14 @@ class HardwareLevelDragMacro:
                 time.sleep(0.1)  # 키 입력 안정화를 위한 짧은 대기
             
             try:
-                # 각 셀 순회하며 클릭
-                for y in range(self.grid_height):
-                    for x in range(self.grid_width):
-                        # 실행 중지 확인
-                        if not self.is_running:
-                            return
-                            
-                        # 제외된 셀 건너뛰기
-                        if (x, y) in self.excluded_cells:
-                            continue
-                        
-                        # 클릭 좌표 계산 (셀 중앙)
-                        click_x = int(self.start_pos[0] + (x + 0.5) * cell_width)
-                        click_y = int(self.start_pos[1] + (y + 0.5) * cell_height)
-                        
-                        # 현재 마우스 위치 저장
-                        original_pos = mouse.get_position()
-                        
-                        # 하드웨어 수준 마우스 이동 및 클릭
-                        mouse.move(click_x, click_y)
-                        time.sleep(0.02)  # 마우스 이동 안정화
-                        mouse.press(button='left')
-                        time.sleep(0.02)  # 클릭 다운 유지
-                        mouse.release(button='left')
-                        
-                        # 지연
-                        if delay > 0:
-                            time.sleep(delay)
+                # 각 셀 순회하며 클릭 (제외된 셀 건너뜀)
+                self.engine.click_cells(
+                    plan.cells, delay,
+                    should_stop=lambda: not self.is_running
+                )
+                # 실행 중지 확인
+                if not self.is_running:
+                    return
             finally:
                 # Ctrl 키 해제
                 if use_ctrl:
@@ -0,0 +1,38 @@
+"""Path of Exile 인벤 매크로 공용 엔진 (Tk 없이 동작)"""
+
+from .capture import (
+    CaptureSource, GdiCapture, PilCapture, ArrayCapture, CaptureCache, create_capture,
+)
+from .detection import (
+    to_gray, cell_bright_ratios, cell_histograms, cell_edge_energy, detect_occupied_cells,
+    iter_occupied_rows, iter_occupied_cells, cells_bounding_rect, still_occupied_cells,
+)
+from .appraisal import AppraisalClassifier, cell_signatures, appraisal_classifier_path, load_appraisal_classifier
+from .cancel import CancelToken
+from .clicker import Clicker, RecordingMouse
+from .config import CONFIG_FILE, load_config, save_config
+from .engine import MacroEngine
+from .executor import ClickExecutor, ClickPlan, ClickReport, ClickTiming, InputBackend, RecordingInput, create_input_backend
+from .geometry import (
+    CLICK_JITTER, GridPlan, selection_region, drag_region, canvas_cell, cell_size, grid_cells,
+    random_click_point,
+)
+from .logger import get_logger, set_log_level, setup_logging, shutdown_logging
+from .hotkeys import HotkeyDispatcher, hotkey_name
+from .layouts import LAYOUT_PRESETS, LayoutProfile, load_layouts, layouts_config, next_layout
+from .pacing import ClickPacer
+from .pipeline import stream_cells
+from .precision import PrecisionTimer, precision_timer
+from .footprint import MAX_FOOTPRINT, iter_item_cells, seam_strengths
+from .route import ROUTE_METHODS, plan_route, route_length, travel_saving
+from .runner import MacroRunner, click_with_modifier, run_inventory_pass, wait_for_game
+from .scrolls import ScrollStacks, StackCountReader, appraise_cells, stack_digits
+from .timing import RunTimeline
+from .thumbnail import ThumbnailCache, make_thumbnail
+from .uiqueue import UiUpdateQueue
+from .readiness import wait_until_ready
+from .reference import (
+    ReferenceProfile, ReferenceStore, reference_profile_path, reference_image_path,
+    load_reference_profile,
+)
+from .window import find_game_window, is_game_focused
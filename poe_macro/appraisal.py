@@ -0,0 +1,206 @@
+import logging
+import os
+
+import numpy as np
+
+from .detection import BRIGHT_THRESHOLD, cell_edges, to_gray
+
+log = logging.getLogger(__name__)
+
+# 셀마다 한 변에 이 정도 픽셀만 뽑아서 계산 (특징은 통계값이라 전체 픽셀이 필요 없음)
+SAMPLE_SIZE = 16
+# 셀 가장자리 띠 두께 (셀 크기 대비 비율), 아이템 배경색은 아이콘 바깥 테두리에서 드러남
+RING_FRACTION = 0.15
+# 미감정 쪽 거리가 감정됨 쪽 거리의 이 배수 이하이면 감정 필요로 판정 (애매하면 클릭하는 쪽으로)
+UNCERTAIN_MARGIN = 1.2
+# 각 분류에 필요한 최소 학습 셀 수
+MIN_SAMPLES = 2
+
+FEATURE_NAMES = (
+    'mean_r', 'mean_g', 'mean_b', 'ring_r', 'ring_g', 'ring_b',
+    'saturation', 'bright_ratio', 'gray_std', 'edge_energy',
+)
+
+
+def _sample_positions(size, count):
+    """셀마다 고르게 뽑을 픽셀 위치 (결과: count x 셀당 표본 수), 감지와 같은 셀 경계 사용"""
+    edges = cell_edges(size, count)
+    cell_px = np.diff(edges)
+    if cell_px.min() == 0:
+        raise ValueError(f"이미지가 그리드보다 작습니다: {size} / {count}")
+    samples = min(SAMPLE_SIZE, int(cell_px.min()))
+    return edges[:-1, None] + ((np.arange(samples) + 0.5) * cell_px[:, None] / samples).astype(np.intp)
+
+
+def _rgb_blocks(image, grid_width, grid_height):
+    """셀마다 고르게 뽑은 픽셀 블록 (결과: 행, 열, 표본 높이, 표본 너비, 3)"""
+    if not isinstance(image, np.ndarray):
+        image = np.asarray(image.convert('RGB'))
+    rows = _sample_positions(image.shape[0], grid_height)
+    cols = _sample_positions(image.shape[1], grid_width)
+    return image[rows[:, None, :, None], cols[None, :, None, :], :3]
+
+
+def cell_signatures(image, grid_width, grid_height):
+    """
+    셀별 색상/특징 벡터 (결과: grid_height x grid_width x len(FEATURE_NAMES), 0~1 범위)
+
+    셀 전체 평균색, 가장자리 띠 평균색, 채도, 밝은 픽셀 비율, 밝기 표준편차, 윤곽 세기를
+    그리드 전체에 대해 한 번에 계산한다. 셀 안의 픽셀은 SAMPLE_SIZE 정도로 솎아서 사용한다.
+    """
+    blocks = _rgb_blocks(image, grid_width, grid_height)
+    cell_h, cell_w = blocks.shape[2:4]
+
+    # 셀마다 채널별 평면 (행, 열, 3, 픽셀 수)으로 모아 마지막 축만 줄이도록 함
+    planes = blocks.transpose(0, 1, 4, 2, 3).reshape(grid_height, grid_width, 3, cell_h * cell_w)
+    sums = planes.sum(axis=-1, dtype=np.float64)
+    mean_rgb = sums / (cell_h * cell_w)
+
+    # 가장자리 띠 = 셀 전체 - 안쪽 사각형
+    ring_h = max(int(cell_h * RING_FRACTION), 1)
+    ring_w = max(int(cell_w * RING_FRACTION), 1)
+    inner = blocks[:, :, ring_h:cell_h - ring_h, ring_w:cell_w - ring_w]
+    inner_count = inner.shape[2] * inner.shape[3]
+    ring_count = cell_h * cell_w - inner_count
+    if ring_count > 0:
+        inner_sums = inner.transpose(0, 1, 4, 2, 3).reshape(grid_height, grid_width, 3, -1).sum(
+            axis=-1, dtype=np.float64)
+        ring_rgb = (sums - inner_sums) / ring_count
+    else:
+        ring_rgb = mean_rgb
+
+    r, g, b = planes[:, :, 0], planes[:, :, 1], planes[:, :, 2]
+    saturation = (np.maximum(np.maximum(r, g), b) - np.minimum(np.minimum(r, g), b)).mean(axis=-1)
+
+    gray = to_gray(blocks)
+    bright_ratio = (gray > BRIGHT_THRESHOLD).reshape(grid_height, grid_width, -1).mean(axis=-1)
+    gray = gray.astype(np.float32)
+    gray_std = gray.reshape(grid_height, grid_width, -1).std(axis=-1)
+    # 셀 안쪽 밝기 기울기만 (이웃 셀과의 경계는 제외)
+    edges = np.zeros((grid_height, grid_width))
+    if cell_w > 1:
+        edges += np.abs(np.diff(gray, axis=3)).reshape(grid_height, grid_width, -1).mean(axis=-1)
+    if cell_h > 1:
+        edges += np.abs(np.diff(gray, axis=2)).reshape(grid_height, grid_width, -1).mean(axis=-1)
+
+    features = np.concatenate([
+        mean_rgb / 255, ring_rgb / 255,
+        np.stack([saturation / 255, bright_ratio, gray_std / 128, edges / 255], axis=-1),
+    ], axis=-1)
+    return features.astype(np.float32)
+
+
+class AppraisalClassifier:
+    """
+    감정이 필요한(미감정) 아이템 셀 판별기
+
+    미감정/감정됨 아이템 셀의 특징 벡터를 학습해 두고, 특징별 표준편차로 정규화한 공간에서
+    더 가까운 쪽 중심으로 판정한다. 두 분류 모두 학습되기 전에는 모든 셀을 감정 대상으로 본다.
+
+    :param unidentified: 미감정 아이템 셀 특징 (N x 특징 수)
+    :param identified: 감정된 아이템 셀 특징 (M x 특징 수)
+    """
+
+    def __init__(self, unidentified=None, identified=None):
+        size = len(FEATURE_NAMES)
+        self.unidentified = np.empty((0, size), np.float32) if unidentified is None else unidentified
+        self.identified = np.empty((0, size), np.float32) if identified is None else identified
+        self._fit()
+
+    def _fit(self):
+        self._centers = None
+        if not self.trained:
+            return
+        pooled = np.concatenate([self.unidentified - self.unidentified.mean(axis=0),
+                                 self.identified - self.identified.mean(axis=0)])
+        # 학습 셀이 적어 표준편차가 0인 특징이 판정을 독차지하지 않도록 하한을 둠
+        self._scale = np.maximum(pooled.std(axis=0), 0.02)
+        self._centers = (self.unidentified.mean(axis=0) / self._scale,
+                         self.identified.mean(axis=0) / self._scale)
+
+    @property
+    def trained(self):
+        return len(self.unidentified) >= MIN_SAMPLES and len(self.identified) >= MIN_SAMPLES
+
+    def add(self, image, cells, unidentified, grid_width, grid_height):
+        """
+        캡처에서 지정한 셀들을 한 분류의 학습 데이터로 추가
+
+        :param unidentified: True면 미감정, False면 감정됨
+        :return: 추가한 셀 수
+        """
+        if not cells:
+            return 0
+        features = cell_signatures(image, grid_width, grid_height)
+        xs = np.array([x for x, _ in cells], dtype=np.intp)
+        ys = np.array([y for _, y in cells], dtype=np.intp)
+        samples = features[ys, xs]
+        if unidentified:
+            self.unidentified = np.concatenate([self.unidentified, samples])
+        else:
+            self.identified = np.concatenate([self.identified, samples])
+        self._fit()
+        return len(cells)
+
+    def needs_appraisal(self, features):
+        """
+        특징 배열(... x 특징 수)에서 감정이 필요한 셀 마스크
+
+        학습 전이면 모두 True
+        """
+        if self._centers is None:
+            return np.ones(features.shape[:-1], dtype=bool)
+        scaled = features / self._scale
+        to_unidentified = np.linalg.norm(scaled - self._centers[0], axis=-1)
+        to_identified = np.linalg.norm(scaled - self._centers[1], axis=-1)
+        return to_unidentified <= to_identified * UNCERTAIN_MARGIN
+
+    def filter_cells(self, image, cells, grid_width, grid_height, skipped=None):
+        """
+        감정이 필요한 셀만 순서대로 yield (감지 결과 생성기도 그대로 받음)
+
+        :param skipped: 건너뛴 셀을 추가할 리스트 (로그/상태 표시용)
+        """
+        if not self.trained:
+            yield from cells
+            return
+        mask = self.needs_appraisal(cell_signatures(image, grid_width, grid_height))
+        for x, y in cells:
+            if mask[y, x]:
+                yield (x, y)
+            elif skipped is not None:
+                skipped.append((x, y))
+
+    def clear(self):
+        self.__init__()
+
+    def save(self, path):
+        np.savez_compressed(path, unidentified=self.unidentified, identified=self.identified)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['unidentified'], data['identified'])
+
+
+def appraisal_classifier_path(config_file, screen_size, layout=None):
+    """
+    설정 파일 옆에 해상도/레이아웃별로 저장되는 판별기 학습 데이터 경로
+
+    특징은 셀 크기와 무관한 비율이라 영역을 다시 선택해도 그대로 사용한다.
+    """
+    base = os.path.splitext(os.path.abspath(config_file))[0]
+    if layout:
+        base = f"{base}_{layout}"
+    return f"{base}_appraisal_{screen_size[0]}x{screen_size[1]}.npz"
+
+
+def load_appraisal_classifier(config_file, screen_size, layout=None):
+    """저장된 학습 데이터로 판별기 생성 (없거나 읽을 수 없으면 학습 전 판별기)"""
+    path = appraisal_classifier_path(config_file, screen_size, layout)
+    if os.path.exists(path):
+        try:
+            return AppraisalClassifier.load(path)
+        except Exception as e:
+            log.error(f"감정 판별기 로드 오류: {e}")
+    return AppraisalClassifier()
@@ -0,0 +1,314 @@
+"""
+헤드리스 벤치마크 (Tk/디스플레이/실제 입력 불필요)
+
+    python -m poe_macro.bench                           # 합성 인벤토리로 1080p/1440p/4K 측정
+    python -m poe_macro.bench --frames shots            # 녹화한 스크린샷 재생
+    python -m poe_macro.bench --layout quad             # 쿼드 창고(24x24) 측정
+    python -m poe_macro.bench --save bench_base.json    # 결과 저장
+    python -m poe_macro.bench --baseline bench_base.json --threshold 0.25
+
+합성 인벤토리는 실제 게임처럼 그리드로 나누어 떨어지지 않는 영역 크기를 쓰고,
+감지 결과가 실제 점유와 다른 셀이 있으면 '감지 오류'를 출력하고 실패(1)로 끝난다.
+
+녹화한 스크린샷은 해상도별 하위 폴더(예: shots/1080p/)에 빈 인벤토리 empty.png와
+아이템이 있는 인벤토리 이미지(*.png)를 넣어 둔다. 창고 레이아웃은 shots/1080p/quad/ 처럼 한 단계 더 나눈다.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .capture import ArrayCapture, CaptureCache
+from .clicker import Clicker, RecordingMouse
+from .detection import cell_edges, to_gray
+from .engine import MacroEngine
+from .executor import ClickExecutor, ClickPlan, ClickTiming, RecordingInput
+from .layouts import LAYOUT_INVENTORY, LAYOUT_PRESETS
+from .reference import ReferenceProfile
+from .route import ROUTE_NEAREST, plan_route
+from .thumbnail import make_thumbnail
+
+# 해상도별 화면 크기와 인벤토리 영역 크기(px), 실제 게임처럼 그리드로 나누어 떨어지지 않음
+# 창고 레이아웃은 인벤토리와 같은 너비의 정사각형 영역 (쿼드 창고 셀은 실수 크기)
+RESOLUTIONS = {
+    '1080p': ((1920, 1080), (633, 264)),
+    '1440p': ((2560, 1440), (844, 352)),
+    '4k': ((3840, 2160), (1262, 527)),
+}
+
+# 미리보기 캔버스 크기 (미리보기 축소 비용 측정용)
+PREVIEW_SIZE = (280, 117)
+
+# 이 값(ms)보다 작은 차이는 회귀로 보지 않음 (측정 잡음)
+MIN_REGRESSION_MS = 0.05
+
+
+def _no_sleep(seconds):
+    pass
+
+
+def _no_wait(deadline, cancel=None):
+    return False
+
+
+def synthetic_frames(size, grid_width=12, grid_height=5, occupancy=0.5, count=4, seed=0, masks=None):
+    """
+    합성 인벤토리 프레임 생성
+
+    :param size: 영역 (너비, 높이) px, 그리드로 나누어 떨어지지 않아도 됨 (셀 경계는 GridPlan과 같음)
+    :param masks: 프레임별 실제 점유 마스크를 추가할 리스트 (감지 정확도 확인용)
+    :return: (빈 인벤토리, 아이템이 있는 프레임 목록)
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    row_edges = cell_edges(height, grid_height)
+    col_edges = cell_edges(width, grid_width)
+    empty = rng.integers(10, 40, (height, width, 3), dtype=np.uint8)
+    empty[row_edges[:-1]] = 45
+    empty[:, col_edges[:-1]] = 45
+
+    frames = []
+    for _ in range(count):
+        frame = empty.copy()
+        occupied = rng.random((grid_height, grid_width)) < occupancy
+        for y, x in zip(*np.nonzero(occupied)):
+            top, bottom = row_edges[y], row_edges[y + 1]
+            left, right = col_edges[x], col_edges[x + 1]
+            margin_y, margin_x = (bottom - top) // 8, (right - left) // 8
+            top, bottom, left, right = top + margin_y, bottom - margin_y, left + margin_x, right - margin_x
+            frame[top:bottom, left:right] = rng.integers(60, 220, (bottom - top, right - left, 3),
+                                                         dtype=np.uint8)
+        frames.append(frame)
+        if masks is not None:
+            masks.append(occupied)
+    return empty, frames
+
+
+def region_size(inventory_size, grid_width, grid_height):
+    """레이아웃별 합성 영역 크기 (창고는 인벤토리와 같은 너비, 셀이 거의 정사각형이 되는 높이)"""
+    width, height = inventory_size
+    if (grid_width, grid_height) == (12, 5):
+        return width, height
+    return width, width * grid_height // grid_width + 1
+
+
+def recorded_frames(directory):
+    """녹화한 스크린샷 폴더에서 (빈 인벤토리, 프레임 목록) 로드"""
+    empty_path = os.path.join(directory, 'empty.png')
+    paths = sorted(p for p in glob.glob(os.path.join(directory, '*.png')) if p != empty_path)
+    if not os.path.exists(empty_path) or not paths:
+        raise ValueError(f"empty.png와 인벤토리 이미지가 필요합니다: {directory}")
+    return ArrayCapture._load(empty_path), [ArrayCapture._load(p) for p in paths]
+
+
+def _measure(fn, iterations, warmup):
+    """반복 실행하여 소요 시간(ms) 목록과 최대 메모리 할당량(KiB) 반환"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - started) / 1e6)
+
+    # 할당량은 시간 측정과 따로 한 번만 추적 (tracemalloc이 실행을 느리게 하므로)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples = np.array(samples)
+    return {
+        'p50': float(np.percentile(samples, 50)),
+        'p90': float(np.percentile(samples, 90)),
+        'p99': float(np.percentile(samples, 99)),
+        'mean': float(samples.mean()),
+        'peak_kib': peak / 1024,
+    }
+
+
+def detection_errors(empty, frames, masks, grid_width=12, grid_height=5):
+    """합성 프레임의 실제 점유 마스크와 감지 결과가 다른 셀 수 (셀 경계가 클릭 위치와 어긋나면 늘어남)"""
+    height, width = empty.shape[:2]
+    profile = ReferenceProfile.from_image(empty, (0, 0), (width, height), (width, height),
+                                          grid_width, grid_height)
+    return sum(int((profile.detect(frame) != mask).sum()) for frame, mask in zip(frames, masks))
+
+
+def bench_resolution(screen_size, empty, frames, iterations=50, warmup=3, grid_width=12, grid_height=5):
+    """해상도 하나에 대한 단계별 측정 결과"""
+    height, width = empty.shape[:2]
+    region = (0, 0, width, height)
+    profile = ReferenceProfile.from_image(empty, region[:2], region[2:], screen_size,
+                                          grid_width, grid_height)
+
+    # 첫 캡처는 아이템 프레임, 확인용 재캡처는 빈 인벤토리 (클릭이 모두 성공한 경우)
+    mouse = RecordingMouse()
+    capture = ArrayCapture(frames + [empty], region)
+    engine = MacroEngine(grid_width, grid_height, capture=CaptureCache(lambda r: capture),
+                         clicker=Clicker(mouse, sleep=_no_sleep))
+    engine.configure(region[:2], region[2:])
+    cell_width, cell_height = engine.cell_size
+
+    state = {'frame': 0}
+
+    def next_frame():
+        frame = frames[state['frame'] % len(frames)]
+        state['frame'] += 1
+        return frame
+
+    def full_pass():
+        # 캡처 → 감지 → 클릭 순서 → 클릭 → 확인 (_run_macro_thread의 대기 시간 제외 경로)
+        capture.index = state['frame'] % len(frames)
+        state['frame'] += 1
+        frame = engine.grab()
+        cells = list(profile.iter_occupied(frame))
+        ordered = plan_route(cells, ROUTE_NEAREST, cell_width, cell_height)
+        clicked = engine.click_cells(ordered, 0)
+        if clicked:
+            capture.index = len(frames)
+            engine.retry_uncleared(profile, clicked, retries=0, settle_delay=0)
+        mouse.events.clear()
+
+    cells_by_frame = [list(profile.iter_occupied(frame)) for frame in frames]
+
+    # 클릭 실행기: 대기 없이 스레드 전달 + 입력 묶음 구성 비용만 측정
+    recorder = RecordingInput()
+    executor = ClickExecutor(recorder, wait_until=_no_wait)
+    points = [engine.click_point(x, y) for x, y in cells_by_frame[0]]
+    no_delay = ClickTiming(0, 0, 0)
+
+    def executor_pass():
+        executor.run(ClickPlan(points, timing=no_delay))
+        recorder.clear()
+
+    stages = {
+        'capture': lambda: capture.grab(),
+        'gray': lambda: to_gray(next_frame()),
+        'detect': lambda: profile.detect(next_frame()),
+        'iter_occupied': lambda: list(profile.iter_occupied(next_frame())),
+        'route': lambda: plan_route(cells_by_frame[state['frame'] % len(frames)], ROUTE_NEAREST,
+                                    cell_width, cell_height),
+        'click_loop': lambda: (engine.click_cells(cells_by_frame[0], 0), mouse.events.clear()),
+        'click_executor': executor_pass,
+        'preview': lambda: make_thumbnail(next_frame(), PREVIEW_SIZE),
+        'full_pass': full_pass,
+    }
+    try:
+        return {name: _measure(fn, iterations, warmup) for name, fn in stages.items()}
+    finally:
+        executor.close()
+
+
+def run_benchmark(frames_dir=None, resolutions=None, iterations=50, warmup=3, layout=LAYOUT_INVENTORY,
+                  errors=None):
+    """
+    해상도별 벤치마크 실행
+
+    :param frames_dir: 녹화한 스크린샷 폴더 (없으면 합성 프레임)
+    :param layout: LAYOUT_PRESETS 중 하나 (인벤토리가 아니면 결과 키에 레이아웃 이름이 붙음)
+    :param errors: 합성 프레임에서 감지가 틀린 셀 수를 기록할 딕셔너리 {해상도: 셀 수}
+    :return: {해상도: {단계: 통계}}
+    """
+    _, grid_width, grid_height = LAYOUT_PRESETS[layout]
+    results = {}
+    for name in resolutions or RESOLUTIONS:
+        screen_size, inventory_size = RESOLUTIONS[name]
+        key = name if layout == LAYOUT_INVENTORY else f"{name}/{layout}"
+        if frames_dir:
+            directory = os.path.join(frames_dir, key)
+            if not os.path.isdir(directory):
+                print(f"{name}: 스크린샷 폴더 없음, 건너뜀 ({directory})")
+                continue
+            empty, frames = recorded_frames(directory)
+        else:
+            masks = []
+            empty, frames = synthetic_frames(region_size(inventory_size, grid_width, grid_height),
+                                             grid_width, grid_height, masks=masks)
+            if errors is not None:
+                errors[key] = detection_errors(empty, frames, masks, grid_width, grid_height)
+        results[key] = bench_resolution(screen_size, empty, frames, iterations, warmup,
+                                        grid_width, grid_height)
+    return results
+
+
+def find_regressions(results, baseline, threshold=0.25, stat='p50'):
+    """
+    기준 결과 대비 느려진 단계 목록
+
+    :param threshold: 허용 비율 (0.25 = 25%까지 허용)
+    :return: (해상도, 단계, 기준 ms, 현재 ms) 목록
+    """
+    regressions = []
+    for name, stages in results.items():
+        for stage, stats in stages.items():
+            base = baseline.get(name, {}).get(stage)
+            if base is None:
+                continue
+            limit = base[stat] * (1 + threshold)
+            if stats[stat] > limit and stats[stat] - base[stat] > MIN_REGRESSION_MS:
+                regressions.append((name, stage, base[stat], stats[stat]))
+    return regressions
+
+
+def format_results(results):
+    lines = []
+    for name, stages in results.items():
+        lines.append(f"[{name}]")
+        lines.append(f"  {'단계':<14}{'p50':>9}{'p90':>9}{'p99':>9}{'할당(KiB)':>12}")
+        for stage, stats in stages.items():
+            lines.append(f"  {stage:<14}{stats['p50']:>9.3f}{stats['p90']:>9.3f}"
+                         f"{stats['p99']:>9.3f}{stats['peak_kib']:>12.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="인벤 매크로 감지/클릭 경로 벤치마크 (단위: ms)")
+    parser.add_argument('--frames', help="해상도별 하위 폴더에 녹화한 스크린샷이 있는 폴더")
+    parser.add_argument('--resolution', action='append', choices=sorted(RESOLUTIONS),
+                        help="측정할 해상도 (여러 번 지정 가능, 기본값: 전체)")
+    parser.add_argument('--layout', choices=sorted(LAYOUT_PRESETS), default=LAYOUT_INVENTORY,
+                        help="측정할 그리드 레이아웃 (기본값: inventory)")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--save', help="결과를 JSON으로 저장할 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="기준 대비 허용 지연 비율 (기본값 0.25)")
+    args = parser.parse_args(argv)
+
+    errors = {}
+    results = run_benchmark(args.frames, args.resolution, args.iterations, args.warmup, args.layout, errors)
+    print(format_results(results))
+    for name, count in errors.items():
+        if count:
+            print(f"감지 오류: {name} {count}개 셀이 실제 점유와 다름")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"결과 저장: {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, stage, base, current in regressions:
+            print(f"성능 저하: {name} {stage} {base:.3f}ms → {current:.3f}ms")
+        if regressions:
+            return 1
+        print("기준 대비 성능 저하 없음")
+    return 1 if any(errors.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
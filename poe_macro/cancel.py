@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class CancelToken:
+    """
+    실행 하나의 취소 신호 (threading.Event 기반)
+
+    sleep()은 취소되는 즉시 깨어나므로 클릭 간격이나 창 전환 대기 중에도 바로 멈출 수 있다.
+    토큰 자체를 호출하면 취소 여부를 반환하므로 should_stop 인자로 그대로 넘길 수 있다.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.cancelled_at = None  # 취소 요청 시각 (perf_counter)
+        self.finished_at = None  # 실행 스레드가 정리를 마친 시각
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def __call__(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """취소 요청 (여러 번 호출해도 첫 요청 시각 유지)"""
+        if not self._event.is_set():
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+
+    def sleep(self, seconds):
+        """
+        취소되지 않는 동안만 대기
+
+        :return: 취소되었으면 True
+        """
+        if seconds <= 0:
+            return self._event.is_set()
+        return self._event.wait(seconds)
+
+    def finish(self):
+        """
+        실행 종료 기록 (실행 스레드의 정리 단계 끝에서 호출)
+
+        :return: 취소 요청부터 정지까지 걸린 시간(초), 취소되지 않았으면 None
+        """
+        self.finished_at = time.perf_counter()
+        return self.stop_latency
+
+    @property
+    def stop_latency(self):
+        if self.cancelled_at is None or self.finished_at is None:
+            return None
+        return max(self.finished_at - self.cancelled_at, 0.0)
@@ -0,0 +1,234 @@
+import logging
+import sys
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class CaptureSource:
+    """
+    화면 영역 캡처 기본 클래스
+
+    grab()은 미리 할당한 버퍼를 재사용하므로, 반환된 배열은 다음 grab() 호출 시 덮어써진다.
+    결과를 보관해야 하면 호출 측에서 복사할 것.
+    """
+
+    def __init__(self, region):
+        left, top, right, bottom = (int(v) for v in region)
+        self.region = (left, top, right, bottom)
+        self.width = right - left
+        self.height = bottom - top
+        if self.width <= 0 or self.height <= 0:
+            raise ValueError(f"잘못된 캡처 영역: {region}")
+        # BGRA 순서 (GDI DIB 형식과 동일)
+        self.buffer = np.empty((self.height, self.width, 4), dtype=np.uint8)
+
+    def grab(self):
+        """영역을 버퍼에 캡처하고 RGB 뷰(높이 x 너비 x 3, 복사 없음) 반환"""
+        self._grab_into(self.buffer)
+        return self.buffer[..., 2::-1]
+
+    def grab_rect(self, rect):
+        """
+        영역 내부의 일부 사각형만 다시 캡처하여 버퍼의 해당 부분만 갱신
+
+        :param rect: 캡처 영역 기준 (left, top, right, bottom) 픽셀 좌표
+        :return: 전체 RGB 뷰 (rect 밖은 이전 캡처 내용 유지)
+        """
+        left, top, right, bottom = self._clip_rect(rect)
+        if right > left and bottom > top:
+            self._grab_rect_into(self.buffer, (left, top, right, bottom))
+        return self.buffer[..., 2::-1]
+
+    def _clip_rect(self, rect):
+        left, top, right, bottom = (int(v) for v in rect)
+        return (max(left, 0), max(top, 0), min(right, self.width), min(bottom, self.height))
+
+    def _grab_into(self, buffer):
+        raise NotImplementedError
+
+    def _grab_rect_into(self, buffer, rect):
+        # 기본 구현: 전체를 다시 캡처
+        self._grab_into(buffer)
+
+    def close(self):
+        """캡처 리소스 해제"""
+        pass
+
+
+class GdiCapture(CaptureSource):
+    """Windows GDI BitBlt/GetDIBits로 버퍼에 직접 캡처 (PIL 이미지 생성 없음)"""
+
+    # CAPTUREBLT는 쓰지 않음: 계층 창(영역 선택 오버레이 등)이 캡처에 섞이지 않고,
+    # 빈 인벤토리 기준 캡처와 실행 중 캡처가 모두 이 경로를 사용하므로 같은 화면 내용을 비교함
+    SRCCOPY = 0x00CC0020
+    DIB_RGB_COLORS = 0
+
+    def __init__(self, region):
+        super().__init__(region)
+        import ctypes
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [
+                ('biSize', wintypes.DWORD), ('biWidth', wintypes.LONG),
+                ('biHeight', wintypes.LONG), ('biPlanes', wintypes.WORD),
+                ('biBitCount', wintypes.WORD), ('biCompression', wintypes.DWORD),
+                ('biSizeImage', wintypes.DWORD), ('biXPelsPerMeter', wintypes.LONG),
+                ('biYPelsPerMeter', wintypes.LONG), ('biClrUsed', wintypes.DWORD),
+                ('biClrImportant', wintypes.DWORD),
+            ]
+
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._gdi32 = ctypes.windll.gdi32
+
+        # 64비트에서 핸들이 잘리지 않도록 타입 지정
+        self._user32.GetDC.restype = wintypes.HDC
+        self._user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self._gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self._gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self._gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        self._gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        self._gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self._gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self._gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                       ctypes.c_int, wintypes.HDC, ctypes.c_int, ctypes.c_int,
+                                       wintypes.DWORD]
+        self._gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT,
+                                          wintypes.UINT, ctypes.c_void_p, ctypes.c_void_p,
+                                          wintypes.UINT]
+        self._gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self._gdi32.DeleteDC.argtypes = [wintypes.HDC]
+
+        self._screen_dc = self._user32.GetDC(None)
+        self._mem_dc = self._gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = self._gdi32.CreateCompatibleBitmap(self._screen_dc, self.width, self.height)
+        self._gdi32.SelectObject(self._mem_dc, self._bitmap)
+
+        # 음수 높이 = 위에서 아래 순서 (배열 행 순서와 동일)
+        self._bmi = BITMAPINFOHEADER()
+        self._bmi.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        self._bmi.biWidth = self.width
+        self._bmi.biHeight = -self.height
+        self._bmi.biPlanes = 1
+        self._bmi.biBitCount = 32
+        self._bmi.biCompression = 0  # BI_RGB
+
+    def _grab_into(self, buffer):
+        self._grab_rect_into(buffer, (0, 0, self.width, self.height))
+
+    def _grab_rect_into(self, buffer, rect):
+        # 화면 읽기(BitBlt)는 요청한 사각형만, 메모리 복사(GetDIBits)는 전체 비트맵
+        left, top, right, bottom = rect
+        if not self._gdi32.BitBlt(self._mem_dc, left, top, right - left, bottom - top,
+                                  self._screen_dc, self.region[0] + left, self.region[1] + top,
+                                  self.SRCCOPY):
+            raise OSError("BitBlt 실패")
+        lines = self._gdi32.GetDIBits(
+            self._mem_dc, self._bitmap, 0, self.height,
+            buffer.ctypes.data, self._ctypes.byref(self._bmi), self.DIB_RGB_COLORS)
+        if lines != self.height:
+            raise OSError("GetDIBits 실패")
+
+    def close(self):
+        if self._bitmap:
+            self._gdi32.DeleteObject(self._bitmap)
+            self._bitmap = None
+        if self._mem_dc:
+            self._gdi32.DeleteDC(self._mem_dc)
+            self._mem_dc = None
+        if self._screen_dc:
+            self._user32.ReleaseDC(None, self._screen_dc)
+            self._screen_dc = None
+
+
+class PilCapture(CaptureSource):
+    """PIL ImageGrab 기반 캡처 (GDI를 쓸 수 없는 환경용)"""
+
+    def _grab_into(self, buffer):
+        self._grab_rect_into(buffer, (0, 0, self.width, self.height))
+
+    def _grab_rect_into(self, buffer, rect):
+        from PIL import ImageGrab
+        left, top, right, bottom = rect
+        bbox = (self.region[0] + left, self.region[1] + top,
+                self.region[0] + right, self.region[1] + bottom)
+        image = np.asarray(ImageGrab.grab(bbox).convert('RGB'))
+        buffer[top:bottom, left:right, 2::-1] = image
+        buffer[top:bottom, left:right, 3] = 255
+
+
+class ArrayCapture(CaptureSource):
+    """
+    배열 또는 이미지 파일을 순서대로 돌려주는 가짜 캡처 (테스트/벤치마크용, 디스플레이 불필요)
+
+    :param frames: RGB 배열, PIL 이미지 또는 이미지 파일 경로 목록
+    """
+
+    def __init__(self, frames, region=None):
+        self.frames = [self._load(frame) for frame in frames]
+        if not self.frames:
+            raise ValueError("프레임이 없습니다")
+        height, width = self.frames[0].shape[:2]
+        super().__init__(region or (0, 0, width, height))
+        self.index = 0
+
+    @staticmethod
+    def _load(frame):
+        if isinstance(frame, np.ndarray):
+            return frame[..., :3]
+        from PIL import Image
+        if isinstance(frame, str):
+            with Image.open(frame) as img:
+                return np.asarray(img.convert('RGB'))
+        return np.asarray(frame.convert('RGB'))
+
+    def _grab_into(self, buffer):
+        self._grab_rect_into(buffer, (0, 0, self.width, self.height))
+
+    def _grab_rect_into(self, buffer, rect):
+        left, top, right, bottom = rect
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        buffer[top:bottom, left:right, 2::-1] = frame[top:bottom, left:right]
+        buffer[top:bottom, left:right, 3] = 255
+
+
+def create_capture(region):
+    """플랫폼에 맞는 캡처 백엔드 생성 (Windows는 GDI 직접 캡처)"""
+    if sys.platform == 'win32':
+        try:
+            return GdiCapture(region)
+        except Exception as e:
+            log.error(f"GDI 캡처 초기화 오류, PIL 캡처 사용: {e}")
+    return PilCapture(region)
+
+
+class CaptureCache:
+    """영역이 바뀔 때만 캡처 백엔드를 새로 만들어 버퍼를 재사용"""
+
+    def __init__(self, factory=create_capture):
+        self.factory = factory
+        self.source = None
+
+    def get(self, region):
+        region = tuple(int(v) for v in region)
+        if self.source is None or self.source.region != region:
+            self.close()
+            self.source = self.factory(region)
+        return self.source
+
+    def grab(self, region):
+        """영역 캡처 (버퍼 재사용)"""
+        return self.get(region).grab()
+
+    def grab_rect(self, region, rect):
+        """영역 내부 사각형만 다시 캡처 (같은 버퍼 재사용)"""
+        return self.get(region).grab_rect(rect)
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
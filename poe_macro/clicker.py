@@ -0,0 +1,93 @@
+from .pacing import MOVE_SETTLE, PRESS_HOLD
+from .precision import precision_timer
+
+
+class Clicker:
+    """
+    하드웨어 수준 마우스 이동 및 클릭
+
+    :param backend: move(x, y), press(button=), release(button=)를 가진 객체 (기본값 mouse 모듈)
+    :param sleep: 대기 함수 (벤치마크에서 대기 시간을 빼고 측정할 때 교체, 기본값 timer.sleep)
+    :param timer: PrecisionTimer (기본값: 공용 타이머)
+    """
+
+    def __init__(self, backend=None, sleep=None, timer=None):
+        self._backend = backend
+        self.timer = timer or precision_timer
+        self.sleep = sleep or self.timer.sleep
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            import mouse
+            self._backend = mouse
+        return self._backend
+
+    def click(self, x, y, button='left', pacer=None, cancel=None):
+        """
+        지정한 화면 좌표 클릭
+
+        :param pacer: 타이밍 자동 조절 객체 (없으면 고정 대기 시간 사용)
+        :param cancel: CancelToken (대기 중 취소되면 바로 깨어나고, 누르기 전에 취소되면 누르지 않음)
+        :return: 클릭 결과 확인 샘플을 뜰 차례인지 여부
+        """
+        backend = self.backend
+        sleep = (lambda seconds: self.timer.sleep(seconds, cancel)) if cancel is not None else self.sleep
+        pressed = []
+
+        def press():
+            if cancel is not None and cancel.cancelled:
+                return
+            backend.press(button=button)
+            pressed.append(True)
+
+        def release():
+            # 누른 버튼은 취소되더라도 항상 뗌
+            if pressed:
+                backend.release(button=button)
+
+        if pacer is not None:
+            return pacer.click(lambda: backend.move(x, y), press, release, sleep=sleep)
+
+        backend.move(x, y)
+        sleep(MOVE_SETTLE)
+        press()
+        sleep(PRESS_HOLD)
+        release()
+        return False
+
+    def position(self):
+        """현재 커서 위치"""
+        return self.backend.get_position()
+
+
+class RecordingMouse:
+    """실제 입력 없이 호출만 기록하는 가짜 마우스 (벤치마크/테스트용)"""
+
+    def __init__(self):
+        self.events = []  # (동작, 인자) 목록
+        self.x = self.y = 0
+
+    def move(self, x, y):
+        self.x, self.y = x, y
+        self.events.append(('move', (x, y)))
+
+    def press(self, button='left'):
+        self.events.append(('press', button))
+
+    def release(self, button='left'):
+        self.events.append(('release', button))
+
+    def get_position(self):
+        return (self.x, self.y)
+
+    def clicks(self):
+        """클릭한 좌표 목록 (누름 직전 이동 위치)"""
+        points = []
+        position = None
+        for action, value in self.events:
+            if action == 'move':
+                position = value
+            elif action == 'press':
+                points.append(position)
+        return points
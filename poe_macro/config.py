@@ -0,0 +1,36 @@
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+# 모든 매크로 GUI가 함께 쓰는 설정 파일
+CONFIG_FILE = "hardware_drag_macro_config.json"
+
+
+def load_config(path=CONFIG_FILE):
+    """설정 파일 로드 (없거나 읽을 수 없으면 빈 딕셔너리)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        log.error(f"설정 로드 오류: {e}")
+        return {}
+
+
+def save_config(path, values):
+    """
+    설정 파일 저장
+
+    GUI마다 사용하는 키가 다르므로 기존 파일 내용에 덮어쓰는 방식으로 저장하여
+    다른 GUI의 설정이 지워지지 않도록 한다.
+    """
+    config = load_config(path)
+    config.update(values)
+    try:
+        with open(path, 'w') as f:
+            json.dump(config, f)
+    except Exception as e:
+        log.error(f"설정 저장 오류: {e}")
@@ -0,0 +1,261 @@
+import numpy as np
+
+# 밝은 픽셀 판정 임계값 (compare_cell_images와 동일)
+BRIGHT_THRESHOLD = 50
+# 현재 셀의 밝은 픽셀 비율이 이 값보다 커야 아이템으로 간주
+MIN_CURRENT_RATIO = 0.2
+# 빈 인벤토리 대비 밝은 픽셀 비율 증가량
+MIN_RATIO_DIFF = 0.15
+# 솎아서 계산할 때 셀 한 변의 표본 수 (samples 인자로 요청할 때만 사용)
+# 근사값이라 무늬가 많은 셀에서는 정확한 비율과 최대 0.04 정도 차이가 나서 기본 감지에는 쓰지 않음
+RATIO_SAMPLES = 24
+
+
+def to_gray(image):
+    """PIL 이미지 또는 배열을 uint8 흑백 배열로 변환 (PIL 'L' 변환과 동일한 가중치)"""
+    if not isinstance(image, np.ndarray):
+        return np.asarray(image.convert('L'))
+
+    if image.ndim == 2:
+        return image
+
+    # RGB(A) 배열: PIL과 같은 16비트 고정소수점 가중치 (제자리 연산으로 중간 배열 최소화)
+    gray = image[..., 0].astype(np.uint32)
+    gray *= 19595
+    channel = image[..., 1].astype(np.uint32)
+    channel *= 38470
+    gray += channel
+    np.multiply(image[..., 2], 7471, out=channel, dtype=np.uint32)
+    gray += channel
+    gray += 0x8000
+    gray >>= 16
+    return gray.astype(np.uint8)
+
+
+def cell_edges(size, count):
+    """
+    길이 size를 count칸으로 나눈 경계 픽셀 (count + 1개)
+
+    GridPlan의 셀 사각형(int(x * cell_width))과 같은 경계라 나누어 떨어지지 않는 영역에서도
+    감지하는 셀과 클릭하는 셀이 어긋나지 않는다.
+    """
+    return np.arange(count + 1) * int(size) // count
+
+
+def _check_edges(row_edges, col_edges, shape):
+    if (np.diff(row_edges) <= 0).any() or (np.diff(col_edges) <= 0).any():
+        raise ValueError(f"이미지가 그리드보다 작습니다: {shape}")
+
+
+def cell_sums(values, row_edges, col_edges):
+    """
+    셀별 합계 (결과: 행 수 x 열 수 [x 나머지 축])
+
+    :param values: (높이, 너비, ...) 배열, row_edges[-1]/col_edges[-1]까지만 사용
+    """
+    values = values[:row_edges[-1], :col_edges[-1]]
+    rows = np.add.reduceat(values, row_edges[:-1], axis=0)
+    return np.add.reduceat(rows, col_edges[:-1], axis=1)
+
+
+def _cell_areas(row_edges, col_edges):
+    return np.outer(np.diff(row_edges), np.diff(col_edges))
+
+
+def bright_mask(image, bright_threshold=BRIGHT_THRESHOLD):
+    """
+    to_gray(image) > bright_threshold와 같은 마스크 (흑백 배열을 만들지 않고 가중합을 바로 비교)
+
+    :param image: RGB(A) 또는 흑백 배열
+    """
+    if image.ndim == 2:
+        return image > bright_threshold
+    # (가중합 + 0x8000) >> 16 > 임계값  <=>  가중합 >= ((임계값 + 1) << 16) - 0x8000
+    weighted = np.multiply(image[..., 0], 19595, dtype=np.uint32)
+    channel = np.multiply(image[..., 1], 38470, dtype=np.uint32)
+    weighted += channel
+    np.multiply(image[..., 2], 7471, out=channel, dtype=np.uint32)
+    weighted += channel
+    return weighted >= ((int(bright_threshold) + 1) << 16) - 0x8000
+
+
+def _count_bright(image, row_edges, col_edges, bright_threshold):
+    """
+    셀별 밝은 픽셀 수 (셀 행 띠마다 마스크를 만들어 캐시 안에서 처리, 전체 크기 중간 배열 없음)
+    """
+    counts = np.empty((len(row_edges) - 1, len(col_edges) - 1), dtype=np.int64)
+    for y in range(len(row_edges) - 1):
+        band = bright_mask(image[row_edges[y]:row_edges[y + 1], :col_edges[-1]], bright_threshold)
+        columns = band.view(np.uint8).sum(axis=0, dtype=np.int32)
+        counts[y] = np.add.reduceat(columns, col_edges[:-1])
+    return counts
+
+
+def _bright_ratios(image, row_edges, col_edges, bright_threshold, samples=None):
+    """
+    경계가 주어진 셀들의 밝은 픽셀 비율
+
+    :param samples: 셀 한 변의 표본 수 (예: RATIO_SAMPLES), 주면 큰 셀을 솎아서 근사 계산
+                    기본값 None이면 모든 픽셀을 세어 compare_cell_images와 같은 값
+    """
+    if not isinstance(image, np.ndarray):
+        image = np.asarray(image.convert('L'))
+    _check_edges(row_edges, col_edges, image.shape)
+    cell_px = min(np.diff(row_edges).min(), np.diff(col_edges).min())
+    step = max(int(cell_px) // samples, 1) if samples else 1
+    if step == 1:
+        return _count_bright(image, row_edges, col_edges, bright_threshold) / _cell_areas(row_edges, col_edges)
+
+    # 표본 위치는 step 칸의 가운데, 셀 경계는 표본 번호로 환산 (경계 이후 첫 표본부터 그 셀)
+    offset = step // 2
+    sample = image[offset:row_edges[-1]:step, offset:col_edges[-1]:step]
+    sample_rows = -(-(row_edges - offset) // step)
+    sample_cols = -(-(col_edges - offset) // step)
+    return _count_bright(sample, sample_rows, sample_cols, bright_threshold) / _cell_areas(sample_rows, sample_cols)
+
+
+def cell_bright_ratios(image, grid_width, grid_height, bright_threshold=BRIGHT_THRESHOLD, samples=None):
+    """
+    모든 셀의 밝은 픽셀 비율을 한 번에 계산 (결과: grid_height x grid_width)
+
+    :param samples: 셀 한 변의 표본 수, 주면 솎아서 근사 계산 (RATIO_SAMPLES 참고)
+    """
+    height, width = np.shape(image)[:2] if isinstance(image, np.ndarray) else image.size[::-1]
+    return _bright_ratios(image, cell_edges(height, grid_height), cell_edges(width, grid_width),
+                          bright_threshold, samples)
+
+
+def detect_occupied_cells(initial_img, current_img, grid_width, grid_height,
+                          bright_threshold=BRIGHT_THRESHOLD,
+                          min_ratio=MIN_CURRENT_RATIO,
+                          min_diff=MIN_RATIO_DIFF):
+    """
+    빈 인벤토리와 현재 인벤토리를 그리드 전체 단위로 비교하여 아이템 점유 마스크 반환
+
+    :param initial_img: 빈 인벤토리 이미지 (PIL 이미지/배열) 또는 미리 계산한 비율 배열
+    :param current_img: 현재 인벤토리 이미지 (PIL 이미지 또는 배열)
+    :return: mask[y, x]가 True이면 (x, y) 셀에 아이템 있음
+    """
+    if (isinstance(initial_img, np.ndarray) and initial_img.dtype.kind == 'f'
+            and initial_img.shape == (grid_height, grid_width)):
+        initial_ratio = initial_img
+    else:
+        initial_ratio = cell_bright_ratios(initial_img, grid_width, grid_height, bright_threshold)
+    current_ratio = cell_bright_ratios(current_img, grid_width, grid_height, bright_threshold)
+
+    return (current_ratio > min_ratio) & (current_ratio - initial_ratio > min_diff)
+
+
+def cell_histograms(image, grid_width, grid_height, bins=16):
+    """셀별 정규화된 밝기 히스토그램 (결과: grid_height x grid_width x bins)"""
+    gray = to_gray(image)
+    row_edges = cell_edges(gray.shape[0], grid_height)
+    col_edges = cell_edges(gray.shape[1], grid_width)
+    _check_edges(row_edges, col_edges, gray.shape)
+
+    # 픽셀마다 셀 번호 * bins + 밝기 구간으로 한 번에 카운트
+    row_cell = np.repeat(np.arange(grid_height), np.diff(row_edges))
+    col_cell = np.repeat(np.arange(grid_width), np.diff(col_edges))
+    cell_index = row_cell[:, None] * grid_width + col_cell[None, :]
+    bin_index = gray.astype(np.intp) * bins // 256
+    counts = np.bincount((cell_index * bins + bin_index).ravel(),
+                         minlength=grid_height * grid_width * bins)
+    return (counts.reshape(grid_height, grid_width, bins)
+            / _cell_areas(row_edges, col_edges)[..., None])
+
+
+def cell_edge_energy(image, grid_width, grid_height):
+    """셀별 평균 밝기 기울기 크기 (아이템 테두리/아이콘 윤곽 지표)"""
+    gray = to_gray(image).astype(np.int16)
+    edges = np.zeros(gray.shape, dtype=np.int32)
+    edges[:, 1:] += np.abs(np.diff(gray, axis=1))
+    edges[1:, :] += np.abs(np.diff(gray, axis=0))
+    row_edges = cell_edges(gray.shape[0], grid_height)
+    col_edges = cell_edges(gray.shape[1], grid_width)
+    _check_edges(row_edges, col_edges, gray.shape)
+    return cell_sums(edges, row_edges, col_edges) / _cell_areas(row_edges, col_edges)
+
+
+def iter_occupied_rows(initial_ratio, current_img, grid_width, grid_height, active=None,
+                       bright_threshold=BRIGHT_THRESHOLD,
+                       min_ratio=MIN_CURRENT_RATIO,
+                       min_diff=MIN_RATIO_DIFF):
+    """
+    행 띠 단위로 감지하며 행마다 (y, 점유 마스크, 행 띠 RGB 뷰) yield
+
+    :param active: 클릭 대상 셀 마스크 (grid_height x grid_width), False인 셀은 점유되지 않은 것으로 봄
+    """
+    if not isinstance(current_img, np.ndarray):
+        current_img = np.asarray(current_img.convert('RGB'))
+
+    row_edges = cell_edges(current_img.shape[0], grid_height)
+    col_edges = cell_edges(current_img.shape[1], grid_width)
+    for y in range(grid_height):
+        band = current_img[row_edges[y]:row_edges[y + 1]]
+        ratios = _bright_ratios(band, np.array([0, band.shape[0]]), col_edges, bright_threshold)[0]
+        occupied = (ratios > min_ratio) & (ratios - initial_ratio[y] > min_diff)
+        if active is not None:
+            occupied &= active[y]
+        yield y, occupied, band
+
+
+def iter_occupied_cells(initial_ratio, current_img, grid_width, grid_height, skip=(),
+                        serpentine=False, active=None,
+                        bright_threshold=BRIGHT_THRESHOLD,
+                        min_ratio=MIN_CURRENT_RATIO,
+                        min_diff=MIN_RATIO_DIFF):
+    """
+    행 단위로 감지하면서 아이템이 있는 셀을 클릭 순서(행 우선)로 yield
+
+    첫 행의 결과가 나오는 즉시 클릭을 시작할 수 있도록 흑백 변환도 행 띠 단위로 수행한다.
+
+    :param initial_ratio: 빈 인벤토리의 셀별 밝은 픽셀 비율 (grid_height x grid_width)
+    :param skip: 건너뛸 (x, y) 셀 목록
+    :param serpentine: True면 아이템이 있는 행마다 방향을 바꿔 지그재그 순서로 yield
+    :param active: 클릭 대상 셀 마스크 (grid_height x grid_width), False인 셀은 건너뜀
+    """
+    reverse = False
+    rows = iter_occupied_rows(initial_ratio, current_img, grid_width, grid_height, active,
+                              bright_threshold, min_ratio, min_diff)
+    for y, occupied, _ in rows:
+        row = [(int(x), y) for x in np.flatnonzero(occupied) if (int(x), y) not in skip]
+        if not row:
+            continue
+        yield from (reversed(row) if reverse else row)
+        reverse = serpentine and not reverse
+
+
+def cells_bounding_rect(cells, frame_shape, grid_width, grid_height):
+    """셀 목록을 감싸는 픽셀 사각형 (left, top, right, bottom), 감지와 같은 셀 경계 사용"""
+    row_edges = cell_edges(frame_shape[0], grid_height)
+    col_edges = cell_edges(frame_shape[1], grid_width)
+    xs = [x for x, _ in cells]
+    ys = [y for _, y in cells]
+    return (int(col_edges[min(xs)]), int(row_edges[min(ys)]),
+            int(col_edges[max(xs) + 1]), int(row_edges[max(ys) + 1]))
+
+
+def still_occupied_cells(initial_ratio, current_img, cells, grid_width, grid_height,
+                         bright_threshold=BRIGHT_THRESHOLD,
+                         min_ratio=MIN_CURRENT_RATIO,
+                         min_diff=MIN_RATIO_DIFF):
+    """
+    지정한 셀만 다시 검사하여 여전히 아이템이 있는 셀 목록 반환 (클릭 결과 확인용)
+
+    셀을 감싸는 사각형만 흑백 변환하여 블록 단위로 한 번에 계산한다 (쿼드 창고도 셀별 루프 없음).
+    """
+    if not cells:
+        return []
+    row_edges = cell_edges(current_img.shape[0], grid_height)
+    col_edges = cell_edges(current_img.shape[1], grid_width)
+    xs = np.array([x for x, _ in cells], dtype=np.intp)
+    ys = np.array([y for _, y in cells], dtype=np.intp)
+    left, top = xs.min(), ys.min()
+    right, bottom = xs.max() + 1, ys.max() + 1
+
+    band = current_img[row_edges[top]:row_edges[bottom], col_edges[left]:col_edges[right]]
+    ratios = _bright_ratios(band, row_edges[top:bottom + 1] - row_edges[top],
+                            col_edges[left:right + 1] - col_edges[left], bright_threshold)
+    ratios = ratios[ys - top, xs - left]
+    remaining = (ratios > min_ratio) & (ratios - initial_ratio[ys, xs] > min_diff)
+    return [(x, y) for (x, y), hit in zip(cells, remaining) if hit]
@@ -0,0 +1,279 @@
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+
+from .capture import CaptureCache
+from .clicker import Clicker
+from .executor import ClickPlan, ClickTiming
+from .detection import cell_bright_ratios, cells_bounding_rect, detect_occupied_cells, to_gray
+from .geometry import CLICK_JITTER, GridPlan, selection_region
+
+log = logging.getLogger(__name__)
+
+
+class MacroEngine:
+    """
+    Tk 없이 동작하는 인벤토리 클릭 엔진 (영역/그리드 계산, 캡처, 감지, 클릭)
+
+    GUI는 설정 입력과 화면 표시만 담당하고 실제 동작은 이 객체에 맡긴다.
+    캡처와 클릭 백엔드를 교체하면 디스플레이 없이도 실행할 수 있다.
+
+    :param capture: CaptureCache (기본값: 플랫폼 캡처)
+    :param clicker: Clicker (기본값: mouse 모듈)
+    :param jitter: 클릭 지점 랜덤 오차 비율 (0이면 셀 중앙)
+    :param timeline: 클릭/대기 구간을 기록할 RunTimeline (없으면 기록 안 함)
+    :param executor: ClickExecutor (있으면 여러 셀 클릭을 전용 클릭 스레드에서 시각표대로 실행)
+    """
+
+    def __init__(self, grid_width=12, grid_height=5, capture=None, clicker=None, jitter=CLICK_JITTER,
+                 timeline=None, executor=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.capture = capture or CaptureCache()
+        self.clicker = clicker or Clicker()
+        self.jitter = jitter
+        self.timeline = timeline
+        self.executor = executor
+        self.plan = None  # 현재 그리드 계획 (configure()에서 입력이 바뀔 때만 새로 만듦)
+
+    def set_grid(self, grid_width, grid_height):
+        """그리드 크기 변경 (레이아웃 전환 시, 다음 configure()에서 계획을 새로 만듦)"""
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+
+    def configure(self, start_pos, end_pos, excluded=(), scroll_cells=()):
+        """
+        영역/제외 셀/감정 주문서 묶음 셀 설정
+
+        :return: 그리드 계획 (입력이 이전과 같으면 기존 계획 재사용)
+        """
+        region = selection_region(start_pos, end_pos)
+        key = GridPlan.make_key(region, self.grid_width, self.grid_height, excluded, scroll_cells)
+        if self.plan is None or self.plan.key != key:
+            self.plan = GridPlan(region, self.grid_width, self.grid_height, excluded, scroll_cells)
+        return self.plan
+
+    @property
+    def region(self):
+        return self.plan.region
+
+    @property
+    def cell_size(self):
+        """셀 (너비, 높이)"""
+        return self.plan.cell_width, self.plan.cell_height
+
+    @property
+    def frame_shape(self):
+        """캡처 프레임 (높이, 너비)"""
+        left, top, right, bottom = self.region
+        return (bottom - top, right - left)
+
+    def grab(self):
+        """인벤토리 영역 캡처 (버퍼 재사용, 다음 캡처 시 덮어써짐)"""
+        return self.capture.grab(self.region)
+
+    def sample(self, step=8):
+        """
+        준비 확인용 작은 샘플 (첫 행 셀 띠만 다시 캡처하여 step 간격으로 솎은 흑백 복사본)
+
+        :param step: 솎아낼 픽셀 간격
+        """
+        rect = (0, 0, self.frame_shape[1], max(int(self.plan.cell_height), 1))
+        frame = self.capture.grab_rect(self.region, rect)
+        return to_gray(frame[:rect[3]:step, ::step])
+
+    def grab_cells(self, cells):
+        """지정한 셀을 감싸는 사각형만 다시 캡처"""
+        rect = cells_bounding_rect(cells, self.frame_shape, self.grid_width, self.grid_height)
+        return self.capture.grab_rect(self.region, rect)
+
+    def detect_cells(self, initial, frame, active=None):
+        """
+        빈 인벤토리와 비교하여 아이템이 있는 셀 목록 반환 (행 우선 순서)
+
+        :param initial: 빈 인벤토리 이미지 또는 셀별 밝은 픽셀 비율 배열
+        :param active: 클릭 대상 셀 마스크 (기본값: 계획의 제외 셀을 뺀 마스크)
+        """
+        mask = detect_occupied_cells(initial, frame, self.grid_width, self.grid_height)
+        if log.isEnabledFor(logging.DEBUG):
+            self._log_cell_ratios(initial, frame)
+        mask &= self.plan.active if active is None else active
+        return [(int(x), int(y)) for y, x in zip(*np.nonzero(mask))]
+
+    def _log_cell_ratios(self, initial, frame):
+        """셀별 밝은 픽셀 비율 진단 로그 (DEBUG 레벨에서만 계산)"""
+        if not (isinstance(initial, np.ndarray) and initial.dtype.kind == 'f'):
+            initial = cell_bright_ratios(initial, self.grid_width, self.grid_height)
+        current = cell_bright_ratios(frame, self.grid_width, self.grid_height)
+        for y in range(self.grid_height):
+            for x in range(self.grid_width):
+                log.debug("셀(%d,%d) - 초기: %.3f, 현재: %.3f, 차이: %.3f",
+                          x, y, initial[y, x], current[y, x], current[y, x] - initial[y, x])
+
+    def click_point(self, x, y, jitter=None):
+        """셀 클릭 지점 화면 좌표 (중앙 기준 랜덤 오차, 오차가 0이면 중앙)"""
+        jitter = self.jitter if jitter is None else jitter
+        if not jitter:
+            return self.plan.center(x, y)
+        return self.plan.click_point(x, y, jitter)
+
+    def click_cell(self, x, y, button='left', pacer=None, jitter=None, cancel=None):
+        """
+        셀 하나 클릭
+
+        :param cancel: CancelToken (클릭 중 대기도 취소 시 바로 끝남)
+        :return: 클릭 결과 확인 샘플을 뜰 차례인지 여부 (pacer 사용 시)
+        """
+        click_x, click_y = self.click_point(x, y, jitter)
+        return self.clicker.click(click_x, click_y, button=button, pacer=pacer, cancel=cancel)
+
+    def _span(self, name, **args):
+        if self.timeline is None:
+            return nullcontext()
+        return self.timeline.span(name, **args)
+
+    @property
+    def timer(self):
+        """클릭 경로가 쓰는 PrecisionTimer (대기 오차 확인용)"""
+        return self.clicker.timer
+
+    def sleep(self, seconds, cancel=None):
+        """
+        정밀 대기 (cancel이 있으면 취소되는 즉시 깨어남)
+
+        :return: 취소되었으면 True
+        """
+        if cancel is not None:
+            return self.timer.sleep(seconds, cancel)
+        if seconds > 0:
+            self.clicker.sleep(seconds)
+        return False
+
+    def pause(self, delay, pacer=None, cancel=None):
+        """클릭 간격 대기 (자동 조절 중이면 학습한 간격 사용)"""
+        if pacer is not None:
+            pacer.wait(lambda seconds: self.sleep(seconds, cancel))
+        else:
+            self.sleep(delay, cancel)
+
+    def click_cells(self, cells, delay=0, pacer=None, should_stop=None, on_click=None,
+                    on_sample=None, jitter=None, cancel=None):
+        """
+        셀을 주어진 순서대로 클릭
+
+        :param cells: (x, y) 셀 반복자 (감지 중 클릭 모드면 감지 결과가 나오는 대로 전달됨)
+        :param should_stop: True를 반환하면 즉시 중단
+        :param on_click: 클릭 직후 호출 (x, y)
+        :param on_sample: 확인 샘플을 뜰 차례일 때 지금까지 클릭한 셀 목록으로 호출
+        :param cancel: CancelToken (클릭 간격/클릭 중 대기를 끊고 바로 중단)
+        :return: 클릭한 셀 목록
+        """
+        if should_stop is None:
+            should_stop = cancel
+        if self.executor is not None:
+            return self._execute_cells(cells, delay, pacer, should_stop, on_click, on_sample, jitter, cancel)
+        clicked = []
+        for x, y in cells:
+            if should_stop is not None and should_stop():
+                break
+            clicked.append((x, y))
+            with self._span('click', cell=(x, y)):
+                sample_due = self.click_cell(x, y, pacer=pacer, jitter=jitter, cancel=cancel)
+            if sample_due and on_sample is not None:
+                with self._span('click_sample'):
+                    on_sample(clicked)
+            if on_click is not None:
+                on_click(x, y)
+            with self._span('click_delay'):
+                self.pause(delay, pacer, cancel)
+        return clicked
+
+    def _execute_cells(self, cells, delay, pacer, should_stop, on_click, on_sample, jitter, cancel):
+        """
+        click_cells()의 실행기 경로: 셀 전체를 클릭 계획 하나로 넘김
+
+        클릭 스레드는 입력만 보내고, on_click/on_sample(확인 캡처)은 이 스레드에서 클릭 순서대로 실행된다.
+        """
+        clicked = []
+
+        def points():
+            for x, y in cells:
+                if should_stop is not None and should_stop():
+                    return
+                clicked.append((x, y))
+                yield self.click_point(x, y, jitter)
+
+        def after_click(index):
+            x, y = clicked[index]
+            if pacer is not None and pacer.count_click() and on_sample is not None:
+                with self._span('click_sample'):
+                    # 클릭 스레드가 다음 셀을 이미 꺼냈을 수 있으므로 이번 클릭까지만 넘김
+                    on_sample(clicked[:index + 1])
+            if on_click is not None:
+                on_click(x, y)
+
+        timing = pacer if pacer is not None else ClickTiming(delay=delay)
+        with self._span('click_batch'):
+            report = self.executor.run(ClickPlan(points(), timing=timing), cancel=cancel, after_click=after_click)
+        if report.clicks:
+            log.info(report.summary())
+        return clicked
+
+    def sample_cleared(self, reference_profile, pacer, clicked_cells):
+        """
+        이전에 클릭한 셀 일부만 다시 캡처하여 비었는지 확인하고 타이밍 조절에 반영
+
+        :return: 아이템이 남아 있던 셀 목록
+        """
+        sample = pacer.next_sample(clicked_cells)
+        if not sample:
+            return []
+        remaining = reference_profile.still_occupied(self.grab_cells(sample), sample)
+        pacer.record(len(sample), len(remaining))
+        return remaining
+
+    def retry_uncleared(self, reference_profile, clicked_cells, delay=0, retries=2, settle_delay=0.1,
+                        pacer=None, should_stop=None, cancel=None):
+        """
+        클릭한 셀을 감싸는 영역만 다시 캡처하여 아이템이 남은 셀을 재클릭
+
+        :param pacer: 타이밍 자동 조절 객체 (실행 중 확인하지 못한 셀의 결과를 반영)
+        :param cancel: CancelToken (대기 중 취소되면 확인을 멈추고 남은 셀을 그대로 반환)
+        :return: 재시도 후에도 아이템이 남은 셀 목록
+        """
+        if should_stop is None:
+            should_stop = cancel
+        unsampled = pacer.remaining_sample(clicked_cells) if pacer is not None else []
+        pending = clicked_cells
+
+        for attempt in range(retries + 1):
+            # 클라이언트가 아이템을 옮길 시간
+            with self._span('verify_settle'):
+                self.sleep(settle_delay, cancel)
+            if should_stop is not None and should_stop():
+                break
+            with self._span('verify_capture', cells=len(pending)):
+                pending = reference_profile.still_occupied(self.grab_cells(pending), pending)
+
+            if attempt == 0 and unsampled:
+                pacer.record(len(unsampled), len(set(unsampled) & set(pending)))
+
+            if not pending or attempt == retries:
+                break
+
+            log.info(f"클릭 확인 {attempt + 1}회차: {len(pending)}개 셀에 아이템 남음 {pending}")
+            # 재클릭은 고정 타이밍으로 (자동 조절 배율 미적용)
+            self.click_cells(pending, delay, should_stop=should_stop, cancel=cancel)
+            if should_stop is not None and should_stop():
+                break
+
+        if pending:
+            log.info(f"재시도 후에도 아이템이 남은 셀: {pending}")
+        return pending
+
+    def close(self):
+        """캡처 리소스와 클릭 스레드 해제"""
+        self.capture.close()
+        if self.executor is not None:
+            self.executor.close()
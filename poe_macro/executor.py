@@ -0,0 +1,434 @@
+import logging
+import queue
+import sys
+import threading
+import time
+
+from .pacing import MOVE_SETTLE, PRESS_HOLD
+from .precision import precision_timer
+
+log = logging.getLogger(__name__)
+
+# 보조키를 누른 뒤 첫 클릭까지 대기 (기존 Ctrl/Shift 안정화 대기와 동일)
+MODIFIER_SETTLE = 0.1
+
+
+class ClickTiming:
+    """
+    고정 클릭 타이밍 (ClickPacer와 같은 속성이라 서로 바꿔 쓸 수 있음)
+
+    :param delay: 클릭 간격(초)
+    """
+
+    def __init__(self, move_settle=MOVE_SETTLE, press_hold=PRESS_HOLD, delay=0):
+        self.move_settle = move_settle
+        self.press_hold = press_hold
+        self.delay = delay
+
+
+class ClickPlan:
+    """
+    한 번에 실행할 클릭 계획
+
+    :param points: 화면 좌표 (x, y) 반복자 (생성기도 가능, 실행 스레드에서 하나씩 꺼냄)
+    :param modifier: 클릭하는 동안 누르고 있을 키 (예: 'ctrl', 'shift')
+    :param timing: move_settle/press_hold/delay 속성을 가진 객체 (예: ClickPacer), 클릭마다 다시 읽음
+    """
+
+    def __init__(self, points, button='left', modifier=None, timing=None, modifier_settle=MODIFIER_SETTLE):
+        self.points = points
+        self.button = button
+        self.modifier = modifier
+        self.timing = timing or ClickTiming()
+        self.modifier_settle = modifier_settle
+
+
+class ClickReport:
+    """클릭 실행 결과 (처리량과 누름 시각 오차)"""
+
+    def __init__(self):
+        self.clicks = 0
+        self.batches = 0  # backend.send() 호출 수
+        self.elapsed = 0.0  # 첫 누름부터 마지막 입력까지(초)
+        self.lateness = []  # 누름마다 예정 시각 대비 늦어진 시간(초)
+
+    @property
+    def clicks_per_second(self):
+        return self.clicks / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def jitter(self):
+        """누름 시각 오차의 표준편차(초)"""
+        if len(self.lateness) < 2:
+            return 0.0
+        mean = sum(self.lateness) / len(self.lateness)
+        return (sum((late - mean) ** 2 for late in self.lateness) / len(self.lateness)) ** 0.5
+
+    @property
+    def max_late(self):
+        return max(self.lateness, default=0.0)
+
+    def summary(self):
+        return (f"클릭 {self.clicks}회, {self.clicks_per_second:.1f}회/초, "
+                f"입력 묶음 {self.batches}개, 지터 {self.jitter * 1000:.2f}ms, "
+                f"최대 지연 {self.max_late * 1000:.2f}ms")
+
+
+class InputBackend:
+    """
+    mouse/keyboard 모듈로 입력 묶음 전달 (이벤트마다 호출)
+
+    입력 묶음은 (동작, 값) 목록이며 동작은 move, press, release, key_down, key_up 중 하나다.
+    """
+
+    def __init__(self, mouse=None, keyboard=None):
+        self._mouse = mouse
+        self._keyboard = keyboard
+
+    @property
+    def mouse(self):
+        if self._mouse is None:
+            import mouse
+            self._mouse = mouse
+        return self._mouse
+
+    @property
+    def keyboard(self):
+        if self._keyboard is None:
+            import keyboard
+            self._keyboard = keyboard
+        return self._keyboard
+
+    def send(self, events):
+        for action, value in events:
+            if action == 'move':
+                self.mouse.move(*value)
+            elif action == 'press':
+                self.mouse.press(button=value)
+            elif action == 'release':
+                self.mouse.release(button=value)
+            elif action == 'key_down':
+                self.keyboard.press(value)
+            elif action == 'key_up':
+                self.keyboard.release(value)
+            else:
+                raise ValueError(f"알 수 없는 입력: {action}")
+
+
+class SendInputBackend(InputBackend):
+    """Windows SendInput으로 입력 묶음 하나를 시스템 호출 한 번에 전달"""
+
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    MOUSEEVENTF_VIRTUALDESK = 0x4000
+    KEYEVENTF_KEYUP = 0x0002
+    # 버튼 -> (누름 플래그, 뗌 플래그)
+    BUTTON_FLAGS = {'left': (0x0002, 0x0004), 'right': (0x0008, 0x0010), 'middle': (0x0020, 0x0040)}
+    VIRTUAL_KEYS = {'ctrl': 0x11, 'shift': 0x10, 'alt': 0x12}
+
+    def __init__(self):
+        super().__init__()
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD),
+                        ('dwExtraInfo', ctypes.c_size_t)]
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class HARDWAREINPUT(ctypes.Structure):
+            _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+        class INPUTUNION(ctypes.Union):
+            _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._user32 = ctypes.windll.user32
+        self._user32.SendInput.argtypes = [wintypes.UINT, ctypes.c_void_p, ctypes.c_int]
+        self._user32.SendInput.restype = wintypes.UINT
+
+    def _virtual_screen(self):
+        metrics = self._user32.GetSystemMetrics
+        # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+        return metrics(76), metrics(77), max(metrics(78), 2), max(metrics(79), 2)
+
+    def send(self, events):
+        inputs = (self._INPUT * len(events))()
+        screen = None
+        for item, (action, value) in zip(inputs, events):
+            if action == 'move':
+                if screen is None:
+                    screen = self._virtual_screen()
+                left, top, width, height = screen
+                item.type = self.INPUT_MOUSE
+                # 절대 좌표는 가상 화면 기준 0~65535로 정규화
+                item.union.mi.dx = int((value[0] - left) * 65535 / (width - 1))
+                item.union.mi.dy = int((value[1] - top) * 65535 / (height - 1))
+                item.union.mi.dwFlags = (self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE
+                                         | self.MOUSEEVENTF_VIRTUALDESK)
+            elif action in ('press', 'release'):
+                item.type = self.INPUT_MOUSE
+                item.union.mi.dwFlags = self.BUTTON_FLAGS[value][action == 'release']
+            elif action in ('key_down', 'key_up'):
+                item.type = self.INPUT_KEYBOARD
+                item.union.ki.wVk = self.VIRTUAL_KEYS[value]
+                item.union.ki.dwFlags = self.KEYEVENTF_KEYUP if action == 'key_up' else 0
+            else:
+                raise ValueError(f"알 수 없는 입력: {action}")
+        sent = self._user32.SendInput(len(events), self._ctypes.byref(inputs),
+                                      self._ctypes.sizeof(self._INPUT))
+        if sent != len(events):
+            raise OSError(f"SendInput 실패 ({sent}/{len(events)})")
+
+
+class RecordingInput:
+    """실제 입력 없이 입력 묶음을 시각과 함께 기록하는 가짜 백엔드 (테스트/벤치마크용)"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.batches = []  # (보낸 시각, 입력 묶음) 목록
+
+    def send(self, events):
+        self.batches.append((self.clock(), list(events)))
+
+    @property
+    def events(self):
+        return [event for _, batch in self.batches for event in batch]
+
+    def clicks(self):
+        """클릭한 좌표 목록 (누름 직전 이동 위치)"""
+        points = []
+        position = None
+        for action, value in self.events:
+            if action == 'move':
+                position = value
+            elif action == 'press':
+                points.append(position)
+        return points
+
+    def clear(self):
+        self.batches.clear()
+
+
+def create_input_backend():
+    """플랫폼에 맞는 입력 백엔드 생성 (Windows는 SendInput 묶음 전달)"""
+    if sys.platform == 'win32':
+        try:
+            return SendInputBackend()
+        except Exception as e:
+            log.error(f"SendInput 초기화 오류, mouse/keyboard 모듈 사용: {e}")
+    return InputBackend()
+
+
+def _raise_thread_priority():
+    """현재 스레드 우선순위를 높임 (Windows만)"""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentThread.restype = ctypes.c_void_p
+        kernel32.SetThreadPriority.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 2)  # THREAD_PRIORITY_HIGHEST
+    except Exception as e:
+        log.error(f"클릭 스레드 우선순위 설정 오류: {e}")
+
+
+_DONE = object()
+
+
+class _Job:
+    def __init__(self, plan, cancel, notify):
+        self.plan = plan
+        self.cancel = cancel
+        self.notify = notify  # 클릭마다 순번을 clicks 큐로 알릴지
+        self.clicks = queue.Queue()  # 뗌이 전달된 클릭 순번 (마지막은 _DONE)
+        self.aborted = threading.Event()  # 호출 스레드의 콜백 오류로 중단 요청
+        self.report = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ClickExecutor:
+    """
+    클릭 계획을 전용 고우선순위 스레드에서 정해진 시각표대로 실행
+
+    클릭마다 이동/누름/뗌 시각을 절대 시각으로 정해 두고 PrecisionTimer로 맞추므로
+    대기 오차가 누적되지 않는다. 같은 시각에 보낼 입력(예: 대기 없는 뗌과 다음 이동)은
+    하나의 묶음으로 backend.send()에 한 번에 넘긴다.
+    클릭 스레드는 입력만 보내고, 클릭마다의 콜백(미리보기, 확인 캡처 등)은 run()을 호출한 스레드에서 실행한다.
+
+    :param backend: send(입력 묶음)을 가진 객체 (기본값: 플랫폼 입력 백엔드, 테스트 시 RecordingInput)
+    :param timer: PrecisionTimer (기본값: 공용 타이머)
+    :param wait_until: 대기 함수 wait_until(마감 시각, cancel) (벤치마크에서 대기를 뺄 때 교체, 기본값 timer.wait_until)
+    """
+
+    def __init__(self, backend=None, wait_until=None, timer=None):
+        self._backend = backend
+        self.timer = timer or precision_timer
+        self.wait_until = wait_until or self.timer.wait_until
+        self.clock = self.timer.clock
+        self.last_report = None
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_input_backend()
+        return self._backend
+
+    def run(self, plan, cancel=None, after_click=None):
+        """
+        클릭 계획 실행 (끝날 때까지 대기)
+
+        :param cancel: CancelToken (취소되면 누르지 않고, 누른 버튼/키는 바로 뗌)
+        :param after_click: 클릭(뗌)마다 run()을 호출한 스레드에서 호출 (클릭 순번)
+                            오류가 나면 남은 클릭을 멈추고 누른 입력을 뗀 뒤 그 오류를 다시 발생시킴
+        :return: ClickReport
+        """
+        job = _Job(plan, cancel, after_click is not None)
+        self._start()
+        self._jobs.put(job)
+        # 콜백은 여기서 처리하여 캡처/UI 작업이 클릭 스레드의 시각표를 밀지 않도록 함
+        callback_error = None
+        while True:
+            index = job.clicks.get()
+            if index is _DONE:
+                break
+            if callback_error is not None:
+                continue
+            try:
+                after_click(index)
+            except Exception as e:
+                callback_error = e
+                job.aborted.set()
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        if callback_error is not None:
+            raise callback_error
+        self.last_report = job.report
+        return job.report
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='click-executor', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        _raise_thread_priority()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                job.report = self._execute(job)
+            except Exception as e:
+                job.error = e
+            finally:
+                job.clicks.put(_DONE)
+                job.done.set()
+
+    def _execute(self, job):
+        plan, cancel = job.plan, job.cancel
+        report = ClickReport()
+        backend = self.backend
+        batch = []
+        state = {'at': None, 'first': None, 'last': None, 'cancelled': False}
+        held = set()  # 눌러 둔 (동작, 값)
+
+        def flush():
+            if not batch:
+                return
+            if self.wait_until(state['at'], cancel) or job.aborted.is_set():
+                state['cancelled'] = True
+            events = list(batch)
+            batch.clear()
+            if state['cancelled']:
+                # 취소 후에는 새로 누르지 않고 눌러 둔 것만 뗌
+                events = [event for event in events if event in held]
+                if not events:
+                    return
+            sent_at = self.clock()
+            backend.send(events)
+            report.batches += 1
+            state['last'] = sent_at
+            for action, value in events:
+                if action == 'press':
+                    held.add(('release', value))
+                    report.clicks += 1
+                    if state['first'] is None:
+                        state['first'] = sent_at
+                    report.lateness.append(max(sent_at - state['at'], 0.0))
+                elif action == 'key_down':
+                    held.add(('key_up', value))
+                elif (action, value) in held:
+                    held.discard((action, value))
+
+        def schedule(at, event):
+            # 앞 묶음보다 늦은 입력이면 앞 묶음을 먼저 보냄
+            if batch and at > state['at']:
+                flush()
+            if not batch:
+                state['at'] = at
+            batch.append(event)
+
+        t = self.clock()
+        try:
+            if plan.modifier:
+                schedule(t, ('key_down', plan.modifier))
+                t += plan.modifier_settle
+
+            for index, point in enumerate(plan.points):
+                if state['cancelled'] or job.aborted.is_set() or (cancel is not None and cancel.cancelled):
+                    break
+                timing = plan.timing
+                # 좌표가 늦게 나온 경우(감지 중 클릭) 밀린 대기를 한꺼번에 건너뛰지 않도록 현재 시각부터
+                t = max(t, self.clock())
+                schedule(t, ('move', (int(point[0]), int(point[1]))))
+                t += timing.move_settle
+                schedule(t, ('press', plan.button))
+                t += timing.press_hold
+                schedule(t, ('release', plan.button))
+                if job.notify:
+                    # 콜백은 뗌이 실제로 전달된 뒤에 호출되도록 보낸 다음 순번만 넘김
+                    flush()
+                if state['cancelled']:
+                    break
+                if job.notify:
+                    job.clicks.put(index)
+                t += timing.delay
+            flush()
+        finally:
+            # 오류/취소 시에도 누른 버튼과 키는 항상 뗌
+            batch.clear()
+            if held:
+                release_order = sorted(held, key=lambda event: event[0] == 'key_up')
+                backend.send(release_order)
+                report.batches += 1
+                state['last'] = self.clock()
+                held.clear()
+
+        if state['first'] is not None:
+            report.elapsed = state['last'] - state['first']
+        return report
+
+    def close(self):
+        """클릭 스레드 종료"""
+        with self._lock:
+            if self._thread is not None:
+                self._jobs.put(None)
+                self._thread = None
@@ -0,0 +1,179 @@
+import numpy as np
+
+from .detection import (
+    BRIGHT_THRESHOLD, MIN_CURRENT_RATIO, MIN_RATIO_DIFF, cell_edges, to_gray, iter_occupied_rows,
+)
+
+# 경계선을 찾는 범위 (셀 크기 대비), 선택한 영역이 몇 픽셀 어긋나도 격자선을 찾도록
+SEAM_SEARCH = 0.1
+# 경계선 세기 측정에서 제외하는 셀 양 끝 (셀 크기 대비, 모서리/수량 글자 제외)
+SEAM_MARGIN = 0.2
+# 현재 경계선 세기가 빈 인벤토리 격자선의 이 비율 미만이면 격자선이 가려진 것 (같은 아이템)
+MERGE_RATIO = 0.35
+# 빈 인벤토리 격자선이 이보다 약하면 판단하지 않음 (합치지 않음)
+MIN_REFERENCE_SEAM = 2.0
+# 아이템 최대 크기 (가로, 세로 셀 수), 더 크게 이어지면 합치지 않음
+MAX_FOOTPRINT = (2, 4)
+
+
+def _search(cell_size):
+    return max(int(cell_size * SEAM_SEARCH), 1)
+
+
+def _margin(cell_size):
+    return int(cell_size * SEAM_MARGIN)
+
+
+def column_seams(band, grid_width):
+    """
+    행 띠 하나에서 좌우로 이웃한 셀 사이 세로 경계선 세기 (결과: grid_width - 1)
+
+    경계 주변 열마다 행 방향 평균 밝기 기울기를 구해 가장 큰 값을 사용한다.
+    격자선처럼 곧게 이어지는 선은 평균해도 남고 아이콘 무늬는 상쇄된다.
+
+    :param band: 흑백 행 띠 (셀 높이 x 영역 너비)
+    """
+    if grid_width < 2:
+        return np.zeros(0)
+    cell_h, width = band.shape
+    search, margin = _search(width / grid_width), _margin(cell_h)
+    bounds = cell_edges(width, grid_width)[1:-1]
+    columns = np.clip(bounds[:, None] + np.arange(-search, search + 1), 0, width - 1)
+    window = band[margin:cell_h - margin or None][:, columns].astype(np.int16)
+    gradient = np.diff(window, axis=-1).mean(axis=0)
+    return np.abs(gradient).max(axis=-1)
+
+
+def row_seams(gray, bound, grid_width, cell_h):
+    """
+    위아래로 이웃한 셀 사이 가로 경계선 세기 (결과: grid_width)
+
+    :param gray: 경계 주변을 포함하는 흑백 배열 (영역 전체 너비)
+    :param bound: 배열 안에서 경계가 있는 픽셀 행
+    :param cell_h: 셀 높이 (경계를 찾는 범위 계산용)
+    """
+    width = gray.shape[1]
+    search, margin = _search(cell_h), _margin(width / grid_width)
+    edges = cell_edges(width, grid_width)
+    starts, ends = edges[:-1] + margin, edges[1:] - margin
+    narrow = ends <= starts
+    starts[narrow], ends[narrow] = edges[:-1][narrow], edges[1:][narrow]
+
+    window = gray[max(bound - search, 0):bound + search + 1].astype(np.int32)
+    gradient = np.diff(window, axis=0)
+    # 셀마다 양 끝을 뺀 구간의 평균 (누적합으로 셀 너비가 달라도 한 번에 계산)
+    totals = np.zeros((gradient.shape[0], width + 1), dtype=np.int64)
+    np.cumsum(gradient, axis=1, out=totals[:, 1:])
+    means = (totals[:, ends] - totals[:, starts]) / (ends - starts)
+    return np.abs(means).max(axis=0)
+
+
+def seam_strengths(image, grid_width, grid_height):
+    """
+    모든 셀 경계선 세기 (빈 인벤토리 기준값 계산용)
+
+    :return: (columns, rows), columns[y, x]는 (x, y)-(x+1, y) 사이 (grid_height x grid_width-1),
+             rows[y, x]는 (x, y)-(x, y+1) 사이 ((grid_height-1) x grid_width)
+    """
+    gray = to_gray(image)
+    cell_h = gray.shape[0] / grid_height
+    row_edges = cell_edges(gray.shape[0], grid_height)
+    columns = np.array([column_seams(gray[row_edges[y]:row_edges[y + 1]], grid_width)
+                        for y in range(grid_height)]).reshape(grid_height, max(grid_width - 1, 0))
+    rows = np.array([row_seams(gray, row_edges[y + 1], grid_width, cell_h)
+                     for y in range(grid_height - 1)]).reshape(max(grid_height - 1, 0), grid_width)
+    return columns.astype(np.float32), rows.astype(np.float32)
+
+
+def _hidden(current, reference):
+    """빈 인벤토리에 있던 격자선이 아이템에 가려졌는지 (같은 아이템 판정)"""
+    return (reference >= MIN_REFERENCE_SEAM) & (current < reference * MERGE_RATIO)
+
+
+def iter_item_cells(initial_ratio, reference_seams, current_img, grid_width, grid_height, skip=(),
+                    serpentine=False, active=None, footprints=None, max_footprint=MAX_FOOTPRINT,
+                    bright_threshold=BRIGHT_THRESHOLD,
+                    min_ratio=MIN_CURRENT_RATIO,
+                    min_diff=MIN_RATIO_DIFF):
+    """
+    여러 칸을 차지하는 아이템은 한 셀만 yield (아이템마다 클릭 한 번)
+
+    점유된 셀 사이의 격자선이 아이템에 가려졌으면 같은 아이템으로 합쳐 사각형으로 만든다.
+    행 단위로 감지하며 바로 yield하므로 감지 중 클릭 모드에도 그대로 쓸 수 있다.
+    위 행에서 시작된 아이템과 폭이 정확히 같고 사이 격자선이 모두 가려졌을 때만 아래로 늘리고,
+    애매하면 따로 yield한다 (이미 옮겨진 빈 셀을 클릭할 뿐 아이템을 놓치지 않음).
+
+    :param reference_seams: 빈 인벤토리 경계선 세기 (seam_strengths() 결과)
+    :param footprints: 아이템 크기를 기록할 딕셔너리 {yield한 셀: [가로, 세로]} (로그/확인용)
+    :param max_footprint: 아이템 최대 (가로, 세로) 셀 수
+    :return: 아이템마다 왼쪽 위 셀 (x, y)
+    """
+    if not isinstance(current_img, np.ndarray):
+        current_img = np.asarray(current_img.convert('RGB'))
+    cell_h = current_img.shape[0] / grid_height
+    search = _search(cell_h)
+    reference_columns, reference_rows = reference_seams
+    max_width, max_height = max_footprint
+    open_items = {}  # 윗 행까지 이어진 아이템: (x0, x1) -> [가로, 세로] (footprints 값과 같은 객체)
+    above = None  # 윗 행 띠 아래쪽 몇 줄의 흑백 복사본 (캡처 버퍼는 클릭 중 다시 캡처될 수 있음)
+    reverse = False
+
+    rows = iter_occupied_rows(initial_ratio, current_img, grid_width, grid_height, active,
+                              bright_threshold, min_ratio, min_diff)
+    for y, occupied, band in rows:
+        if skip:
+            occupied = occupied.copy()
+            for x, skip_y in skip:
+                if skip_y == y and 0 <= x < grid_width:
+                    occupied[x] = False
+        if not occupied.any():
+            open_items = {}
+            continue
+
+        gray = to_gray(band)
+        joined = _hidden(column_seams(gray, grid_width), reference_columns[y])
+        if open_items:
+            # 가로 경계는 두 행에 걸치므로 윗 행에서 복사해 둔 몇 줄과 이 행 위쪽 몇 줄을 이어 붙임
+            window = np.concatenate([above, gray[:search + 1]])
+            stitched = _hidden(row_seams(window, len(above), grid_width, cell_h),
+                               reference_rows[y - 1])
+        else:
+            stitched = np.zeros(grid_width, dtype=bool)
+
+        row = []
+        next_items = {}
+        x = 0
+        while x < grid_width:
+            if not occupied[x]:
+                x += 1
+                continue
+            end = x
+            while end + 1 < grid_width and occupied[end + 1] and joined[end]:
+                end += 1
+            span = (x, end)
+            item = open_items.get(span)
+            if item is not None and item[1] < max_height and stitched[x:end + 1].all():
+                item[1] += 1
+                next_items[span] = item
+            elif end - x + 1 <= max_width:
+                next_items[span] = _start_item(row, footprints, x, end, y)
+            else:
+                # 아이템보다 넓게 이어지면 격자선 판단을 믿지 않고 셀마다 따로
+                for cell_x in range(x, end + 1):
+                    next_items[(cell_x, cell_x)] = _start_item(row, footprints, cell_x, cell_x, y)
+            x = end + 1
+        open_items = next_items
+        above = gray[-search:].copy()
+
+        if not row:
+            continue
+        yield from (reversed(row) if reverse else row)
+        reverse = serpentine and not reverse
+
+
+def _start_item(row, footprints, x0, x1, y):
+    size = [x1 - x0 + 1, 1]
+    row.append((x0, y))
+    if footprints is not None:
+        footprints[(x0, y)] = size
+    return size
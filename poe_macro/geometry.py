@@ -0,0 +1,167 @@
+import random
+
+import numpy as np
+
+# 클릭 지점 랜덤 오차 (셀 크기 대비 비율, 중앙 기준 ±)
+CLICK_JITTER = 0.2
+# 드래그로 선택할 수 있는 최소 영역 크기 (px), 이보다 작으면 실수로 클릭한 것으로 봄
+MIN_SELECTION = 10
+
+
+def selection_region(start_pos, end_pos):
+    """선택 영역 시작/끝 좌표를 (left, top, right, bottom) 화면 좌표로 변환"""
+    return (int(start_pos[0]), int(start_pos[1]), int(end_pos[0]), int(end_pos[1]))
+
+
+def drag_region(start, end, min_size=MIN_SELECTION):
+    """
+    드래그 시작/끝 지점을 좌상단/우하단 좌표로 정리
+
+    :return: (start_pos, end_pos), 영역이 min_size보다 작으면 None
+    """
+    left, right = sorted((int(start[0]), int(end[0])))
+    top, bottom = sorted((int(start[1]), int(end[1])))
+    if right - left < min_size or bottom - top < min_size:
+        return None
+    return (left, top), (right, bottom)
+
+
+def canvas_scale(canvas_size, region_size):
+    """영역 캡처를 비율 유지하며 캔버스에 맞춘 배율"""
+    return min(canvas_size[0] / region_size[0], canvas_size[1] / region_size[1])
+
+
+def canvas_cell(x, y, canvas_size, region_size, grid_width, grid_height):
+    """
+    미리보기 캔버스에서 클릭한 지점의 셀 (비율 유지 축소, 왼쪽 위 정렬)
+
+    :return: (x, y) 셀, 그리드 밖이면 None
+    """
+    scale = canvas_scale(canvas_size, region_size)
+    cell_width = int(region_size[0] * scale) / grid_width
+    cell_height = int(region_size[1] * scale) / grid_height
+    cell_x, cell_y = int(x / cell_width), int(y / cell_height)
+    if 0 <= cell_x < grid_width and 0 <= cell_y < grid_height:
+        return cell_x, cell_y
+    return None
+
+
+def cell_size(region, grid_width, grid_height):
+    """영역을 그리드로 나눈 셀 하나의 (너비, 높이) (실수)"""
+    left, top, right, bottom = region
+    return (right - left) / grid_width, (bottom - top) / grid_height
+
+
+def grid_cells(grid_width, grid_height, excluded=()):
+    """행 우선 순서의 모든 셀 목록 (제외된 셀 빼고)"""
+    return [(x, y) for y in range(grid_height) for x in range(grid_width)
+            if (x, y) not in excluded]
+
+
+def random_click_point(base_x, base_y, cell_width, cell_height, jitter=CLICK_JITTER, rng=random):
+    """
+    각 셀의 중앙을 기준으로 랜덤한 클릭 지점 계산
+
+    :param base_x: 셀의 기준 x 좌표 (좌상단)
+    :param base_y: 셀의 기준 y 좌표 (좌상단)
+    :param jitter: 셀 크기 대비 최대 오차 비율 (0이면 항상 중앙)
+    :return: 랜덤한 클릭 x, y 좌표
+    """
+    x_offset = rng.uniform(-cell_width * jitter, cell_width * jitter) if jitter else 0
+    y_offset = rng.uniform(-cell_height * jitter, cell_height * jitter) if jitter else 0
+    return int(base_x + cell_width / 2 + x_offset), int(base_y + cell_height / 2 + y_offset)
+
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+
+class GridPlan:
+    """
+    영역/제외 셀/감정 주문서 셀이 정해지면 한 번만 만드는 불변 그리드 계획
+
+    셀 사각형과 중앙 좌표(화면 기준), 클릭 대상 셀 마스크를 미리 계산해 두고
+    실행 스레드는 매번 좌표와 제외 여부를 다시 계산하지 않고 이 값을 그대로 사용한다.
+
+    :param region: (left, top, right, bottom) 화면 좌표
+    :param excluded: 제외할 (x, y) 셀 (JSON에서 읽은 [x, y] 리스트도 허용)
+    :param scroll_cells: 감정 주문서 묶음 셀 목록 (감정 매크로에서 추가로 제외)
+    """
+
+    __slots__ = ('region', 'grid_width', 'grid_height', 'cell_width', 'cell_height',
+                 'excluded', 'scroll_cells', 'rects', 'centers', 'active', 'appraisal_active',
+                 'active_bits', 'cells', 'appraisal_cells', 'key')
+
+    def __init__(self, region, grid_width, grid_height, excluded=(), scroll_cells=()):
+        set_ = object.__setattr__
+        region = tuple(int(v) for v in region)
+        cell_width, cell_height = cell_size(region, grid_width, grid_height)
+        excluded = frozenset((int(c[0]), int(c[1])) for c in excluded)
+        scroll_cells = tuple((int(c[0]), int(c[1])) for c in scroll_cells)
+
+        # 셀 좌상단/우하단 (기존 int(start + x * cell_width) 계산과 동일)
+        xs = region[0] + np.arange(grid_width + 1) * cell_width
+        ys = region[1] + np.arange(grid_height + 1) * cell_height
+        left, top = np.meshgrid(xs[:-1].astype(int), ys[:-1].astype(int))
+        right, bottom = np.meshgrid(xs[1:].astype(int), ys[1:].astype(int))
+        rects = np.stack([left, top, right, bottom], axis=-1)
+        center_x, center_y = np.meshgrid(xs[:-1] + cell_width / 2, ys[:-1] + cell_height / 2)
+        centers = np.stack([center_x, center_y], axis=-1)
+
+        active = np.ones((grid_height, grid_width), dtype=bool)
+        for x, y in excluded:
+            if 0 <= x < grid_width and 0 <= y < grid_height:
+                active[y, x] = False
+        appraisal_active = active.copy()
+        for x, y in scroll_cells:
+            if 0 <= x < grid_width and 0 <= y < grid_height:
+                appraisal_active[y, x] = False
+
+        set_(self, 'region', region)
+        set_(self, 'grid_width', grid_width)
+        set_(self, 'grid_height', grid_height)
+        set_(self, 'cell_width', cell_width)
+        set_(self, 'cell_height', cell_height)
+        set_(self, 'excluded', excluded)
+        set_(self, 'scroll_cells', scroll_cells)
+        set_(self, 'rects', _frozen(rects))
+        set_(self, 'centers', _frozen(centers))
+        set_(self, 'active', _frozen(active))
+        set_(self, 'appraisal_active', _frozen(appraisal_active))
+        # 셀 번호(y * grid_width + x) 비트가 1이면 클릭 대상
+        set_(self, 'active_bits', sum(1 << int(i) for i in np.flatnonzero(active)))
+        set_(self, 'cells', tuple((int(x), int(y)) for y, x in zip(*np.nonzero(active))))
+        set_(self, 'appraisal_cells', tuple((int(x), int(y)) for y, x in zip(*np.nonzero(appraisal_active))))
+        set_(self, 'key', self.make_key(region, grid_width, grid_height, excluded, scroll_cells))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GridPlan은 변경할 수 없습니다")
+
+    @staticmethod
+    def make_key(region, grid_width, grid_height, excluded=(), scroll_cells=()):
+        """같은 입력이면 같은 값 (계획을 다시 만들지 판단용)"""
+        return (
+            tuple(int(v) for v in region), grid_width, grid_height,
+            frozenset((int(c[0]), int(c[1])) for c in excluded),
+            tuple((int(c[0]), int(c[1])) for c in scroll_cells),
+        )
+
+    def is_active(self, x, y):
+        """클릭 대상 셀인지 (비트마스크 조회)"""
+        return bool(self.active_bits >> (y * self.grid_width + x) & 1)
+
+    def cell_origin(self, x, y):
+        """셀 좌상단 화면 좌표"""
+        left, top = self.rects[y, x, :2]
+        return int(left), int(top)
+
+    def center(self, x, y):
+        """셀 중앙 화면 좌표"""
+        center_x, center_y = self.centers[y, x]
+        return int(center_x), int(center_y)
+
+    def click_point(self, x, y, jitter=CLICK_JITTER, rng=random):
+        """셀 중앙 기준 랜덤 오차를 더한 클릭 지점"""
+        base_x, base_y = self.cell_origin(x, y)
+        return random_click_point(base_x, base_y, self.cell_width, self.cell_height, jitter, rng)
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Tk keysym → keyboard 라이브러리 키 이름 (나머지 키는 소문자 keysym 그대로)
+KEYSYM_NAMES = {
+    "Return": "enter",
+    "Escape": "esc",
+    "Delete": "delete",
+    "BackSpace": "backspace",
+    "Tab": "tab",
+    "space": "space",
+    **{f"F{number}": f"f{number}" for number in range(1, 13)},
+}
+
+
+def hotkey_name(keysym):
+    """단축키 설정 창에서 누른 키(Tk keysym)를 단축키 이름으로 변환"""
+    return KEYSYM_NAMES.get(keysym, keysym.lower())
+
+
+class HotkeyDispatcher:
+    """
+    키보드 훅 콜백 기반 단축키 디스패처 (폴링 스레드 없음)
+
+    키가 눌리는 순간(down 에지)에만 동작을 실행하고, 누르고 있는 동안의 자동 반복은 무시한다.
+    키 입력이 없을 때는 아무 작업도 하지 않는다.
+
+    :param schedule: 동작을 UI 스레드로 넘기는 함수 (예: UiUpdateQueue.post, 훅 스레드에서 Tk를 호출하지 않음). 없으면 훅 스레드에서 바로 실행
+    :param hook: 키보드 훅 등록 함수 (기본값 keyboard.hook, 테스트 시 교체 가능)
+    :param unhook: 키보드 훅 해제 함수 (기본값 keyboard.unhook)
+    """
+
+    def __init__(self, schedule=None, hook=None, unhook=None):
+        self.schedule = schedule
+        self._hook_fn = hook
+        self._unhook_fn = unhook
+        self._hook = None
+        self._lock = threading.Lock()
+        self._bindings = {}  # 이름 -> [키, 동작]
+        self._pressed = set()
+        self.last_latency = {}  # 이름 -> 마지막 키 입력부터 동작 실행까지 걸린 시간(초)
+
+    def register(self, name, key, action):
+        """단축키 등록 (같은 이름이면 교체)"""
+        with self._lock:
+            self._bindings[name] = [key.lower(), action]
+
+    def set_key(self, name, key):
+        """등록된 단축키의 키만 변경"""
+        with self._lock:
+            self._bindings[name][0] = key.lower()
+
+    def unregister(self, name):
+        with self._lock:
+            self._bindings.pop(name, None)
+
+    def start(self):
+        """키보드 훅 등록"""
+        if self._hook is not None:
+            return
+        if self._hook_fn is None:
+            import keyboard
+            self._hook_fn = keyboard.hook
+            self._unhook_fn = keyboard.unhook
+        self._hook = self._hook_fn(self._on_event)
+
+    def stop(self):
+        """키보드 훅 해제"""
+        if self._hook is None:
+            return
+        try:
+            self._unhook_fn(self._hook)
+        finally:
+            self._hook = None
+            self._pressed.clear()
+
+    def _on_event(self, event):
+        """훅 콜백 (키보드 라이브러리 스레드, 빠르게 반환해야 함)"""
+        key = (event.name or "").lower()
+        if event.event_type == 'up':
+            self._pressed.discard(key)
+            return
+        if key in self._pressed:
+            return  # 자동 반복
+        self._pressed.add(key)
+
+        pressed_at = getattr(event, 'time', None) or time.time()
+        with self._lock:
+            matches = [(name, action) for name, (bound_key, action) in self._bindings.items()
+                       if bound_key == key]
+        for name, action in matches:
+            self._dispatch(name, action, pressed_at)
+
+    def _dispatch(self, name, action, pressed_at):
+        def run():
+            latency = time.time() - pressed_at
+            self.last_latency[name] = latency
+            log.info(f"단축키 {name} 감지 (반응 {latency * 1000:.1f}ms)")
+            action()
+
+        if self.schedule is None:
+            run()
+        else:
+            self.schedule(run)
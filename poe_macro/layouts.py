@@ -0,0 +1,106 @@
+LAYOUT_INVENTORY = 'inventory'
+LAYOUT_STASH = 'stash'
+LAYOUT_QUAD = 'quad'
+
+# 기본 레이아웃: 이름 -> (표시 이름, 가로 셀 수, 세로 셀 수)
+LAYOUT_PRESETS = {
+    LAYOUT_INVENTORY: ("인벤토리", 12, 5),
+    LAYOUT_STASH: ("일반 창고", 12, 12),
+    LAYOUT_QUAD: ("쿼드 창고", 24, 24),
+}
+DEFAULT_LAYOUT = LAYOUT_INVENTORY
+
+# 레이아웃별로 따로 저장하는 설정 키
+LAYOUT_KEYS = ('start_pos', 'end_pos', 'excluded_cells', 'inventory_image_path', 'appraisal_scroll_cell',
+               'appraisal_spare_scroll_cells')
+
+
+def _cell(value):
+    return (int(value[0]), int(value[1])) if value is not None else None
+
+
+class LayoutProfile:
+    """
+    그리드 레이아웃 하나의 설정 (그리드 크기, 영역, 제외 셀, 빈 인벤토리 기준 데이터 경로)
+
+    :param name: 설정 파일에 저장되는 이름
+    :param label: 화면에 표시할 이름
+    """
+
+    def __init__(self, name, grid_width, grid_height, label=None, start_pos=None, end_pos=None,
+                 excluded_cells=(), inventory_image_path=None, appraisal_scroll_cell=None,
+                 appraisal_spare_scroll_cells=()):
+        self.name = name
+        self.label = label or name
+        self.grid_width = int(grid_width)
+        self.grid_height = int(grid_height)
+        self.start_pos = _cell(start_pos)
+        self.end_pos = _cell(end_pos)
+        # JSON에는 [x, y] 리스트로 저장되므로 (x, y) 튜플로 맞춤
+        self.excluded_cells = [_cell(cell) for cell in excluded_cells]
+        self.inventory_image_path = inventory_image_path
+        self.appraisal_scroll_cell = _cell(appraisal_scroll_cell)
+        # 첫 묶음이 비면 순서대로 이어서 사용할 감정 주문서 묶음 셀
+        self.appraisal_spare_scroll_cells = [_cell(cell) for cell in appraisal_spare_scroll_cells]
+
+    @property
+    def reference_key(self):
+        """빈 인벤토리 기준 데이터 파일 구분용 이름 (기본 레이아웃은 기존 경로 유지)"""
+        return None if self.name == DEFAULT_LAYOUT else self.name
+
+    def to_config(self):
+        values = {key: getattr(self, key) for key in LAYOUT_KEYS}
+        values.update(label=self.label, grid_width=self.grid_width, grid_height=self.grid_height)
+        return values
+
+    @classmethod
+    def from_config(cls, name, values):
+        """설정 값으로 생성 (그리드 크기가 없으면 기본 레이아웃 값 사용)"""
+        label, grid_width, grid_height = LAYOUT_PRESETS.get(name, (name, 12, 5))
+        return cls(
+            name,
+            values.get('grid_width', grid_width),
+            values.get('grid_height', grid_height),
+            label=values.get('label', label),
+            **{key: values.get(key) for key in LAYOUT_KEYS if values.get(key) is not None},
+        )
+
+
+def load_layouts(config):
+    """
+    설정에서 레이아웃 목록 로드
+
+    기본 레이아웃은 항상 포함되고, 'layouts'에 이름과 grid_width/grid_height를 추가하면
+    사용자 레이아웃도 만들 수 있다. 인벤토리 레이아웃은 다른 GUI와 함께 쓰는 최상위 키를 사용한다.
+
+    :return: {이름: LayoutProfile} (설정 순서 유지)
+    """
+    saved = config.get('layouts', {})
+    layouts = {}
+    for name in list(LAYOUT_PRESETS) + [name for name in saved if name not in LAYOUT_PRESETS]:
+        values = dict(saved.get(name, {}))
+        if name == DEFAULT_LAYOUT:
+            values.update({key: config[key] for key in LAYOUT_KEYS if key in config})
+        layouts[name] = LayoutProfile.from_config(name, values)
+    return layouts
+
+
+def layouts_config(layouts):
+    """레이아웃 목록을 설정 파일에 저장할 딕셔너리로 변환"""
+    config = {'layouts': {name: layout.to_config() for name, layout in layouts.items()}}
+    default = layouts.get(DEFAULT_LAYOUT)
+    if default is not None:
+        # main.py 등 다른 GUI가 읽는 최상위 키는 인벤토리 레이아웃 값으로 유지
+        config['layouts'][DEFAULT_LAYOUT] = {
+            key: value for key, value in default.to_config().items() if key not in LAYOUT_KEYS
+        }
+        config.update({key: getattr(default, key) for key in LAYOUT_KEYS})
+    return config
+
+
+def next_layout(layouts, current):
+    """단축키로 순환할 다음 레이아웃 이름"""
+    names = list(layouts)
+    if current not in names:
+        return names[0]
+    return names[(names.index(current) + 1) % len(names)]
@@ -0,0 +1,69 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+LOGGER_NAME = 'poe_macro'
+DEFAULT_LEVEL = logging.INFO
+
+_listener = None
+
+
+def setup_logging(level=None, stream=None):
+    """
+    레벨별 로거 설정 (처음 한 번만 출력 스레드 시작)
+
+    로그 레코드는 큐에 넣기만 하고, 콘솔 출력은 백그라운드 스레드가 담당하므로
+    매크로 실행 스레드가 stdout 쓰기에서 멈추지 않는다.
+
+    :param level: 'DEBUG'/'INFO'/'WARNING'/'ERROR' 또는 logging 레벨 숫자
+    :param stream: 출력 대상 (기본값 sys.stdout)
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if level is not None:
+        set_log_level(level)
+    if _listener is not None:
+        return logger
+
+    if logger.level == logging.NOTSET:
+        logger.setLevel(DEFAULT_LEVEL)
+
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))  # 기존 print 출력과 같은 형식
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.propagate = False
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def set_log_level(level):
+    """로그 레벨 변경 (DEBUG로 설정하면 셀별 진단 로그 출력)"""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = DEFAULT_LEVEL
+    logging.getLogger(LOGGER_NAME).setLevel(level)
+
+
+def get_logger(name=None):
+    """poe_macro 하위 로거 반환 (필요하면 출력 스레드 시작)"""
+    setup_logging()
+    if not name:
+        return logging.getLogger(LOGGER_NAME)
+    if name.startswith(LOGGER_NAME):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def shutdown_logging():
+    """남은 로그를 모두 출력하고 출력 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
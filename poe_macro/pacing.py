@@ -0,0 +1,145 @@
+import time
+
+# 기본 클릭 타이밍 (기존 고정값)
+MOVE_SETTLE = 0.02  # 마우스 이동 후 대기
+PRESS_HOLD = 0.02   # 버튼 누름 유지
+
+# 아무리 줄여도 이 값 아래로는 내려가지 않음 (초)
+MIN_MOVE_SETTLE = 0.004
+MIN_PRESS_HOLD = 0.008
+
+# 확인 결과 실패가 없으면 배율을 줄이고, 실패가 있으면 늘림
+SHRINK_FACTOR = 0.8
+BACKOFF_FACTOR = 2.0
+MIN_SCALE = 0.1
+# 실패가 났던 배율보다 이만큼 여유를 두고 더 줄이지 않음
+FAILURE_MARGIN = 1.25
+
+
+class ClickPacer:
+    """
+    클릭 결과 확인에 따라 클릭 타이밍을 자동으로 조절
+
+    이동 대기, 누름 유지, 클릭 간격에 같은 배율을 곱한다. 샘플로 확인한 셀이 모두 비었으면
+    배율을 줄이고, 남은 셀이 있으면 배율을 늘린 뒤 그 근처 아래로는 다시 내려가지 않는다.
+    객체를 유지하는 동안(세션) 학습한 배율이 다음 실행에도 이어진다.
+
+    :param click_delay: 사용자가 설정한 클릭 간격(초), 배율 1일 때의 값
+    :param sample_every: 몇 번 클릭할 때마다 확인할지
+    """
+
+    def __init__(self, click_delay=0.1, sample_every=8):
+        self.click_delay = click_delay
+        self.sample_every = sample_every
+        self.scale = 1.0
+        self.floor = MIN_SCALE  # 실패 이력으로 올라가는 최소 배율
+        self.clicks = 0
+        self.sampled = 0  # 이번 실행에서 확인을 마친 클릭 셀 수
+        self.samples = 0
+        self.failures = 0
+
+    @property
+    def move_settle(self):
+        return max(MOVE_SETTLE * self.scale, MIN_MOVE_SETTLE)
+
+    @property
+    def press_hold(self):
+        return max(PRESS_HOLD * self.scale, MIN_PRESS_HOLD)
+
+    @property
+    def delay(self):
+        return self.click_delay * self.scale
+
+    def begin_run(self, click_delay):
+        """실행 시작 시 호출 (학습한 배율은 유지)"""
+        self.click_delay = click_delay
+        self.clicks = 0
+        self.sampled = 0
+
+    def click_time(self):
+        """셀 하나를 클릭하는 데 드는 대기 시간 합 (초)"""
+        return self.move_settle + self.press_hold + self.delay
+
+    def click(self, move, press, release, sleep=time.sleep):
+        """
+        현재 타이밍으로 클릭 한 번 수행
+
+        :param move: 마우스 이동 함수 (인자 없음)
+        :param press: 버튼 누름 함수
+        :param release: 버튼 뗌 함수
+        :param sleep: 대기 함수
+        :return: 이번 클릭 후 확인 샘플을 뜰 차례인지 여부
+        """
+        move()
+        sleep(self.move_settle)
+        press()
+        sleep(self.press_hold)
+        release()
+        return self.count_click()
+
+    def count_click(self):
+        """
+        클릭 한 번 집계 (클릭을 직접 하지 않는 실행기용)
+
+        :return: 이번 클릭 후 확인 샘플을 뜰 차례인지 여부
+        """
+        self.clicks += 1
+        return self.sample_every > 0 and self.clicks % self.sample_every == 0
+
+    def wait(self, sleep=time.sleep):
+        """클릭 간격만큼 대기"""
+        if self.delay > 0:
+            sleep(self.delay)
+
+    def next_sample(self, clicked_cells):
+        """
+        확인할 셀 목록 반환 (최근 sample_every개는 클라이언트가 아직 반영 중일 수 있어 제외)
+
+        :param clicked_cells: 이번 실행에서 클릭한 셀 목록 (클릭 순서)
+        """
+        end = max(len(clicked_cells) - self.sample_every, self.sampled)
+        sample = clicked_cells[self.sampled:end]
+        self.sampled = end
+        return sample
+
+    def remaining_sample(self, clicked_cells):
+        """실행 중 확인하지 못한 나머지 셀 목록 반환 (실행 후 확인 단계용)"""
+        sample = clicked_cells[self.sampled:]
+        self.sampled = len(clicked_cells)
+        return sample
+
+    def record(self, checked, failed):
+        """
+        확인 결과 반영
+
+        :param checked: 확인한 셀 수
+        :param failed: 그중 아이템이 남아 있던 셀 수
+        """
+        if checked <= 0:
+            return
+        self.samples += checked
+        self.failures += failed
+        if failed:
+            # 실패한 배율 근처 아래로는 다시 내려가지 않도록 바닥을 올림
+            self.floor = min(max(self.floor, self.scale * FAILURE_MARGIN), 1.0)
+            self.scale = min(self.scale * BACKOFF_FACTOR, 1.0)
+        else:
+            self.scale = max(self.scale * SHRINK_FACTOR, self.floor)
+
+    def reset(self):
+        """학습한 배율 초기화"""
+        self.scale = 1.0
+        self.floor = MIN_SCALE
+        self.clicks = self.sampled = self.samples = self.failures = 0
+
+    def profile(self):
+        """현재 학습 상태 (설정 표시/로그용)"""
+        return {
+            'scale': round(self.scale, 3),
+            'floor': round(self.floor, 3),
+            'move_settle': round(self.move_settle, 4),
+            'press_hold': round(self.press_hold, 4),
+            'delay': round(self.delay, 4),
+            'samples': self.samples,
+            'failures': self.failures,
+        }
@@ -0,0 +1,48 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+def stream_cells(cells, maxsize=16):
+    """
+    셀 생성기를 별도 스레드에서 실행하고, 결과를 크기 제한 큐로 넘겨받아 순서대로 yield
+
+    감지(생산자)와 클릭(소비자)이 겹쳐 실행되므로 첫 클릭까지의 시간이 그리드 크기와 무관해진다.
+    소비자가 중간에 반복을 멈추면 생산자도 종료된다.
+    """
+    items = queue.Queue(maxsize)
+    stopped = threading.Event()
+    errors = []
+
+    def put(item):
+        # 소비자가 멈춘 경우 큐가 가득 차도 영원히 대기하지 않도록 주기적으로 확인
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for cell in cells:
+                if not put(cell):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    threading.Thread(target=producer, daemon=True).start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stopped.set()
@@ -0,0 +1,128 @@
+import logging
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# 바쁜 대기 구간 범위 (초), 기본 OS 타이머 간격(약 15.6ms)이 그대로여도 맞출 수 있도록 상한을 둠
+SPIN_MIN = 0.0005
+SPIN_MAX = 0.02
+SPIN_INITIAL = 0.002
+# sleep이 늦게 깬 시간의 이 배수만큼 일찍 깨어남
+SPIN_MARGIN = 1.5
+# 늦게 깨는 정도가 줄면 바쁜 대기 구간을 천천히 줄임
+SPIN_DECAY = 0.95
+
+
+def _enable_timer_resolution():
+    """Windows 기본 타이머 간격을 1ms로 (다른 OS는 아무것도 하지 않음)"""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        ctypes.windll.winmm.timeBeginPeriod(1)
+    except Exception as e:
+        log.error(f"타이머 해상도 설정 오류: {e}")
+
+
+class PrecisionTimer:
+    """
+    20ms 이하 짧은 대기용 정밀 타이머 (대략 sleep 후 마감까지 바쁜 대기)
+
+    OS sleep이 늦게 깨어나는 정도를 학습해 그만큼 일찍 깨어나고 나머지는 바쁜 대기로 맞춘다.
+    대기마다 마감보다 늦게 끝난 시간(오차)을 기록해 두어 stats()로 확인할 수 있다.
+
+    :param max_samples: 보관할 최근 오차 수
+    """
+
+    def __init__(self, clock=time.perf_counter, max_samples=512):
+        self.clock = clock
+        self.spin = SPIN_INITIAL
+        self.overshoots = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._resolution_set = False
+
+    def wait_until(self, deadline, cancel=None):
+        """
+        마감 시각(clock 기준)까지 대기
+
+        :param cancel: CancelToken (대기 중 취소되면 바로 돌아옴)
+        :return: 취소되었으면 True
+        """
+        if not self._resolution_set:
+            _enable_timer_resolution()
+            self._resolution_set = True
+
+        clock = self.clock
+        coarse = deadline - clock() - self.spin
+        if coarse > 0:
+            before = clock()
+            if cancel is not None:
+                if cancel.sleep(coarse):
+                    return True
+            else:
+                time.sleep(coarse)
+            self._learn(clock() - before - coarse)
+        elif deadline <= clock():
+            # 이미 지난 마감은 대기하지 않고 오차로도 기록하지 않음 (호출이 늦은 것)
+            return cancel is not None and cancel.cancelled
+
+        while clock() < deadline:
+            if cancel is not None and cancel.cancelled:
+                return True
+        self.overshoots.append(clock() - deadline)
+        return False
+
+    def sleep(self, seconds, cancel=None):
+        """
+        지정한 시간만큼 대기
+
+        :return: 취소되었으면 True
+        """
+        if seconds <= 0:
+            return cancel is not None and cancel.cancelled
+        return self.wait_until(self.clock() + seconds, cancel)
+
+    def _learn(self, late):
+        """sleep이 늦게 깬 시간으로 바쁜 대기 구간 조정"""
+        with self._lock:
+            target = late * SPIN_MARGIN
+            if target > self.spin:
+                self.spin = target
+            else:
+                self.spin = self.spin * SPIN_DECAY + target * (1 - SPIN_DECAY)
+            self.spin = min(max(self.spin, SPIN_MIN), SPIN_MAX)
+
+    def reset_stats(self):
+        """오차 기록 초기화 (학습한 바쁜 대기 구간은 유지)"""
+        self.overshoots.clear()
+
+    def stats(self):
+        """
+        최근 대기 오차 통계 (ms)
+
+        :return: {'count', 'mean', 'p99', 'max', 'spin'}
+        """
+        samples = np.array(list(self.overshoots)) * 1000
+        if not samples.size:
+            return {'count': 0, 'mean': 0.0, 'p99': 0.0, 'max': 0.0, 'spin': self.spin * 1000}
+        return {
+            'count': int(samples.size),
+            'mean': float(samples.mean()),
+            'p99': float(np.percentile(samples, 99)),
+            'max': float(samples.max()),
+            'spin': self.spin * 1000,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"대기 {stats['count']}회, 오차 평균 {stats['mean']:.3f}ms, p99 {stats['p99']:.3f}ms, "
+                f"최대 {stats['max']:.3f}ms (바쁜 대기 {stats['spin']:.2f}ms)")
+
+
+# 클릭 경로 전체가 함께 쓰는 타이머 (학습한 바쁜 대기 구간과 오차 기록 공유)
+precision_timer = PrecisionTimer()
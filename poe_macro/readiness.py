@@ -0,0 +1,62 @@
+import logging
+import time
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# 게임 창 전환 후 준비 대기 설정 (기존 고정 대기 0.5초 대체)
+READY_TIMEOUT = 0.5  # 이 시간 안에 준비되지 않으면 그대로 진행 (기존 고정 대기보다 길지 않게)
+READY_POLL = 0.016  # 확인 간격 (약 한 프레임)
+STABLE_SAMPLES = 2  # 연속으로 변화가 없어야 하는 비교 횟수
+STABLE_TOLERANCE = 2.0  # 샘플 간 평균 밝기 차이가 이 값 이하면 변화 없음으로 봄
+
+
+def frame_difference(previous, current):
+    """두 샘플의 평균 절대 밝기 차이 (크기가 다르면 무한대)"""
+    if previous.shape != current.shape:
+        return float('inf')
+    return float(np.abs(current.astype(np.int16) - previous).mean())
+
+
+def wait_until_ready(is_focused, sample, timeout=READY_TIMEOUT, poll=READY_POLL,
+                     stable_samples=STABLE_SAMPLES, tolerance=STABLE_TOLERANCE, cancel=None,
+                     clock=time.perf_counter, sleep=time.sleep):
+    """
+    게임 창이 포커스를 얻고 인벤토리 화면이 멈출 때까지 대기
+
+    이미 게임 창이 활성화되어 있으면 몇 프레임 만에 돌아온다.
+
+    :param is_focused: 게임 창이 전면에 있는지 반환하는 함수
+    :param sample: 인벤토리 영역의 작은 샘플(흑백 배열 복사본)을 반환하는 함수
+    :param cancel: CancelToken (취소되면 바로 False 반환)
+    :return: 준비되었으면 True, 시간 초과 또는 취소되면 False
+    """
+    if cancel is not None:
+        sleep = cancel.sleep
+    deadline = clock() + timeout
+    previous = None
+    steady = 0
+    while True:
+        if cancel is not None and cancel.cancelled:
+            return False
+
+        if is_focused():
+            current = sample()
+            if previous is not None and frame_difference(previous, current) <= tolerance:
+                steady += 1
+                if steady >= stable_samples:
+                    return True
+            else:
+                steady = 0
+            previous = current
+        else:
+            # 포커스를 잃으면 화면 안정 여부도 처음부터 다시 확인
+            previous = None
+            steady = 0
+
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return False
+        if sleep(min(poll, remaining)):
+            return False
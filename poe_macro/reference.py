@@ -0,0 +1,224 @@
+import logging
+import os
+
+import numpy as np
+
+from .detection import (
+    BRIGHT_THRESHOLD, to_gray, cell_bright_ratios, cell_histograms,
+    cell_edge_energy, detect_occupied_cells, iter_occupied_cells, still_occupied_cells,
+)
+from .footprint import iter_item_cells, seam_strengths
+
+log = logging.getLogger(__name__)
+
+# 셀 경계 계산 방식이 바뀌면 올림 (이전 버전 프로필의 격자선 세기는 다시 계산)
+PROFILE_VERSION = 2
+
+
+class ReferenceProfile:
+    """빈 인벤토리 셀 통계 (영역 선택 시 한 번만 계산)"""
+
+    def __init__(self, start_pos, end_pos, screen_size, grid_width, grid_height,
+                 ratios, histograms, edge_energy, column_seams=None, row_seams=None):
+        self.start_pos = tuple(start_pos)
+        self.end_pos = tuple(end_pos)
+        self.screen_size = tuple(screen_size)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.ratios = ratios
+        self.histograms = histograms
+        self.edge_energy = edge_energy
+        # 셀 사이 격자선 세기 (여러 칸 아이템 합치기용, 이전 버전 파일에는 없음)
+        self.column_seams = column_seams
+        self.row_seams = row_seams
+
+    @classmethod
+    def from_image(cls, image, start_pos, end_pos, screen_size, grid_width, grid_height,
+                   bright_threshold=BRIGHT_THRESHOLD):
+        """빈 인벤토리 캡처에서 프로필 생성"""
+        gray = to_gray(image)
+        column_seams, row_seams = seam_strengths(gray, grid_width, grid_height)
+        return cls(
+            start_pos, end_pos, screen_size, grid_width, grid_height,
+            ratios=cell_bright_ratios(gray, grid_width, grid_height, bright_threshold),
+            histograms=cell_histograms(gray, grid_width, grid_height).astype(np.float32),
+            edge_energy=cell_edge_energy(gray, grid_width, grid_height).astype(np.float32),
+            column_seams=column_seams,
+            row_seams=row_seams,
+        )
+
+    def matches(self, start_pos, end_pos, screen_size, grid_width, grid_height):
+        """같은 영역/해상도/그리드에서 만든 프로필인지 확인"""
+        return (self.start_pos == tuple(start_pos) and self.end_pos == tuple(end_pos)
+                and self.screen_size == tuple(screen_size)
+                and (self.grid_width, self.grid_height) == (grid_width, grid_height))
+
+    def detect(self, current_img, **kwargs):
+        """현재 캡처만 처리하여 점유 마스크 반환"""
+        return detect_occupied_cells(self.ratios, current_img,
+                                     self.grid_width, self.grid_height, **kwargs)
+
+    def iter_occupied(self, current_img, skip=(), **kwargs):
+        """행 단위로 감지하며 아이템이 있는 셀을 순서대로 yield"""
+        return iter_occupied_cells(self.ratios, current_img,
+                                   self.grid_width, self.grid_height, skip=skip, **kwargs)
+
+    @property
+    def has_seams(self):
+        return self.column_seams is not None and self.row_seams is not None
+
+    def iter_items(self, current_img, skip=(), **kwargs):
+        """
+        여러 칸 아이템은 한 셀만 yield (격자선 정보가 없는 이전 프로필이면 셀마다 yield)
+
+        :param kwargs: iter_item_cells() 인자 (footprints, serpentine, active 등)
+        """
+        if not self.has_seams:
+            kwargs.pop('footprints', None)
+            kwargs.pop('max_footprint', None)
+            return self.iter_occupied(current_img, skip=skip, **kwargs)
+        return iter_item_cells(self.ratios, (self.column_seams, self.row_seams), current_img,
+                               self.grid_width, self.grid_height, skip=skip, **kwargs)
+
+    def still_occupied(self, current_img, cells, **kwargs):
+        """지정한 셀만 다시 검사하여 여전히 아이템이 있는 셀 목록 반환"""
+        return still_occupied_cells(self.ratios, current_img, cells,
+                                    self.grid_width, self.grid_height, **kwargs)
+
+    def save(self, path):
+        """압축된 .npz 파일로 저장"""
+        np.savez_compressed(
+            path,
+            start_pos=np.array(self.start_pos),
+            end_pos=np.array(self.end_pos),
+            screen_size=np.array(self.screen_size),
+            grid=np.array((self.grid_width, self.grid_height)),
+            ratios=self.ratios,
+            histograms=self.histograms,
+            edge_energy=self.edge_energy,
+            version=np.array(PROFILE_VERSION),
+            **({'column_seams': self.column_seams, 'row_seams': self.row_seams} if self.has_seams else {}),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """.npz 파일에서 프로필 로드"""
+        with np.load(path) as data:
+            grid_width, grid_height = (int(v) for v in data['grid'])
+            # 잘라낸 셀 경계로 측정한 이전 버전 격자선 세기는 버림 (ReferenceStore가 PNG에서 재계산)
+            current = 'version' in data and int(data['version']) >= PROFILE_VERSION
+            return cls(
+                tuple(int(v) for v in data['start_pos']),
+                tuple(int(v) for v in data['end_pos']),
+                tuple(int(v) for v in data['screen_size']),
+                grid_width, grid_height,
+                ratios=data['ratios'],
+                histograms=data['histograms'],
+                edge_energy=data['edge_energy'],
+                column_seams=data['column_seams'] if current and 'column_seams' in data else None,
+                row_seams=data['row_seams'] if current and 'row_seams' in data else None,
+            )
+
+
+def reference_profile_path(config_file, start_pos, end_pos, screen_size, layout=None):
+    """
+    설정 파일 옆에 영역/해상도별로 저장되는 프로필 경로
+
+    :param layout: 레이아웃 이름 (같은 영역을 쓰는 일반/쿼드 창고처럼 레이아웃끼리 덮어쓰지 않도록 구분)
+    """
+    base = os.path.splitext(os.path.abspath(config_file))[0]
+    if layout:
+        base = f"{base}_{layout}"
+    key = "_".join(str(int(v)) for v in (*start_pos, *end_pos))
+    return f"{base}_ref_{key}_{screen_size[0]}x{screen_size[1]}.npz"
+
+
+def reference_image_path(config_file, start_pos, end_pos, screen_size, layout=None):
+    """프로필과 같은 이름으로 저장되는 빈 인벤토리 원본 PNG 경로"""
+    path = reference_profile_path(config_file, start_pos, end_pos, screen_size, layout)
+    return os.path.splitext(path)[0] + ".png"
+
+
+def load_reference_profile(config_file, start_pos, end_pos, screen_size, grid_width, grid_height,
+                           layout=None):
+    """저장된 프로필이 있고 현재 설정과 일치하면 반환, 아니면 None"""
+    path = reference_profile_path(config_file, start_pos, end_pos, screen_size, layout)
+    if not os.path.exists(path):
+        return None
+    try:
+        profile = ReferenceProfile.load(path)
+    except Exception as e:
+        log.error(f"기준 프로필 로드 오류: {e}")
+        return None
+    if not profile.matches(start_pos, end_pos, screen_size, grid_width, grid_height):
+        return None
+    return profile
+
+
+class ReferenceStore:
+    """
+    빈 인벤토리 기준 데이터 (PNG 원본 + .npz 통계)
+
+    재시작 후에도 감지가 동작하도록 디스크에 저장하고, 처음 필요할 때 로드한다.
+    통계 파일이 없거나 그리드가 바뀐 경우 PNG에서 다시 계산한다.
+    """
+
+    def __init__(self, config_file, start_pos, end_pos, screen_size, grid_width, grid_height,
+                 image_path=None, layout=None):
+        self.config_file = config_file
+        self.start_pos = tuple(start_pos)
+        self.end_pos = tuple(end_pos)
+        self.screen_size = tuple(screen_size)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.layout = layout
+        self.image_path = image_path or reference_image_path(
+            config_file, start_pos, end_pos, screen_size, layout)
+        self.profile_path = reference_profile_path(config_file, start_pos, end_pos, screen_size, layout)
+        self._image = None
+        self._profile = None
+
+    def save(self, image):
+        """새 빈 인벤토리 캡처를 저장하고 통계 계산"""
+        self._image = image
+        self._profile = ReferenceProfile.from_image(
+            image, self.start_pos, self.end_pos, self.screen_size,
+            self.grid_width, self.grid_height)
+        try:
+            image.save(self.image_path)
+            self._profile.save(self.profile_path)
+        except Exception as e:
+            log.error(f"기준 데이터 저장 오류: {e}")
+        return self._profile
+
+    @property
+    def image(self):
+        """빈 인벤토리 원본 (미리보기용, 지연 로드)"""
+        if self._image is None and os.path.exists(self.image_path):
+            try:
+                from PIL import Image
+                with Image.open(self.image_path) as img:
+                    self._image = img.convert('RGB')
+            except Exception as e:
+                log.error(f"기준 이미지 로드 오류: {e}")
+        return self._image
+
+    @property
+    def profile(self):
+        """감지용 셀 통계 (지연 로드, 없으면 PNG에서 재계산)"""
+        if self._profile is None:
+            self._profile = load_reference_profile(
+                self.config_file, self.start_pos, self.end_pos, self.screen_size,
+                self.grid_width, self.grid_height, self.layout)
+        if self._profile is not None and not self._profile.has_seams and self.image is not None:
+            # 격자선 정보가 없는 이전 버전 프로필은 PNG에서 다시 계산
+            self._profile = None
+        if self._profile is None and self.image is not None:
+            self._profile = ReferenceProfile.from_image(
+                self.image, self.start_pos, self.end_pos, self.screen_size,
+                self.grid_width, self.grid_height)
+            try:
+                self._profile.save(self.profile_path)
+            except Exception as e:
+                log.error(f"기준 프로필 저장 오류: {e}")
+        return self._profile
@@ -0,0 +1,163 @@
+import numpy as np
+
+# 클릭 순서 결정 방식
+ROUTE_ROW = 'row'                # 행 우선 (기존 방식)
+ROUTE_SERPENTINE = 'serpentine'  # 행마다 방향을 바꾸는 지그재그
+ROUTE_NEAREST = 'nearest'        # 가장 가까운 셀부터 (+ 2-opt 개선)
+ROUTE_EXACT = 'exact'            # 셀이 적으면 최단 경로 완전 탐색, 많으면 nearest
+ROUTE_METHODS = (ROUTE_ROW, ROUTE_SERPENTINE, ROUTE_NEAREST, ROUTE_EXACT)
+
+# 완전 탐색(Held-Karp) 최대 셀 수 (2^n * n^2 연산)
+EXACT_MAX_CELLS = 8
+# 2-opt 개선을 적용할 최대 셀 수 (n^2 연산 반복)
+TWO_OPT_MAX_CELLS = 60
+
+
+def cell_centers(cells, cell_width=1.0, cell_height=1.0):
+    """셀 목록의 중심 좌표 배열 (n x 2, 캡처 영역 기준 픽셀)"""
+    if not cells:
+        return np.zeros((0, 2))
+    cells = np.asarray(cells, dtype=float)
+    return (cells + 0.5) * (cell_width, cell_height)
+
+
+def route_length(cells, cell_width=1.0, cell_height=1.0, start=None):
+    """주어진 순서대로 셀을 클릭할 때 커서 이동 거리 (start가 있으면 시작점 포함)"""
+    points = cell_centers(cells, cell_width, cell_height)
+    if start is not None and len(points):
+        points = np.vstack([start, points])
+    if len(points) < 2:
+        return 0.0
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
+
+
+def _serpentine(cells):
+    rows = {}
+    for x, y in sorted(cells, key=lambda c: (c[1], c[0])):
+        rows.setdefault(y, []).append((x, y))
+    ordered = []
+    for index, y in enumerate(sorted(rows)):
+        ordered.extend(rows[y] if index % 2 == 0 else reversed(rows[y]))
+    return ordered
+
+
+def _nearest(points, start):
+    count = len(points)
+    remaining = np.ones(count, dtype=bool)
+    order = []
+    position = start if start is not None else points[0]
+    for _ in range(count):
+        dist = np.hypot(*(points - position).T)
+        dist[~remaining] = np.inf
+        index = int(np.argmin(dist))
+        order.append(index)
+        remaining[index] = False
+        position = points[index]
+    return order
+
+
+def _two_opt(order, dist, start_dist):
+    """열린 경로 2-opt 개선 (구간 뒤집기로 거리가 줄면 반복)"""
+    # 파이썬 루프에서는 리스트 인덱싱이 numpy 스칼라 인덱싱보다 빠름
+    dist = dist.tolist()
+    start_dist = start_dist.tolist()
+
+    def edge(a, b):
+        # a가 -1이면 시작점
+        return start_dist[b] if a < 0 else dist[a][b]
+
+    improved = True
+    count = len(order)
+    while improved:
+        improved = False
+        for i in range(count - 1):
+            prev = order[i - 1] if i > 0 else -1
+            for j in range(i + 1, count):
+                after = order[j + 1] if j + 1 < count else None
+                before = edge(prev, order[i]) + (dist[order[j]][after] if after is not None else 0)
+                changed = edge(prev, order[j]) + (dist[order[i]][after] if after is not None else 0)
+                if changed < before - 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+    return order
+
+
+def _held_karp(dist, start_dist):
+    """시작점에서 출발해 모든 셀을 한 번씩 방문하는 최단 열린 경로 (완전 탐색)"""
+    count = len(start_dist)
+    full = (1 << count) - 1
+    cost = {(1 << j, j): (start_dist[j], None) for j in range(count)}
+    for mask in range(1, full + 1):
+        for last in range(count):
+            if (mask, last) not in cost:
+                continue
+            base = cost[(mask, last)][0]
+            for nxt in range(count):
+                if mask & (1 << nxt):
+                    continue
+                key = (mask | (1 << nxt), nxt)
+                value = base + dist[last, nxt]
+                if key not in cost or value < cost[key][0]:
+                    cost[key] = (value, last)
+
+    last = min(range(count), key=lambda j: cost[(full, j)][0])
+    order = []
+    mask = full
+    while last is not None:
+        order.append(last)
+        prev = cost[(mask, last)][1]
+        mask &= ~(1 << last)
+        last = prev
+    return order[::-1]
+
+
+def plan_route(cells, method=ROUTE_NEAREST, cell_width=1.0, cell_height=1.0, start=None):
+    """
+    커서 이동 거리가 짧아지도록 클릭 순서 결정
+
+    :param cells: (x, y) 셀 목록
+    :param method: ROUTE_METHODS 중 하나
+    :param start: 시작 커서 위치 (캡처 영역 기준 픽셀), 없으면 첫 셀에서 시작
+    :return: 정렬된 셀 목록
+    """
+    cells = [tuple(c) for c in cells]
+    if len(cells) < 2 or method == ROUTE_ROW:
+        return sorted(cells, key=lambda c: (c[1], c[0]))
+    if method == ROUTE_SERPENTINE:
+        return _serpentine(cells)
+
+    points = cell_centers(cells, cell_width, cell_height)
+    start_point = np.asarray(start, dtype=float) if start is not None else None
+
+    def distances():
+        # 셀 간 거리 행렬 (n x n), 완전 탐색/2-opt에만 필요 (쿼드 창고처럼 셀이 많으면 만들지 않음)
+        dist = np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+        if start_point is not None:
+            return dist, np.hypot(*(points - start_point).T)
+        return dist, np.zeros(len(cells))
+
+    if method == ROUTE_EXACT and len(cells) <= EXACT_MAX_CELLS:
+        order = _held_karp(*distances())
+    elif method in (ROUTE_NEAREST, ROUTE_EXACT):
+        order = _nearest(points, start_point)
+        if len(cells) <= TWO_OPT_MAX_CELLS:
+            order = _two_opt(order, *distances())
+        # 빽빽한 인벤토리에서는 지그재그가 더 짧을 수 있으므로 비교
+        nearest = [cells[i] for i in order]
+        serpentine = _serpentine(cells)
+        if (route_length(serpentine, cell_width, cell_height, start)
+                < route_length(nearest, cell_width, cell_height, start)):
+            return serpentine
+        return nearest
+    else:
+        raise ValueError(f"알 수 없는 클릭 순서 방식: {method}")
+    return [cells[i] for i in order]
+
+
+def travel_saving(ordered_cells, cell_width=1.0, cell_height=1.0, start=None):
+    """행 우선 순서 대비 이동 거리 (기존 거리, 새 거리) 반환"""
+    baseline = route_length(sorted(ordered_cells, key=lambda c: (c[1], c[0])),
+                            cell_width, cell_height, start)
+    planned = route_length(ordered_cells, cell_width, cell_height, start)
+    return baseline, planned
+
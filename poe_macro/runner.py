@@ -0,0 +1,175 @@
+import logging
+import threading
+
+from .cancel import CancelToken
+from .readiness import READY_TIMEOUT, wait_until_ready
+
+log = logging.getLogger(__name__)
+
+# 보조키를 누른 뒤 첫 클릭까지 대기 (초, 키 입력 안정화)
+MODIFIER_SETTLE = 0.1
+
+
+class MacroRunner:
+    """
+    매크로 실행 스레드 하나의 시작/중지 관리 (GUI 공용)
+
+    실행마다 CancelToken을 새로 만들어 작업 함수에 넘기고, 작업이 끝나면(중지/오류 포함)
+    on_finish를 schedule로 UI 스레드에 넘긴다. 작업 스레드는 Tk를 직접 호출하지 않는다.
+
+    :param schedule: UI 스레드에서 실행할 함수 schedule(동작) (예: UiUpdateQueue.post), 없으면 작업 스레드에서 호출
+    """
+
+    def __init__(self, schedule=None):
+        self.schedule = schedule
+        self.token = None  # 실행 중인 작업의 CancelToken
+        self.last_stop_latency = None  # 마지막 중지 요청부터 정지까지 걸린 시간(초)
+
+    @property
+    def running(self):
+        """실행 중이고 중지 요청을 받지 않았는지"""
+        token = self.token
+        return token is not None and not token.cancelled
+
+    def start(self, work, *args, on_finish=None):
+        """
+        작업 스레드 시작
+
+        :param work: 작업 함수 work(token, *args) (작업 스레드에서 실행)
+        :param on_finish: 작업이 끝난 뒤 UI 스레드에서 실행할 함수 on_finish(token)
+        :return: 시작했으면 True (이미 실행 중이면 False)
+        """
+        if self.running:
+            return False
+        token = CancelToken()
+        self.token = token
+        threading.Thread(target=self._run, args=(token, work, args, on_finish), daemon=True).start()
+        return True
+
+    def _run(self, token, work, args, on_finish):
+        try:
+            work(token, *args)
+        except Exception as e:
+            log.error(f"매크로 실행 오류: {e}")
+        finally:
+            latency = token.finish()
+            if latency is not None:
+                self.last_stop_latency = latency
+                log.info(f"중지 요청부터 정지까지 {latency * 1000:.1f}ms")
+            # 그 사이 새 실행이 시작됐으면 새 실행의 토큰은 건드리지 않음
+            if self.token is token:
+                self.token = None
+            if on_finish is not None:
+                if self.schedule is None:
+                    on_finish(token)
+                else:
+                    self.schedule(lambda: on_finish(token))
+
+    def stop(self):
+        """
+        실행 중인 작업에 중지 요청 (대기 중인 작업 스레드가 바로 깨어남)
+
+        :return: 중지 요청을 보냈으면 True
+        """
+        token = self.token
+        if token is None or token.cancelled:
+            return False
+        token.cancel()
+        return True
+
+
+def wait_for_game(engine, cancel=None, timeout=READY_TIMEOUT, is_focused=None):
+    """
+    실행 시작 후 게임 창이 전면에 오고 인벤토리 화면이 멈출 때까지 대기 (engine.configure() 이후 호출)
+
+    이미 게임 창이 활성화되어 있으면 몇 프레임 만에 돌아오고, 확인하지 못해도 timeout 뒤에는 그대로 진행한다.
+    창 포커스를 확인할 수 없는 환경이면 화면이 멈췄는지만 확인한다.
+
+    :param is_focused: 게임 창이 전면에 있는지 반환하는 함수 (기본값 window.is_game_focused)
+    :return: 준비되었으면 True, 시간 초과로 그대로 진행하면 False (중지되었으면 None)
+    """
+    if is_focused is None:
+        from .window import is_game_focused as is_focused
+    focus_error = []
+
+    def focused():
+        if focus_error:
+            return True
+        try:
+            return is_focused()
+        except Exception as e:
+            log.error(f"게임 창 포커스 확인 오류, 화면 안정만 확인: {e}")
+            focus_error.append(e)
+            return True
+
+    ready = wait_until_ready(focused, engine.sample, timeout=timeout, cancel=cancel)
+    if cancel is not None and cancel.cancelled:
+        return None
+    if not ready:
+        log.warning(f"{timeout:.2f}초 안에 게임 창 준비를 확인하지 못해 그대로 진행합니다 "
+                    f"(게임 창이 전면에 있는지 확인하세요)")
+    return ready
+
+
+def click_with_modifier(engine, cells, delay, cancel=None, modifier=None, keyboard=None,
+                        settle=MODIFIER_SETTLE, on_click=None):
+    """
+    보조키(Ctrl 등)를 누른 채 셀 클릭 (중지/오류 시에도 보조키는 항상 해제)
+
+    :param modifier: 누르고 있을 키 이름 (None이면 누르지 않음)
+    :param keyboard: press(키)/release(키) 함수를 가진 객체 (기본값 keyboard 모듈)
+    :return: 클릭한 셀 목록
+    """
+    if modifier is None:
+        return engine.click_cells(cells, delay, cancel=cancel, on_click=on_click)
+    if keyboard is None:
+        import keyboard
+    keyboard.press(modifier)
+    try:
+        if engine.sleep(settle, cancel):
+            return []
+        return engine.click_cells(cells, delay, cancel=cancel, on_click=on_click)
+    finally:
+        keyboard.release(modifier)
+
+
+def run_inventory_pass(engine, start_pos, end_pos, excluded, initial, delay, cancel=None,
+                       modifier=None, keyboard=None, ready_timeout=READY_TIMEOUT, is_focused=None,
+                       on_frame=None, on_detect=None, on_click=None):
+    """
+    단순 GUI(main.py, poe_auto_compare_img.py)의 한 번 실행: 창 전환 대기 → 캡처 → 감지 → 클릭
+
+    :param excluded: 제외할 (x, y) 셀
+    :param initial: 빈 인벤토리 이미지 (None이면 감지하지 않고 모든 셀 클릭)
+    :param ready_timeout: 게임 창 준비 최대 대기(초), is_focused와 함께 wait_for_game()으로 넘김
+    :param on_frame: 캡처 직후 on_frame(frame) (미리보기용, 작업 스레드에서 호출)
+    :param on_detect: 감지 직후 on_detect(아이템 셀 목록)
+    :param on_click: 클릭 직후 on_click(x, y)
+    :return: 클릭한 셀 목록 (중지되면 None)
+    """
+    plan = engine.configure(start_pos, end_pos, excluded)
+    if wait_for_game(engine, cancel, ready_timeout, is_focused) is None:
+        return None
+    frame = engine.grab()
+    if on_frame is not None:
+        on_frame(frame)
+
+    if initial is None:
+        log.info("일반 모드: 모든 셀을 클릭합니다.")
+        cells = plan.cells
+    else:
+        # 전체 셀을 한 번에 비교 (제외된 셀은 그리드 계획의 마스크로 건너뜀)
+        cells = engine.detect_cells(initial, frame)
+        log.info(f"총 {len(cells)}개 셀에서 아이템 감지됨: {cells}")
+        if on_detect is not None:
+            on_detect(cells)
+        if not cells:
+            log.info("감지된 아이템이 없습니다. 클릭을 실행하지 않습니다.")
+            return []
+    if cancel is not None and cancel.cancelled:
+        return None
+
+    clicked = click_with_modifier(engine, cells, delay, cancel, modifier, keyboard, on_click=on_click)
+    if cancel is not None and cancel.cancelled:
+        return None
+    return clicked
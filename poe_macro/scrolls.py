@@ -0,0 +1,260 @@
+import logging
+from itertools import islice
+
+import numpy as np
+
+from .detection import cell_edges, to_gray
+
+log = logging.getLogger(__name__)
+
+# 묶음 수량 글자가 표시되는 영역 (셀 왼쪽 위, 셀 크기 대비 left, top, right, bottom)
+COUNT_REGION = (0.0, 0.0, 0.6, 0.4)
+# 수량 글자 픽셀: 밝고 채도가 낮음 (주문서 아이콘의 양피지 색과 구분)
+TEXT_MIN_GRAY = 200
+TEXT_MAX_SATURATION = 40
+# 숫자 한 글자 너비 (셀 너비 대비)
+DIGIT_WIDTH_RATIO = 0.16
+# 주문서 사용 후 수량 표시가 바뀔 때까지 대기 (초)
+STACK_SETTLE = 0.05
+# 수량 글자가 견본과 다른 픽셀 비율이 이 값 이하면 같은 수량으로 읽음
+GLYPH_MAX_MISMATCH = 0.05
+
+
+def cell_image(frame, cell, grid_width, grid_height):
+    """캡처에서 셀 하나의 RGB 블록 (감지와 같은 셀 경계 사용)"""
+    row_edges = cell_edges(frame.shape[0], grid_height)
+    col_edges = cell_edges(frame.shape[1], grid_width)
+    x, y = cell
+    return frame[row_edges[y]:row_edges[y + 1], col_edges[x]:col_edges[x + 1]]
+
+
+def count_glyph(image):
+    """
+    셀 이미지의 수량 글자 픽셀 마스크 (글자를 감싸는 사각형으로 자름)
+
+    :param image: 셀 하나의 RGB 배열
+    :return: bool 배열 (글자가 없으면 None)
+    """
+    height, width = image.shape[:2]
+    left, top, right, bottom = COUNT_REGION
+    region = image[int(height * top):int(height * bottom), int(width * left):int(width * right), :3]
+    if not region.size:
+        return None
+    saturation = region.max(axis=2).astype(np.int16) - region.min(axis=2)
+    text = (to_gray(region) >= TEXT_MIN_GRAY) & (saturation <= TEXT_MAX_SATURATION)
+    rows = np.flatnonzero(text.any(axis=1))
+    if not rows.size:
+        return None
+    columns = np.flatnonzero(text.any(axis=0))
+    return text[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+
+
+def stack_digits(image, glyph=None):
+    """
+    셀 이미지의 수량 글자 자릿수 추정
+
+    :param image: 셀 하나의 RGB 배열
+    :param glyph: 이미 구한 count_glyph(image) (없으면 새로 구함)
+    :return: 0(글자 없음), 1 또는 2
+    """
+    if glyph is None:
+        glyph = count_glyph(image)
+        if glyph is None:
+            return 0
+    text_width = glyph.shape[1]
+    return min(max(int(round(text_width / (image.shape[1] * DIGIT_WIDTH_RATIO))), 1), 2)
+
+
+def min_stack_size(digits):
+    """
+    자릿수로 추정한 최소 수량 (두 자리면 9, 그 외는 1)
+
+    자릿수는 글자 너비로 짐작한 값이라 두 자리도 10이 아닌 9로 한 개 여유를 둔다.
+    수량 글자를 아직 배우지 못한 한 자리 묶음(1~9개)은 한 번 클릭할 때마다 다시 확인한다.
+    """
+    return 10 ** (digits - 1) - 1 if digits > 1 else 1
+
+
+class StackCountReader:
+    """
+    수량 글자 모양 → 수량 견본 (실행 중 관찰한 글자로 스스로 학습, 세션 동안 유지)
+
+    한 번 클릭할 때마다 확인하던 묶음이 비면 그 묶음에서 본 글자마다 실제 수량
+    (빌 때까지 쓴 수 - 글자를 본 시점까지 쓴 수)을 알 수 있으므로 견본으로 저장한다.
+    글자 모양은 셀 크기마다 다르므로 크기가 같은 견본끼리만 비교한다.
+
+    :param max_mismatch: 견본과 다른 픽셀 비율이 이 값 이하면 같은 수량으로 읽음
+    """
+
+    def __init__(self, max_mismatch=GLYPH_MAX_MISMATCH):
+        self.max_mismatch = max_mismatch
+        self.templates = {}  # 수량 -> 글자 마스크 목록 (레이아웃마다 하나)
+
+    def read(self, glyph):
+        """
+        글자 마스크로 수량 읽기
+
+        :return: 가장 비슷한 견본의 수량 (비슷한 견본이 없으면 None)
+        """
+        if glyph is None:
+            return None
+        best, best_mismatch = None, self.max_mismatch
+        for count, masks in self.templates.items():
+            for mask in masks:
+                if mask.shape != glyph.shape:
+                    continue
+                mismatch = float(np.mean(mask != glyph))
+                if mismatch <= best_mismatch:
+                    best, best_mismatch = count, mismatch
+        return best
+
+    def learn(self, observations, total_used):
+        """
+        빈 것을 확인한 묶음의 관찰 기록으로 견본 추가
+
+        :param observations: (글자 마스크, 그 시점까지 쓴 수) 목록
+        :param total_used: 묶음이 빌 때까지 쓴 수 (마지막 한 번 클릭 뒤 빈 것을 확인한 경우만 정확함)
+        """
+        for glyph, used_at in observations:
+            count = total_used - used_at
+            if glyph is None or count <= 0:
+                continue
+            if self.read(glyph) == count:
+                continue
+            # 같은 모양의 다른 수량 견본은 잘못 배운 것이므로 지움
+            for other, masks in self.templates.items():
+                masks[:] = [mask for mask in masks
+                            if mask.shape != glyph.shape or np.mean(mask != glyph) > self.max_mismatch]
+            self.templates.setdefault(count, []).append(glyph.copy())
+            log.debug(f"감정 주문서 수량 글자 학습: {count}개")
+
+
+class ScrollStacks:
+    """
+    감정 주문서 묶음 여러 개를 순서대로 사용하며 남은 수량 추적
+
+    묶음 셀의 수량 글자를 reader로 읽을 수 있으면 그 수량을 한 번에 쓰고, 읽지 못하면
+    자릿수로 남은 최소 수량을 추정해 그만큼 쓴 뒤 다시 확인한다.
+    확인했을 때 셀이 비어 있으면 다음 묶음으로 넘어간다.
+
+    :param cells: 사용할 순서대로 주문서 셀 목록
+    :param reader: 수량 글자 견본 StackCountReader (실행마다 같은 것을 넘기면 학습 결과 유지)
+    """
+
+    def __init__(self, cells, reader=None):
+        self.cells = list(cells)
+        self.reader = reader if reader is not None else StackCountReader()
+        self.index = 0
+        self.remaining = 0  # 현재 묶음에 남은 수량 (읽지 못했으면 최소 추정치)
+        self.used = {cell: 0 for cell in self.cells}  # 묶음별 이번 실행 사용 수
+        self._observed = []  # 현재 묶음에서 본 (글자 마스크, 그 시점까지 쓴 수)
+        self._last_consumed = 0  # 마지막 확인 이후 쓴 수
+
+    @property
+    def current(self):
+        return self.cells[self.index] if self.index < len(self.cells) else None
+
+    def update(self, image, occupied):
+        """
+        현재 묶음 셀 캡처로 남은 수량 갱신
+
+        :param image: 현재 묶음 셀의 RGB 배열
+        :param occupied: 셀에 아이템(주문서)이 있는지
+        :return: 현재 묶음을 계속 쓸 수 있으면 True (비었으면 다음 묶음으로 넘어가고 False)
+        """
+        if self.current is None:
+            return False
+        cell = self.current
+        if not occupied:
+            log.info(f"감정 주문서 묶음 {cell} 소진 ({self.used[cell]}개 사용)")
+            # 한 번 쓰고 바로 빈 것을 확인했으면 쓴 수가 정확하므로 본 글자들의 수량을 배움
+            if self._observed and self._last_consumed == 1:
+                self.reader.learn(self._observed, self.used[cell])
+            self.index += 1
+            self.remaining = 0
+            self._observed = []
+            self._last_consumed = 0
+            return False
+        glyph = count_glyph(image)
+        self._observed.append((glyph, self.used[cell]))
+        self._last_consumed = 0
+        count = self.reader.read(glyph)
+        if count is None:
+            count = min_stack_size(stack_digits(image, glyph) if glyph is not None else 0)
+        self.remaining = count
+        return True
+
+    def select_first(self, frame, occupied_cells, grid_width, grid_height):
+        """
+        실행 시작 캡처로 처음 사용할 묶음 선택 (빈 묶음은 건너뜀)
+
+        :param occupied_cells: 주문서 셀 중 아이템이 있는 셀
+        :return: 사용할 묶음 셀 (없으면 None)
+        """
+        occupied_cells = set(occupied_cells)
+        while self.current is not None:
+            cell = self.current
+            if self.update(cell_image(frame, cell, grid_width, grid_height), cell in occupied_cells):
+                return cell
+        return None
+
+    def consume(self, count):
+        if self.current is None:
+            return
+        self.used[self.current] += count
+        self.remaining = max(self.remaining - count, 0)
+        self._last_consumed += count
+
+
+def appraise_cells(engine, reference_profile, stacks, cells, delay, select_stack, cancel=None,
+                   on_click=None, settle_delay=STACK_SETTLE):
+    """
+    주문서 묶음을 바꿔 가며 셀 감정
+
+    남은 수량만큼 나눠 클릭하고, 나눈 묶음마다 주문서 셀만 다시 캡처해 수량을 확인한다.
+    묶음이 비면 다음 묶음을 들고 이어서 감정하며, 모든 묶음이 비면 남은 셀을 반환한다.
+    묶음을 드는 것은 클릭할 셀이 남아 있을 때만 한다 (마지막에 주문서를 든 채 끝나지 않도록).
+    수량 글자를 읽을 수 있는 묶음은 읽은 수량만큼 다시 캡처하지 않고 클릭한 뒤 한 번만 확인한다.
+    아직 글자를 배우지 못한 한 자리 묶음만 한 번 클릭할 때마다 settle_delay 대기와 캡처가 한 번씩 더 들고
+    (대략 클릭당 50~60ms), 그 묶음이 비면 본 글자들을 배워 다음 묶음부터는 읽는다.
+
+    :param stacks: ScrollStacks (select_first()로 첫 묶음을 이미 고른 상태)
+    :param cells: 감정할 (x, y) 셀 반복자 (감지 결과 생성기도 가능)
+    :param select_stack: 묶음을 들어 올리는 함수 select_stack(셀) (Shift 떼기 → 우클릭 → Shift 누르기)
+    :param cancel: CancelToken
+    :return: (감정한 셀 목록, 주문서가 모자라 감정하지 못한 셀 목록)
+    """
+    source = iter(cells)
+    appraised = []
+    grid_width, grid_height = engine.grid_width, engine.grid_height
+    held = None  # 지금 들고 있는 묶음
+
+    while stacks.current is not None:
+        if cancel is not None and cancel.cancelled:
+            return appraised, []
+        chunk = list(islice(source, max(stacks.remaining, 1)))
+        if not chunk:
+            return appraised, []
+        if held != stacks.current:
+            held = stacks.current
+            select_stack(held)
+            if cancel is not None and cancel.cancelled:
+                return appraised, []
+        clicked = engine.click_cells(chunk, delay, jitter=0, cancel=cancel, on_click=on_click)
+        appraised.extend(clicked)
+        stacks.consume(len(clicked))
+        if cancel is not None and cancel.cancelled:
+            return appraised, []
+
+        # 수량 표시가 바뀐 뒤 현재 묶음 셀만 다시 캡처
+        if engine.sleep(settle_delay, cancel):
+            return appraised, []
+        cell = stacks.current
+        frame = engine.grab_cells([cell])
+        occupied = bool(reference_profile.still_occupied(frame, [cell]))
+        stacks.update(cell_image(frame, cell, grid_width, grid_height), occupied)
+
+    remaining = list(source)
+    if remaining:
+        log.info(f"감정 주문서가 모두 소진되어 {len(remaining)}개 셀을 감정하지 못함")
+    return appraised, remaining
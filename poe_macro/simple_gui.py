@@ -0,0 +1,715 @@
+"""
+단순 인벤 정리 GUI (main.py, poe_auto_compare_img.py 공용 Tk 프런트엔드)
+
+Tk/keyboard/pygetwindow가 필요하므로 패키지 __init__에서는 불러오지 않는다.
+"""
+
+import logging
+import socket
+import sys
+import tkinter as tk
+from tkinter import messagebox
+
+import keyboard
+import pygetwindow as gw
+from PIL import Image, ImageTk
+
+from .config import CONFIG_FILE, load_config, save_config
+from .engine import MacroEngine
+from .geometry import canvas_cell
+from .hotkeys import HotkeyDispatcher
+from .logger import set_log_level, setup_logging
+from .runner import MacroRunner, run_inventory_pass
+from .thumbnail import make_thumbnail
+from .tkui import AreaSelector, ask_hotkey
+from .uiqueue import UiUpdateQueue
+from .window import find_game_window
+
+log = logging.getLogger(__name__)
+
+
+class SimpleMacroApp:
+    """
+    단순 인벤 정리 GUI (main.py, poe_auto_compare_img.py 공용): 영역 선택 → 빈 인벤토리 비교 → Ctrl 클릭
+
+    :param global_esc: 영역 선택 중 전역 키보드 훅으로도 ESC를 받을지 (게임 창에 포커스가 있어도 취소)
+    :param save_settings: 클릭 간격/Ctrl 유지/창 최소화/아이템 감지 설정을 저장하고 변경 즉시 저장할지
+    """
+
+    def __init__(self, global_esc=False, save_settings=True):
+        self.global_esc = global_esc
+        self.save_settings = save_settings
+        self.start_pos = None
+        self.end_pos = None
+        self.grid_width = 12
+        self.grid_height = 5
+        self.excluded_cells = []
+        self.config_file = CONFIG_FILE
+        self.inventory_image_path = None
+        self.initial_screenshot = None
+        self.macro_screenshot = None
+        self.engine = MacroEngine(self.grid_width, self.grid_height)  # 캡처/감지/클릭 엔진
+        self.ui_updates = UiUpdateQueue()  # 작업 스레드 → UI 갱신 채널 (메인 루프가 주기적으로 처리)
+        self.runner = MacroRunner(schedule=self.ui_updates.post)  # 실행 스레드 시작/중지
+        self.initial_tk_image = None
+        self.macro_tk_image = None
+        self.area_selector = None  # 영역 선택 오버레이 (create_gui에서 생성)
+        self.similarity_threshold = 0  # 이미지 유사성 임계값 (낮을수록 더 엄격함)
+        self.run_hotkey = "f6"  # 실행 단축키 기본값
+        self.stop_hotkey = "f7"  # 중지 단축키 기본값
+        self.hotkeys = None  # 단축키 디스패처 (start_hotkey_listener에서 생성)
+        self._click_delay_value = 0.1
+        self._use_ctrl_click_value = True
+        self._minimize_window_value = False
+        self._detect_items_value = True
+        
+        # 기본 설정 로드
+        self.load_config()
+        
+        # GUI 생성
+        self.create_gui()
+        
+    @property
+    def is_running(self):
+        """매크로 실행 중인지 (중지 요청을 받으면 바로 False)"""
+        return self.runner.running
+        
+    def load_config(self):
+        """설정 파일 로드"""
+        config = load_config(self.config_file)
+        set_log_level(config.get('log_level', 'INFO'))  # DEBUG면 셀별 진단 로그 출력
+        self.start_pos = config.get('start_pos')
+        self.end_pos = config.get('end_pos')
+        # JSON에는 [x, y] 리스트로 저장되므로 (x, y) 튜플로 맞춤
+        self.excluded_cells = [tuple(cell) for cell in config.get('excluded_cells', [])]
+        self.inventory_image_path = config.get('inventory_image_path')
+        self.similarity_threshold = config.get('similarity_threshold', 50)
+        self.run_hotkey = config.get('run_hotkey', 'f6')
+        self.stop_hotkey = config.get('stop_hotkey', 'f7')
+        if not self.save_settings:
+            return
+        # 임시 변수에 설정값 저장
+        self._click_delay_value = config.get('click_delay', 0.1)
+        self._use_ctrl_click_value = config.get('use_ctrl_click', True)
+        self._minimize_window_value = config.get('minimize_window', False)
+        self._detect_items_value = config.get('detect_items', True)
+    
+    def save_config(self):
+        """설정 파일 저장"""
+        config = {
+            'start_pos': self.start_pos,
+            'end_pos': self.end_pos,
+            'excluded_cells': self.excluded_cells,
+            'inventory_image_path': self.inventory_image_path,
+            'similarity_threshold': self.similarity_threshold,
+            'run_hotkey': self.run_hotkey,
+            'stop_hotkey': self.stop_hotkey,
+        }
+        if self.save_settings:
+            # Tkinter 변수는 .get()으로 실제 값을 가져와야 함
+            config.update({
+                'click_delay': float(self.click_delay.get()),
+                'use_ctrl_click': bool(self.use_ctrl_click.get()),
+                'minimize_window': bool(self.minimize_window.get()),
+                'detect_items': bool(self.detect_items.get()),
+            })
+        save_config(self.config_file, config)
+            
+    def create_gui(self):
+        """GUI 생성"""
+        self.root = tk.Tk()
+        self.root.title("하드웨어 수준 Path of Exile 매크로")
+        self.root.geometry("500x700")  # 창 크기 줄임
+        
+        # 작업 스레드의 UI 변경은 큐에 모았다가 메인 루프에서 한꺼번에 처리
+        self.ui_updates.start(self.root.after, self.root.after_cancel)
+        
+        # 영역 선택 오버레이
+        self.area_selector = AreaSelector(self.root, self.on_area_selected, self.on_selection_cancel,
+                                          global_esc=self.global_esc, schedule=self.ui_updates.post)
+        
+        # 여기서 Tkinter 변수 초기화
+        self.click_delay = tk.DoubleVar(value=self._click_delay_value)
+        self.use_ctrl_click = tk.BooleanVar(value=self._use_ctrl_click_value)
+        self.minimize_window = tk.BooleanVar(value=self._minimize_window_value)
+        self.detect_items = tk.BooleanVar(value=self._detect_items_value)
+        
+        # 인벤토리 이미지 선택 프레임
+        image_select_frame = tk.Frame(self.root)
+        image_select_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.initial_image_label = tk.Label(image_select_frame, text="빈 인벤토리 이미지를 선택하세요")
+        self.initial_image_label.pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(
+            image_select_frame, 
+            text="영역 선택", 
+            command=self.select_area
+        ).pack(side=tk.RIGHT, padx=5)
+        
+        # 초기 이미지 캔버스
+        self.initial_canvas = tk.Canvas(
+            self.root, 
+            bg="black", 
+            width=400, 
+            height=166, 
+            bd=2, 
+            relief=tk.SUNKEN
+        )
+        self.initial_canvas.pack(padx=10, pady=5)
+        
+        # 영역 선택 정보
+        coords_frame = tk.Frame(self.root)
+        coords_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(coords_frame, text="시작 좌표:").grid(row=0, column=0, sticky=tk.W)
+        self.start_pos_label = tk.Label(coords_frame, text=str(self.start_pos) if self.start_pos else "미설정")
+        self.start_pos_label.grid(row=0, column=1, sticky=tk.W, padx=5)
+        
+        tk.Label(coords_frame, text="끝 좌표:").grid(row=0, column=2, sticky=tk.W, padx=10)
+        self.end_pos_label = tk.Label(coords_frame, text=str(self.end_pos) if self.end_pos else "미설정")
+        self.end_pos_label.grid(row=0, column=3, sticky=tk.W, padx=5)
+        
+        # 매크로 스크린샷 캔버스
+        self.macro_canvas = tk.Canvas(
+            self.root, 
+            bg="black", 
+            width=400, 
+            height=166, 
+            bd=2, 
+            relief=tk.SUNKEN
+        )
+        self.macro_canvas.pack(padx=10, pady=5)
+        
+        # 상태 정보 레이블
+        self.status_label = tk.Label(self.root, text="빈 인벤토리 영역을 선택하세요")
+        self.status_label.pack(padx=10, pady=5)
+        
+        # 단축키 설정 프레임
+        hotkey_frame = tk.LabelFrame(self.root, text="단축키 설정", padx=5, pady=5)
+        hotkey_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        # 실행 단축키
+        run_frame = tk.Frame(hotkey_frame)
+        run_frame.pack(fill=tk.X, pady=2)
+        tk.Label(run_frame, text="실행 단축키:").pack(side=tk.LEFT, padx=5)
+        self.run_hotkey_label = tk.Label(run_frame, text=self.run_hotkey.upper(), width=8, 
+                                    relief=tk.SUNKEN, bg="white", padx=5)
+        self.run_hotkey_label.pack(side=tk.LEFT, padx=5)
+        tk.Button(run_frame, text="변경", command=lambda: self.set_hotkey("run")).pack(side=tk.LEFT)
+
+        # 중지 단축키
+        stop_frame = tk.Frame(hotkey_frame)
+        stop_frame.pack(fill=tk.X, pady=2)
+        tk.Label(stop_frame, text="중지 단축키:").pack(side=tk.LEFT, padx=5)
+        self.stop_hotkey_label = tk.Label(stop_frame, text=self.stop_hotkey.upper(), width=8, 
+                                     relief=tk.SUNKEN, bg="white", padx=5)
+        self.stop_hotkey_label.pack(side=tk.LEFT, padx=5)
+        tk.Button(stop_frame, text="변경", command=lambda: self.set_hotkey("stop")).pack(side=tk.LEFT)
+
+        # 클릭 설정
+        settings_frame = tk.Frame(self.root)
+        settings_frame.pack(fill=tk.X, padx=10, pady=5)
+    
+        # 설정을 저장하는 경우에만 변경 즉시 저장
+        on_change = self.save_config if self.save_settings else None
+        
+        tk.Label(settings_frame, text="클릭 간격(초):").grid(row=0, column=0, sticky=tk.W)
+        click_delay_entry = tk.Entry(settings_frame, textvariable=self.click_delay, width=5)
+        click_delay_entry.grid(row=0, column=1, sticky=tk.W, padx=5)
+        if on_change is not None:
+            click_delay_entry.bind("<FocusOut>", lambda event: on_change())
+        
+        tk.Checkbutton(settings_frame, text="Ctrl 키 유지", variable=self.use_ctrl_click,
+                       command=on_change).grid(row=0, column=2, sticky=tk.W, padx=10)
+        
+        tk.Checkbutton(settings_frame, text="실행 시 창 최소화", variable=self.minimize_window,
+                       command=on_change).grid(row=0, column=3, sticky=tk.W, padx=10)
+        
+        # 이미지 비교 설정 프레임
+        compare_frame = tk.Frame(self.root)
+        compare_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Checkbutton(compare_frame, text="아이템 감지 (빈 인벤토리와 비교)",
+                       variable=self.detect_items, command=on_change).grid(row=0, column=0, sticky=tk.W)
+        
+        tk.Label(compare_frame, text="유사도 임계값:").grid(row=0, column=1, sticky=tk.W, padx=10)
+    
+        self.threshold_slider = tk.Scale(compare_frame, from_=0, to=100, orient=tk.HORIZONTAL,
+                                        variable=tk.IntVar(value=self.similarity_threshold),
+                                        command=(lambda val: on_change()) if on_change else None)
+        self.threshold_slider.grid(row=0, column=2, sticky=tk.W)
+        self.threshold_slider.set(self.similarity_threshold)
+        
+        # 실행 버튼
+        button_frame = tk.Frame(self.root)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.run_btn = tk.Button(button_frame, text="매크로 실행 (F6)", command=self.run_macro)
+        self.run_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.stop_btn = tk.Button(
+            button_frame, 
+            text="매크로 중지 (F7)", 
+            command=self.stop_macro, 
+            state=tk.DISABLED
+        )
+        self.stop_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 제외할 셀 목록
+        excluded_frame = tk.Frame(self.root)
+        excluded_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(excluded_frame, text="제외할 셀:").grid(row=0, column=0, sticky=tk.W)
+        self.excluded_label = tk.Label(excluded_frame, text=str(self.excluded_cells))
+        self.excluded_label.grid(row=0, column=1, sticky=tk.W, padx=5)
+        
+        tk.Button(excluded_frame, text="목록 초기화", command=self.clear_excluded).grid(row=0, column=2, padx=5)
+        
+        # 단축키 등록 (키보드 훅, 폴링 없음)
+        self.start_hotkey_listener()
+        
+        # 종료 시 정리 작업 설정
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        self.root.mainloop()
+
+    def set_hotkey(self, hotkey_type):
+        """단축키 설정"""
+        if hotkey_type == "run":
+            message = "실행 단축키로 사용할 키를 누르세요"
+        else:
+            message = "중지 단축키로 사용할 키를 누르세요"
+        
+        def confirm(key):
+            if hotkey_type == "run":
+                self.run_hotkey = key
+                self.run_hotkey_label.config(text=key.upper())
+            else:
+                self.stop_hotkey = key
+                self.stop_hotkey_label.config(text=key.upper())
+            
+            # 디스패처에 새 키 반영 후 저장
+            if self.hotkeys is not None:
+                self.hotkeys.set_key(hotkey_type, key)
+            self.save_config()
+            
+            # 버튼 텍스트 업데이트
+            self.run_btn.config(text=f"매크로 실행 ({self.run_hotkey.upper()})")
+            self.stop_btn.config(text=f"매크로 중지 ({self.stop_hotkey.upper()})")
+        
+        ask_hotkey(self.root, message, confirm)
+ 
+    def start_hotkey_listener(self):
+        """단축키 디스패처 시작 (키 입력 시에만 동작, 폴링 없음)"""
+        # 동작은 Tk 메인 스레드에서 실행 (훅 스레드에서 Tk 호출 없음)
+        self.hotkeys = HotkeyDispatcher(schedule=self.ui_updates.post)
+        self.hotkeys.register("run", self.run_hotkey, self.run_macro)
+        self.hotkeys.register("stop", self.stop_hotkey, self.stop_macro)
+        try:
+            self.hotkeys.start()
+            log.info(f"단축키 등록 완료: 실행={self.run_hotkey}, 중지={self.stop_hotkey}")
+        except Exception as e:
+            log.error(f"단축키 훅 등록 오류: {e}")
+    
+    def stop_hotkey_listener(self):
+        """단축키 디스패처 중지"""
+        if self.hotkeys is not None:
+            self.hotkeys.stop()
+            log.info("단축키 해제됨")
+            
+    def on_close(self):
+        """프로그램 종료 시 처리"""
+        # 실행 중이면 중지하고 단축키 정리
+        self.runner.stop()
+        self.stop_hotkey_listener()
+        # 캡처 리소스 해제
+        self.engine.close()
+        self.ui_updates.stop()
+        # 창 종료
+        self.root.destroy()
+    
+    def select_area(self):
+        """영역 선택 모드 시작"""
+        self.status_label.config(text="인벤토리에서 드래그하여 영역을 선택하세요...")
+        self.area_selector.open()
+    
+    def on_selection_cancel(self):
+        """영역 선택 취소"""
+        self.status_label.config(text="영역 선택 취소됨")
+        
+    def on_area_selected(self, start_pos, end_pos):
+        """드래그 완료 (오버레이가 닫히기 전에 호출되어 바로 캡처)"""
+        # 좌표 저장
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+    
+        # 제외할 셀 목록 초기화 (중복 제거)
+        self.excluded_cells = []
+        self.excluded_label.config(text="[]")
+    
+        # 실행 중 캡처와 같은 캡처 경로로 빈 인벤토리 캡처 (캡처 방식이 다르면 두 이미지가 달라짐)
+        self.engine.configure(start_pos, end_pos)
+        self.initial_screenshot = Image.fromarray(self.engine.grab().copy())
+    
+        # 캔버스 크기
+        canvas_width = self.initial_canvas.winfo_width()
+        canvas_height = self.initial_canvas.winfo_height()
+    
+        # 이미지 리사이징
+        resized_img = self.initial_screenshot.resize(
+            (canvas_width, canvas_height), 
+            Image.LANCZOS
+        )
+    
+        # Tkinter 이미지로 변환
+        self.initial_tk_image = ImageTk.PhotoImage(resized_img)
+    
+        # 캔버스에 이미지 표시
+        self.initial_canvas.delete("all")
+        self.initial_canvas.create_image(
+            0, 0, 
+            anchor=tk.NW, 
+            image=self.initial_tk_image
+        )
+    
+        # 상태 업데이트
+        self.status_label.config(text="영역 선택 완료")
+        self.start_pos_label.config(text=str(self.start_pos))
+        self.end_pos_label.config(text=str(self.end_pos))
+    
+        # 설정 저장
+        self.save_config()
+    
+        # 캔버스 업데이트 및 그리드 표시
+        self.update_canvas()
+        
+    def on_canvas_click(self, event):
+        """캔버스 클릭 처리 (셀 선택/해제)"""
+        if not self.start_pos or not self.end_pos:
+            return
+        
+        try:
+            canvas_size = (self.initial_canvas.winfo_width(), self.initial_canvas.winfo_height())
+            region_size = (self.end_pos[0] - self.start_pos[0], self.end_pos[1] - self.start_pos[1])
+            cell = canvas_cell(event.x, event.y, canvas_size, region_size, self.grid_width, self.grid_height)
+            
+            # 유효한 셀인지 확인
+            if cell is not None:
+                # 셀 상태 토글
+                if cell in self.excluded_cells:
+                    self.excluded_cells.remove(cell)
+                else:
+                    self.excluded_cells.append(cell)
+                
+                # 표시 업데이트
+                self.excluded_label.config(text=str(self.excluded_cells))
+                self.save_config()
+                self.update_canvas()
+        except Exception as e:
+            log.error(f"캔버스 클릭 처리 오류: {e}")
+
+    def update_canvas(self):
+        """캔버스 업데이트 (스크린샷 및 그리드)"""
+        if not self.start_pos or not self.end_pos or self.initial_screenshot is None:
+            return
+        
+        try:
+            # 캔버스 크기
+            canvas_width = self.initial_canvas.winfo_width()
+            canvas_height = self.initial_canvas.winfo_height()
+            
+            # 스크린샷 크기
+            img_width = self.end_pos[0] - self.start_pos[0]
+            img_height = self.end_pos[1] - self.start_pos[1]
+            
+            # 비율 계산
+            scale = min(canvas_width / img_width, canvas_height / img_height)
+            new_width = int(img_width * scale)
+            new_height = int(img_height * scale)
+            
+            # 이미지 리사이징
+            resized_img = self.initial_screenshot.resize((new_width, new_height), Image.LANCZOS)
+            
+            # Tkinter 이미지로 변환
+            self.initial_tk_image = ImageTk.PhotoImage(resized_img)
+            
+            # 캔버스 초기화
+            self.initial_canvas.delete("all")
+            
+            # 이미지 표시
+            self.initial_canvas.create_image(0, 0, anchor=tk.NW, image=self.initial_tk_image)
+            
+            # 셀 크기
+            cell_width = new_width / self.grid_width
+            cell_height = new_height / self.grid_height
+            
+            # 그리드 그리기
+            for y in range(self.grid_height):
+                for x in range(self.grid_width):
+                    x1 = x * cell_width
+                    y1 = y * cell_height
+                    x2 = (x + 1) * cell_width
+                    y2 = (y + 1) * cell_height
+                    
+                    # 제외된 셀인지 확인
+                    is_excluded = (x, y) in self.excluded_cells
+                    
+                    # 셀 사각형 그리기
+                    if is_excluded:
+                        # 제외된 셀은 반투명 회색으로 표시
+                        rect_id = self.initial_canvas.create_rectangle(
+                            x1, y1, x2, y2,
+                            fill="gray", stipple="gray50",
+                            outline="red", width=1
+                        )
+                    else:
+                        # 일반 셀은 테두리만 표시
+                        rect_id = self.initial_canvas.create_rectangle(
+                            x1, y1, x2, y2,
+                            outline="blue", width=1
+                        )
+                    
+                    # 셀 좌표 텍스트
+                    self.initial_canvas.create_text(
+                        x1 + cell_width/2, y1 + cell_height/2,
+                        text=f"{x},{y}",
+                        fill="red" if is_excluded else "white"
+                    )
+            
+            # 캔버스에 클릭 이벤트 바인딩
+            self.initial_canvas.bind("<Button-1>", self.on_canvas_click)
+        
+        except Exception as e:
+            log.error(f"캔버스 업데이트 오류: {e}")
+    
+
+    def find_path_of_exile_window(self):
+        """Path of Exile 창 찾기"""
+        try:
+            # 'Path of Exile' 창 검색 및 활성화
+            if find_game_window() is None:
+                messagebox.showwarning("경고", "Path of Exile 창을 찾을 수 없습니다.")
+                return False
+            
+            return True
+        except Exception as e:
+            messagebox.showerror("오류", f"창 찾기 중 오류 발생: {e}")
+            return False
+    
+    def run_macro(self):
+        """매크로 실행"""
+        if not self.start_pos or not self.end_pos:
+            messagebox.showwarning("경고", "영역을 먼저 선택해주세요.")
+            return
+        
+        if self.is_running:
+            return
+        
+        # 현재 포커스된 창 확인 (디버깅용)
+        try:
+            focused_window = gw.getActiveWindow()
+            log.info(f"현재 포커스된 창: {focused_window.title}")
+        except Exception as e:
+            log.error(f"활성 창 확인 오류: {e}")
+        
+        # 임계값 설정 저장
+        self.similarity_threshold = self.threshold_slider.get()
+        self.save_config()
+        
+        # Path of Exile 창 찾기 및 활성화
+        if not self.find_path_of_exile_window():
+            return
+        
+        # 실행 시작 시점의 설정 값 (작업 스레드가 Tk 변수를 직접 읽지 않도록 메인 스레드에서 읽음)
+        settings = {
+            'delay': self.click_delay.get(),
+            'use_ctrl': self.use_ctrl_click.get(),
+            'minimize': self.minimize_window.get(),
+            'detect_items': self.detect_items.get(),
+            'preview_size': None,
+        }
+        if self.macro_canvas.winfo_ismapped():
+            settings['preview_size'] = (self.macro_canvas.winfo_width(), self.macro_canvas.winfo_height())
+        
+        # 실행 상태 설정
+        self.run_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.status_label.config(text="매크로 실행 중...")
+        
+        # 창 최소화 (선택적)
+        if settings['minimize']:
+            self.root.withdraw()
+        
+        # 실행 스레드 시작 (중지 단축키는 실행 중에도 디스패처가 계속 받음)
+        self.runner.start(self._run_macro_thread, settings,
+                          on_finish=lambda token: self._restore_ui(settings['minimize']))
+        
+    def _post_status(self, text):
+        """작업 스레드에서 상태 표시줄 변경 (다음 UI 갱신 때 마지막 텍스트만 반영)"""
+        self.ui_updates.post(lambda: self.status_label.config(text=text), key='status')
+    
+    def _show_macro_preview(self, image):
+        """축소한 캡처를 매크로 캔버스에 표시 (UI 스레드)"""
+        self.macro_tk_image = ImageTk.PhotoImage(image)
+        self.macro_canvas.delete("all")
+        self.macro_canvas.create_image(0, 0, anchor=tk.NW, image=self.macro_tk_image)
+    
+    def _run_macro_thread(self, token, settings):
+        """
+        매크로 실행 (별도 스레드, Tk는 직접 호출하지 않고 UI 갱신 큐로만 변경)
+        
+        :param token: 이 실행의 CancelToken (모든 대기가 중지 요청에 바로 깨어남)
+        :param settings: 실행 시작 시점의 설정 값
+        """
+        detect = settings['detect_items'] and self.initial_screenshot is not None
+        if detect:
+            log.info("아이템 감지 모드 활성화됨")
+        preview_size = settings['preview_size']
+        
+        # 박스 크기 (클릭 표시용)
+        box_width = self.end_pos[0] - self.start_pos[0]
+        box_height = self.end_pos[1] - self.start_pos[1]
+        
+        def on_frame(frame):
+            # 캔버스가 화면에 표시된 경우에만 미리보기 생성 (축소는 작업 스레드, PhotoImage는 UI 스레드)
+            if preview_size is not None:
+                image = make_thumbnail(frame, preview_size)
+                self.ui_updates.post(lambda: self._show_macro_preview(image), key='preview')
+        
+        def on_detect(cells):
+            self._post_status(f"아이템 감지: {len(cells)}개 셀")
+        
+        def on_click(x, y):
+            # 매크로 캔버스에 클릭 표시 (UI 갱신 큐에 넣기만 하고 바로 다음 클릭 진행)
+            if settings['minimize'] or preview_size is None:
+                return
+            canvas_width, canvas_height = preview_size
+            cell_width, cell_height = self.engine.cell_size
+            canvas_x = int((x * cell_width) * (canvas_width / box_width))
+            canvas_y = int((y * cell_height) * (canvas_height / box_height))
+            canvas_cell_w = int(cell_width * (canvas_width / box_width))
+            canvas_cell_h = int(cell_height * (canvas_height / box_height))
+            self.ui_updates.post(lambda: self.macro_canvas.create_rectangle(
+                canvas_x, canvas_y,
+                canvas_x + canvas_cell_w, canvas_y + canvas_cell_h,
+                outline="red", width=2
+            ))
+        
+        try:
+            # Ctrl 키 해제 (이전에 눌려있을 수 있음)
+            keyboard.release('ctrl')
+            
+            # 창 전환 대기 → 캡처 → 감지 → 클릭 (Ctrl은 중지/오류 시에도 해제됨)
+            clicked = run_inventory_pass(
+                self.engine, self.start_pos, self.end_pos, self.excluded_cells,
+                self.initial_screenshot if detect else None, settings['delay'], cancel=token,
+                modifier='ctrl' if settings['use_ctrl'] else None, keyboard=keyboard,
+                on_frame=on_frame, on_detect=on_detect, on_click=on_click
+            )
+            if clicked is None:
+                return
+            
+            # 아이템 감지 모드인 경우 결과 표시
+            if detect:
+                self._post_status(f"매크로 실행 완료 - {len(clicked)}개 셀 클릭됨")
+            else:
+                self._post_status("매크로 실행 완료")
+        except Exception as e:
+            self._post_status(f"오류 발생: {str(e)}")
+            log.error(f"매크로 실행 오류: {e}")
+        finally:
+            # 오류 발생 시에도 Ctrl 키 해제
+            try:
+                keyboard.release('ctrl')
+            except Exception:
+                pass
+    
+    def _restore_ui(self, minimized):
+        """실행 종료 후 창과 버튼 상태 복원 (UI 스레드)"""
+        if self.is_running:
+            return  # 그 사이 새 실행이 시작됨
+        if minimized:
+            self.root.deiconify()
+        self.root.focus_force()
+        self.run_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+            
+    def stop_macro(self):
+        """매크로 중지"""
+        log.debug("매크로 중지 함수 호출됨")
+        # 대기 중인 실행 스레드를 바로 깨움 (Ctrl 해제와 UI 복원은 실행 스레드 정리 단계에서)
+        if not self.runner.stop():
+            log.info("이미 중지된 상태")
+            return
+        
+        self.status_label.config(text="매크로 중지됨")
+        
+        # Ctrl 키 해제
+        try:
+            keyboard.release('ctrl')
+        except Exception:
+            pass
+            
+        # 버튼 상태 업데이트
+        self.run_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+        
+        log.info("매크로 중지 완료")
+    
+    def clear_excluded(self):
+        """제외 목록 초기화"""
+        self.excluded_cells = []
+        self.excluded_label.config(text="[]")
+        self.save_config()
+
+
+class SingleInstanceApp:
+    """앱 싱글 인스턴스 보장 (로컬 포트 바인딩)"""
+
+    def __init__(self):
+        self.lock_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # 5000 포트에 바인딩 시도
+            self.lock_socket.bind(('localhost', 5000))
+            log.info("프로그램 새 인스턴스 시작됨")
+            self.is_running_already = False
+        except socket.error:
+            log.info("이미 다른 인스턴스가 실행 중입니다")
+            self.is_running_already = True
+
+
+def run_app(global_esc=False, save_settings=True):
+    """
+    단순 GUI 실행 (싱글 인스턴스 확인, 오류 시 error_log.txt 기록 후 메시지 표시)
+
+    :param global_esc: SimpleMacroApp 참고
+    :param save_settings: SimpleMacroApp 참고
+    """
+    setup_logging()
+    try:
+        log.info("하드웨어 수준 Path of Exile 클릭 매크로를 시작합니다...")
+        
+        # 싱글 인스턴스 확인 (잠금 소켓은 프로그램이 끝날 때까지 유지)
+        single_instance = SingleInstanceApp()
+        if single_instance.is_running_already:
+            root = tk.Tk()
+            root.withdraw()
+            messagebox.showwarning("경고", "이미 프로그램이 실행 중입니다.\n기존 창을 확인하세요.")
+            root.destroy()
+            sys.exit(0)
+        
+        # 프로그램 시작
+        log.info("단축키 정보: F6=매크로 실행, F7=매크로 중지")
+        SimpleMacroApp(global_esc=global_esc, save_settings=save_settings)
+    except Exception as e:
+        # 오류 로깅
+        import traceback
+        with open("error_log.txt", "w", encoding="utf-8") as f:
+            f.write(f"오류: {str(e)}\n\n{traceback.format_exc()}")
+        
+        # 오류 메시지 표시
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("오류", f"프로그램 실행 중 오류가 발생했습니다: {str(e)}\n자세한 내용은 error_log.txt 파일을 확인하세요.")
+        root.destroy()
@@ -0,0 +1,136 @@
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# 이 배율 이상 줄일 때는 정수 배율 reduce로 먼저 줄인 뒤 bilinear로 맞춤
+REDUCE_MIN_FACTOR = 2
+
+
+def make_thumbnail(image, size):
+    """
+    미리보기용 축소 이미지 생성
+
+    4K 영역처럼 크게 줄이는 경우 LANCZOS 대신 reduce(박스 평균) 후 bilinear로 맞춘다.
+    미리보기 품질은 충분하고 훨씬 빠르다.
+
+    :param image: PIL 이미지 또는 RGB 배열
+    :param size: (너비, 높이)
+    """
+    from PIL import Image
+
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    width, height = max(int(size[0]), 1), max(int(size[1]), 1)
+    factor = min(image.width // width, image.height // height)
+    if factor >= REDUCE_MIN_FACTOR:
+        image = image.reduce(factor)
+    if image.size == (width, height):
+        return image
+    return image.resize((width, height), Image.BILINEAR)
+
+
+class ThumbnailCache:
+    """
+    원본 이미지와 크기별 미리보기 캐시 (축소는 작업 스레드에서 수행)
+
+    결과는 schedule로 UI 스레드에 넘겨 convert(예: ImageTk.PhotoImage)로 변환한 뒤
+    캐시에 저장하고 콜백을 호출한다. 같은 원본/크기를 다시 요청하면 바로 콜백을 호출한다.
+
+    :param schedule: 완료 처리를 실행할 함수 (예: UiUpdateQueue.post). 없으면 작업 스레드에서 실행
+    :param convert: UI 스레드에서 축소 이미지를 표시용 객체로 바꾸는 함수 (없으면 PIL 이미지 그대로)
+    :param max_entries: 캐시에 보관할 최대 미리보기 수
+    """
+
+    def __init__(self, schedule=None, convert=None, max_entries=8):
+        self.schedule = schedule
+        self.convert = convert
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # (원본 id, 크기) -> (원본 약한 참조, 미리보기)
+        self._pending = {}  # (원본 id, 크기) -> 콜백 목록
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnail')
+
+    def get(self, image, size):
+        """캐시된 미리보기 (없으면 None)"""
+        key = (id(image), tuple(size))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0]() is not image:
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def request(self, image, size, callback, cache=True):
+        """
+        미리보기를 만들어 callback(미리보기)으로 전달
+
+        :param image: 원본 PIL 이미지 또는 RGB 배열
+        :param cache: False면 캐시에 보관하지 않음 (매번 바뀌는 실행 중 캡처용)
+        """
+        size = tuple(size)
+        if cache:
+            cached = self.get(image, size)
+            if cached is not None:
+                callback(cached)
+                return
+
+            key = (id(image), size)
+            with self._lock:
+                if key in self._pending:
+                    self._pending[key].append(callback)
+                    return
+                self._pending[key] = [callback]
+            ref = weakref.ref(image)
+        else:
+            key = ref = None
+
+        if isinstance(image, np.ndarray):
+            # 캡처 버퍼는 다음 캡처에서 덮어써지므로 요청 시점에 복사
+            image = image.copy()
+        self._executor.submit(self._work, image, size, key, ref, callback)
+
+    def _work(self, image, size, key, ref, callback):
+        try:
+            thumbnail = make_thumbnail(image, size)
+        except Exception as e:
+            log.error(f"미리보기 생성 오류: {e}")
+            with self._lock:
+                self._pending.pop(key, None)
+            return
+        finish = lambda: self._finish(thumbnail, key, ref, callback)
+        if self.schedule is not None:
+            self.schedule(finish)
+        else:
+            finish()
+
+    def _finish(self, thumbnail, key, ref, callback):
+        """UI 스레드: 표시용 객체로 변환하여 캐시에 저장하고 콜백 호출"""
+        result = self.convert(thumbnail) if self.convert is not None else thumbnail
+        if key is None:
+            callback(result)
+            return
+
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+            if ref() is not None:
+                self._cache[key] = (ref, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        for pending_callback in callbacks:
+            pending_callback(result)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """작업 스레드 종료 (진행 중인 작업은 기다리지 않음)"""
+        self._executor.shutdown(wait=False)
+        self.clear()
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class RunTimeline:
+    """
+    매크로 실행 단계별 소요 시간 기록 (최근 실행만 링 버퍼로 보관)
+
+    실행마다 begin()/end()로 묶고, 각 단계는 span()으로 감싼다.
+    실행 중이 아닐 때의 span()은 아무것도 기록하지 않는다.
+
+    :param max_runs: 보관할 최근 실행 수
+    :param max_spans: 실행 하나당 보관할 최대 구간 수 (넘으면 오래된 것부터 버림)
+    """
+
+    def __init__(self, max_runs=20, max_spans=2000):
+        self.runs = deque(maxlen=max_runs)
+        self.max_spans = max_spans
+        self._current = None
+        self._lock = threading.Lock()
+
+    def begin(self, kind):
+        """실행 기록 시작"""
+        run = {
+            'kind': kind,
+            'wall_time': time.time(),
+            'start': time.perf_counter(),
+            'end': None,
+            'spans': deque(maxlen=self.max_spans),
+        }
+        with self._lock:
+            self.runs.append(run)
+            self._current = run
+        return run
+
+    def end(self):
+        """실행 기록 종료"""
+        with self._lock:
+            if self._current is not None:
+                self._current['end'] = time.perf_counter()
+            self._current = None
+
+    def record(self, name, start, end, **args):
+        """이미 측정한 구간 추가 (perf_counter 기준 초)"""
+        run = self._current
+        if run is None:
+            return
+        run['spans'].append({
+            'name': name,
+            'start': start,
+            'end': end,
+            'tid': threading.get_ident(),
+            'thread': threading.current_thread().name,
+            'args': args,
+        })
+
+    @contextmanager
+    def span(self, name, **args):
+        """with 블록의 소요 시간을 구간으로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    def wrap_iter(self, name, iterable):
+        """반복자를 처음부터 끝까지 소비하는 데 걸린 시간을 하나의 구간으로 기록 (소비하는 스레드 기준)"""
+        start = time.perf_counter()
+        count = 0
+        try:
+            for item in iterable:
+                count += 1
+                yield item
+        finally:
+            self.record(name, start, time.perf_counter(), items=count)
+
+    def last_run(self):
+        with self._lock:
+            return self.runs[-1] if self.runs else None
+
+    def breakdown(self, run=None):
+        """
+        단계별 합계
+
+        :return: (전체 소요 시간 ms, [(단계, 횟수, 합계 ms), ...] 합계 내림차순)
+        """
+        run = run or self.last_run()
+        if run is None:
+            return 0.0, []
+        totals = {}
+        for span in list(run['spans']):
+            count, total = totals.get(span['name'], (0, 0.0))
+            totals[span['name']] = (count + 1, total + (span['end'] - span['start']) * 1000)
+        end = run['end'] if run['end'] is not None else time.perf_counter()
+        rows = sorted(((name, count, total) for name, (count, total) in totals.items()),
+                      key=lambda row: row[2], reverse=True)
+        return (end - run['start']) * 1000, rows
+
+    def format_breakdown(self, run=None):
+        """마지막 실행 분석 문자열"""
+        run = run or self.last_run()
+        if run is None:
+            return "기록된 실행이 없습니다."
+        wall, rows = self.breakdown(run)
+        lines = [f"{run['kind']} 전체 {wall:.0f}ms"]
+        for name, count, total in rows:
+            share = total / wall * 100 if wall else 0
+            suffix = f" ({count}회)" if count > 1 else ""
+            lines.append(f"{name}: {total:.1f}ms, {share:.0f}%{suffix}")
+        return "\n".join(lines)
+
+    def _export_runs(self, runs):
+        with self._lock:
+            return list(runs if runs is not None else self.runs)
+
+    def export_jsonl(self, path, runs=None):
+        """구간을 한 줄에 하나씩 JSON으로 저장 (시간 단위 ms, 실행 시작 기준)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for index, run in enumerate(self._export_runs(runs)):
+                for span in list(run['spans']):
+                    f.write(json.dumps({
+                        'run': index,
+                        'kind': run['kind'],
+                        'wall_time': run['wall_time'],
+                        'name': span['name'],
+                        'start_ms': (span['start'] - run['start']) * 1000,
+                        'duration_ms': (span['end'] - span['start']) * 1000,
+                        'thread': span['thread'],
+                        'args': span['args'],
+                    }, ensure_ascii=False) + "\n")
+
+    def export_chrome_trace(self, path, runs=None):
+        """Chrome 추적 형식(chrome://tracing, Perfetto)으로 저장"""
+        runs = self._export_runs(runs)
+        origin = min((run['start'] for run in runs), default=0.0)
+        events = []
+        threads = {}
+        for index, run in enumerate(runs):
+            end = run['end'] if run['end'] is not None else time.perf_counter()
+            events.append({
+                'name': run['kind'], 'ph': 'X', 'pid': index, 'tid': 0,
+                'ts': (run['start'] - origin) * 1e6, 'dur': (end - run['start']) * 1e6,
+            })
+            for span in list(run['spans']):
+                threads[(index, span['tid'])] = span['thread']
+                events.append({
+                    'name': span['name'], 'ph': 'X', 'pid': index, 'tid': span['tid'],
+                    'ts': (span['start'] - origin) * 1e6,
+                    'dur': (span['end'] - span['start']) * 1e6,
+                    'args': span['args'],
+                })
+        for (pid, tid), name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': name}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
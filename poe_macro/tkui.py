@@ -0,0 +1,187 @@
+"""GUI 공용 Tk 위젯 (Tk가 필요하므로 패키지 __init__에서는 불러오지 않음)"""
+
+import logging
+import tkinter as tk
+from tkinter import messagebox
+
+from .geometry import drag_region
+from .hotkeys import hotkey_name
+
+log = logging.getLogger(__name__)
+
+
+def ask_hotkey(root, message, on_select):
+    """
+    단축키 입력 창 (키를 누른 뒤 확인을 누르면 on_select(키 이름) 호출)
+
+    :param message: 안내 메시지
+    :return: 대화 상자 Toplevel
+    """
+    dialog = tk.Toplevel(root)
+    dialog.title("단축키 설정")
+    dialog.geometry("300x150")
+    dialog.resizable(False, False)
+    dialog.transient(root)
+    dialog.grab_set()
+
+    tk.Label(dialog, text=message, pady=10).pack()
+
+    # 선택된 키 표시
+    key_label = tk.Label(dialog, text="", font=("Arial", 14))
+    key_label.pack(pady=10)
+    selected = []
+
+    def on_key_press(event):
+        key = hotkey_name(event.keysym)
+        key_label.config(text=key)
+        confirm_button.config(state=tk.NORMAL)
+        selected[:] = [key]
+
+    def confirm():
+        dialog.destroy()
+        if selected:
+            on_select(selected[0])
+
+    dialog.bind("<KeyPress>", on_key_press)
+
+    button_frame = tk.Frame(dialog)
+    button_frame.pack(side=tk.BOTTOM, pady=10)
+    confirm_button = tk.Button(button_frame, text="확인", command=confirm, state=tk.DISABLED)
+    confirm_button.pack(side=tk.LEFT, padx=10)
+    tk.Button(button_frame, text="취소", command=dialog.destroy).pack(side=tk.LEFT)
+
+    dialog.focus_force()
+    return dialog
+
+
+class AreaSelector:
+    """
+    전체 화면 오버레이에서 드래그로 인벤토리 영역 선택
+
+    선택하는 동안 메인 창을 숨기고, 선택이 끝나거나 취소되면 다시 보여 준다.
+    on_select는 오버레이가 떠 있는 동안 호출되므로 그 안에서 바로 영역을 캡처해도 된다
+    (반투명 오버레이는 캡처에 포함되지 않음).
+
+    :param on_select: 선택 완료 시 on_select(start_pos, end_pos)
+    :param on_cancel: ESC로 취소했을 때 호출
+    :param global_esc: True면 게임 창에 포커스가 있어도 ESC를 받도록 키보드 훅 사용
+    :param schedule: 훅 스레드의 ESC를 UI 스레드로 넘기는 함수 (예: UiUpdateQueue.post), global_esc일 때 필요
+    """
+
+    def __init__(self, root, on_select, on_cancel=None, global_esc=False, schedule=None):
+        self.root = root
+        self.on_select = on_select
+        self.on_cancel = on_cancel
+        self.global_esc = global_esc
+        self.schedule = schedule
+        self.overlay = None
+        self.canvas = None
+        self._esc_hook = None
+        self._drag_start = None
+        self._drag_rect = None
+
+    @property
+    def is_open(self):
+        return self.overlay is not None and self.overlay.winfo_exists()
+
+    def open(self):
+        """오버레이 표시 (이미 열려 있으면 무시)"""
+        if self.is_open:
+            log.info("이미 영역 선택 창이 열려 있습니다.")
+            return
+        self.root.withdraw()
+
+        self.overlay = tk.Toplevel(self.root)
+        self.overlay.attributes('-fullscreen', True)
+        self.overlay.attributes('-alpha', 0.3)
+        self.overlay.attributes('-topmost', True)
+        self.overlay.configure(bg='black')
+        self.overlay.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.canvas = tk.Canvas(self.overlay, bg="black", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.create_text(
+            self.overlay.winfo_screenwidth() // 2,
+            self.overlay.winfo_screenheight() // 2,
+            text="드래그하여 영역을 선택하세요. ESC를 눌러 취소합니다.",
+            fill="white", font=("Arial", 16)
+        )
+
+        self._drag_start = None
+        self._drag_rect = None
+        self.overlay.bind("<ButtonPress-1>", self._on_drag_start)
+        self.overlay.bind("<B1-Motion>", self._on_drag_motion)
+        self.overlay.bind("<ButtonRelease-1>", self._on_drag_release)
+        self.overlay.bind("<Escape>", lambda event: self.cancel())
+        if self.global_esc and self.schedule is not None:
+            self._add_esc_hook()
+        self.overlay.focus_force()
+
+    def _add_esc_hook(self):
+        import keyboard
+
+        def on_key(event):
+            if event.name == 'esc' and event.event_type == 'down':
+                # 훅 스레드에서는 Tk를 건드리지 않고 UI 스레드로 넘김
+                self.schedule(self.cancel)
+
+        try:
+            self._esc_hook = keyboard.hook(on_key)
+        except Exception as e:
+            log.error(f"ESC 훅 등록 오류: {e}")
+
+    def _remove_esc_hook(self):
+        if self._esc_hook is None:
+            return
+        try:
+            import keyboard
+            keyboard.unhook(self._esc_hook)
+        except Exception as e:
+            log.error(f"ESC 훅 해제 오류: {e}")
+        self._esc_hook = None
+
+    def close(self):
+        """오버레이를 닫고 메인 창 복원"""
+        self._remove_esc_hook()
+        if self.is_open:
+            self.overlay.destroy()
+        self.overlay = None
+        self.root.deiconify()
+        self.root.focus_force()
+
+    def cancel(self):
+        """선택 취소"""
+        if not self.is_open:
+            return
+        log.info("영역 선택 취소")
+        self.close()
+        if self.on_cancel is not None:
+            self.on_cancel()
+
+    def _on_drag_start(self, event):
+        self._drag_start = (event.x, event.y)
+        if self._drag_rect:
+            self.canvas.delete(self._drag_rect)
+            self._drag_rect = None
+
+    def _on_drag_motion(self, event):
+        if self._drag_start is None:
+            return
+        if self._drag_rect:
+            self.canvas.delete(self._drag_rect)
+        self._drag_rect = self.canvas.create_rectangle(
+            *self._drag_start, event.x, event.y, outline="red", width=2
+        )
+
+    def _on_drag_release(self, event):
+        if self._drag_start is None:
+            return
+        selection = drag_region(self._drag_start, (event.x, event.y))
+        self._drag_start = None
+        if selection is None:
+            messagebox.showwarning("경고", "선택한 영역이 너무 작습니다. 다시 시도하세요.")
+            return
+        try:
+            self.on_select(*selection)
+        finally:
+            self.close()
@@ -0,0 +1,89 @@
+import itertools
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+# UI 갱신 처리 주기 (초, 약 60fps)
+UI_FRAME_INTERVAL = 1 / 60
+
+
+class UiUpdateQueue:
+    """
+    작업 스레드 → UI 스레드 갱신 채널
+
+    작업 스레드는 post()로 갱신 동작을 넣기만 하고 바로 돌아가며(잠금과 딕셔너리만, Tk 호출 없음),
+    UI 스레드가 소유한 주기 처리(after 루프)가 쌓인 동작을 한꺼번에 실행한다.
+    Tk 호출은 모두 UI 스레드에서만 일어나므로 UI가 바빠도 작업 스레드는 기다리지 않는다.
+    같은 key로 넣은 동작은 마지막 것만 실행된다 (예: 상태 표시줄 텍스트).
+
+    :param interval: 처리 주기(초)
+    """
+
+    def __init__(self, interval=UI_FRAME_INTERVAL):
+        self.interval = interval
+        self._pending = {}  # key -> 동작 (넣은 순서 유지)
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._after = None
+        self._after_cancel = None
+        self._timer = None
+
+    def post(self, action, key=None):
+        """
+        UI 갱신 동작 추가 (어느 스레드에서나 호출 가능)
+
+        :param action: UI 스레드에서 실행할 함수 (인자 없음)
+        :param key: 같은 key의 이전 동작이 아직 실행되지 않았으면 교체
+        """
+        if key is None:
+            key = ('seq', next(self._counter))
+        with self._lock:
+            # 다시 넣은 동작은 최신 순서로 이동
+            self._pending.pop(key, None)
+            self._pending[key] = action
+
+    def drain(self):
+        """쌓인 동작을 넣은 순서대로 실행 (UI 스레드에서 호출), 실행한 수 반환"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            actions = list(self._pending.values())
+            self._pending.clear()
+        for action in actions:
+            try:
+                action()
+            except Exception as e:
+                log.error(f"UI 갱신 오류: {e}")
+        return len(actions)
+
+    def start(self, after, after_cancel=None):
+        """
+        주기적 처리 시작 (UI 스레드에서 호출)
+
+        :param after: 지연 실행 함수 after(ms, callback) (예: Tk root.after)
+        :param after_cancel: 예약 취소 함수 (예: Tk root.after_cancel), stop()에서 사용
+        """
+        self._after = after
+        self._after_cancel = after_cancel
+        self._tick()
+
+    def _tick(self):
+        self._timer = None
+        self.drain()
+        if self._after is not None:
+            self._timer = self._after(max(int(self.interval * 1000), 1), self._tick)
+
+    def stop(self):
+        """주기적 처리 중지 (UI 스레드에서 호출, 예약된 처리를 취소하고 남은 동작은 버림)"""
+        timer, cancel = self._timer, self._after_cancel
+        self._after = None
+        self._after_cancel = None
+        self._timer = None
+        with self._lock:
+            self._pending.clear()
+        if timer is not None and cancel is not None:
+            try:
+                cancel(timer)
+            except Exception as e:
+                log.debug(f"UI 갱신 예약 취소 실패: {e}")
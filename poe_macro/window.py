@@ -0,0 +1,29 @@
+GAME_WINDOW_TITLE = 'Path of Exile'
+
+
+def find_game_window(title=GAME_WINDOW_TITLE):
+    """
+    게임 창을 찾아 활성화 (최소화되어 있으면 복원)
+
+    :return: 창 객체, 찾지 못하면 None
+    """
+    import pygetwindow as gw
+
+    # 대소문자 무시하고 제목이 title로 시작하는 창만
+    windows = [w for w in gw.getWindowsWithTitle(title) if w.title.lower().startswith(title.lower())]
+    if not windows:
+        return None
+
+    window = windows[0]
+    window.activate()
+    if window.isMinimized:
+        window.restore()
+    return window
+
+
+def is_game_focused(title=GAME_WINDOW_TITLE):
+    """게임 창이 전면(활성) 창인지 확인"""
+    import pygetwindow as gw
+
+    window = gw.getActiveWindow()
+    return window is not None and window.title.lower().startswith(title.lower())
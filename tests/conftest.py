@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# 저장소 루트에서 poe_macro를 불러옴 (설치 없이 pytest 실행)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poe_macro.detection import cell_edges  # noqa: E402
+
+BACKGROUND = 20
+GRID_LINE = 90
+ITEM_COLOR = (200, 170, 120)
+
+
+def draw_board(width, height, grid_width, grid_height, items=()):
+    """
+    격자선이 있는 합성 인벤토리 (셀 경계는 감지/클릭과 같은 cell_edges)
+
+    :param items: (x, y, 가로 셀 수, 세로 셀 수) 아이템 목록, 여러 칸 아이템은 사이 격자선을 가림
+    """
+    image = np.full((height, width, 3), BACKGROUND, np.uint8)
+    xs = cell_edges(width, grid_width)
+    ys = cell_edges(height, grid_height)
+    for x in xs:
+        image[:, max(x - 1, 0):min(x + 1, width)] = GRID_LINE
+    for y in ys:
+        image[max(y - 1, 0):min(y + 1, height)] = GRID_LINE
+    for x, y, item_w, item_h in items:
+        image[ys[y] + 2:ys[y + item_h] - 2, xs[x] + 2:xs[x + item_w] - 2] = ITEM_COLOR
+    return image
+
+
+@pytest.fixture
+def board():
+    return draw_board
@@ -0,0 +1,64 @@
+import numpy as np
+
+from poe_macro import AppraisalClassifier, cell_signatures, load_appraisal_classifier
+from poe_macro.appraisal import FEATURE_NAMES, appraisal_classifier_path
+from poe_macro.detection import cell_edges
+
+SIZE = (633, 264)
+UNIDENTIFIED = (170, 60, 50)
+IDENTIFIED = (60, 70, 170)
+
+
+def paint(board, cells):
+    image = board(*SIZE, 12, 5)
+    xs, ys = cell_edges(SIZE[0], 12), cell_edges(SIZE[1], 5)
+    for (x, y), color in cells.items():
+        image[ys[y] + 2:ys[y + 1] - 2, xs[x] + 2:xs[x + 1] - 2] = color
+    return image
+
+
+def trained(board):
+    image = paint(board, {(0, 0): UNIDENTIFIED, (1, 0): UNIDENTIFIED,
+                          (2, 0): IDENTIFIED, (3, 0): IDENTIFIED})
+    classifier = AppraisalClassifier()
+    assert classifier.add(image, [(0, 0), (1, 0)], True, 12, 5) == 2
+    assert classifier.add(image, [(2, 0), (3, 0)], False, 12, 5) == 2
+    return classifier
+
+
+def test_signatures_shape():
+    features = cell_signatures(np.zeros((264, 633, 3), np.uint8), 12, 5)
+    assert features.shape == (5, 12, len(FEATURE_NAMES))
+
+
+def test_untrained_yields_every_cell(board):
+    classifier = AppraisalClassifier()
+    image = paint(board, {})
+    classifier.add(image, [(0, 0), (1, 0)], True, 12, 5)
+    assert not classifier.trained
+    cells = [(0, 0), (5, 3)]
+    assert list(classifier.filter_cells(image, iter(cells), 12, 5)) == cells
+
+
+def test_trained_filters_identified(board):
+    classifier = trained(board)
+    assert classifier.trained
+    image = paint(board, {(4, 1): UNIDENTIFIED, (5, 1): IDENTIFIED, (6, 2): UNIDENTIFIED})
+    skipped = []
+    cells = list(classifier.filter_cells(image, [(4, 1), (5, 1), (6, 2)], 12, 5, skipped))
+    assert cells == [(4, 1), (6, 2)]
+    assert skipped == [(5, 1)]
+
+
+def test_save_load_round_trip(board, tmp_path):
+    classifier = trained(board)
+    path = appraisal_classifier_path(str(tmp_path / 'config.json'), (1920, 1080), 'quad')
+    assert path.endswith('_quad_appraisal_1920x1080.npz')
+    classifier.save(path)
+    loaded = load_appraisal_classifier(str(tmp_path / 'config.json'), (1920, 1080), 'quad')
+    assert loaded.trained
+    np.testing.assert_array_equal(loaded.unidentified, classifier.unidentified)
+    features = cell_signatures(paint(board, {(7, 3): IDENTIFIED, (8, 3): UNIDENTIFIED}), 12, 5)
+    np.testing.assert_array_equal(loaded.needs_appraisal(features), classifier.needs_appraisal(features))
+    # 저장된 파일이 없으면 학습 전 판별기
+    assert not load_appraisal_classifier(str(tmp_path / 'config.json'), (2560, 1440)).trained
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from poe_macro import ArrayCapture, CaptureCache
+
+
+def frames(count, size=(264, 633)):
+    return [np.full(size + (3,), (index + 1) * 10, np.uint8) for index in range(count)]
+
+
+def test_grab_returns_rgb_view_of_reused_buffer():
+    image = np.zeros((264, 633, 3), np.uint8)
+    image[..., 0] = 200
+    capture = ArrayCapture([image])
+    first = capture.grab()
+    assert first.shape == (264, 633, 3)
+    assert (first[..., 0] == 200).all() and (first[..., 2] == 0).all()
+    # 버퍼를 재사용하므로 다음 캡처가 같은 메모리에 씀
+    assert np.shares_memory(first, capture.grab())
+
+
+def test_grab_rect_updates_only_rect():
+    capture = ArrayCapture(frames(2))
+    capture.grab()
+    frame = capture.grab_rect((100, 50, 160, 110))
+    assert (frame[50:110, 100:160] == 20).all()
+    assert (frame[:50] == 10).all() and (frame[:, 160:] == 10).all()
+    # 영역 밖 사각형은 잘라서 캡처
+    frame = capture.grab_rect((600, 250, 700, 300))
+    assert (frame[250:, 600:] == 10).all()
+
+
+def test_cache_reuses_source_until_region_changes():
+    created = []
+
+    def factory(region):
+        created.append(region)
+        return ArrayCapture(frames(1, (region[3] - region[1], region[2] - region[0])), region)
+
+    cache = CaptureCache(factory)
+    cache.grab((0, 0, 633, 264))
+    cache.grab_rect((0, 0, 633, 264), (0, 0, 10, 10))
+    cache.grab((0.0, 0.0, 633.0, 264.0))
+    assert created == [(0, 0, 633, 264)]
+    cache.grab((10, 10, 643, 274))
+    assert created == [(0, 0, 633, 264), (10, 10, 643, 274)]
+    cache.close()
+    assert cache.source is None
+
+
+def test_invalid_region():
+    with pytest.raises(ValueError):
+        ArrayCapture(frames(1), (10, 10, 10, 20))
+    with pytest.raises(ValueError):
+        ArrayCapture([])
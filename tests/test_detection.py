@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from poe_macro import ArrayCapture, CaptureCache, Clicker, MacroEngine, RecordingMouse, ReferenceProfile
+from poe_macro.bench import synthetic_frames
+from poe_macro.detection import (
+    BRIGHT_THRESHOLD, RATIO_SAMPLES, cell_bright_ratios, cell_edges, detect_occupied_cells, iter_occupied_cells,
+)
+
+
+def _no_sleep(seconds):
+    pass
+
+
+def make_engine(frames, size, grid_width, grid_height):
+    width, height = size
+    engine = MacroEngine(grid_width, grid_height,
+                         capture=CaptureCache(lambda region: ArrayCapture(frames, region)),
+                         clicker=Clicker(RecordingMouse(), sleep=_no_sleep))
+    engine.configure((100, 50), (100 + width, 50 + height))
+    return engine
+
+
+# 실제 게임처럼 그리드로 나누어 떨어지지 않는 영역 크기
+@pytest.mark.parametrize('size, grid', [
+    ((633, 264), (12, 5)),
+    ((1262, 527), (12, 5)),
+    ((640, 265), (12, 5)),
+    ((633, 633), (24, 24)),
+])
+def test_detect_non_divisible_region(size, grid):
+    masks = []
+    empty, frames = synthetic_frames(size, *grid, count=3, masks=masks)
+    engine = make_engine(frames, size, *grid)
+    for mask in masks:
+        cells = engine.detect_cells(empty, engine.grab())
+        assert cells == [(int(x), int(y)) for y, x in zip(*np.nonzero(mask))]
+
+
+def test_cell_edges_match_grid_plan():
+    engine = make_engine([np.zeros((264, 633, 3), np.uint8)], (633, 264), 12, 5)
+    left, top = engine.region[:2]
+    xs = cell_edges(633, 12)
+    ys = cell_edges(264, 5)
+    for y in range(5):
+        for x in range(12):
+            assert engine.plan.cell_origin(x, y) == (left + xs[x], top + ys[y])
+    assert xs[-1] == 633 and ys[-1] == 264
+
+
+def test_last_column_is_detected():
+    size = (633, 264)
+    empty, _ = synthetic_frames(size, count=1)
+    frame = empty.copy()
+    edges = cell_edges(size[0], 12)
+    frame[:, edges[11] + 6:edges[12] - 6] = 230
+    assert detect_occupied_cells(empty, frame, 12, 5)[:, 11].all()
+    assert not detect_occupied_cells(empty, frame, 12, 5)[:, :11].any()
+
+
+def test_streaming_detection_matches_full_detection():
+    size = (844, 352)
+    masks = []
+    empty, frames = synthetic_frames(size, count=2, masks=masks)
+    profile = ReferenceProfile.from_image(empty, (0, 0), size, (2560, 1440), 12, 5)
+    for frame, mask in zip(frames, masks):
+        expected = [(int(x), int(y)) for y, x in zip(*np.nonzero(mask))]
+        assert list(iter_occupied_cells(profile.ratios, frame, 12, 5)) == expected
+        assert list(profile.iter_occupied(frame, skip={expected[0]})) == expected[1:]
+
+
+def test_still_occupied_uses_same_cell_edges():
+    size = (633, 264)
+    masks = []
+    empty, frames = synthetic_frames(size, count=1, occupancy=0.5, masks=masks)
+    profile = ReferenceProfile.from_image(empty, (0, 0), size, (1920, 1080), 12, 5)
+    engine = make_engine(frames, size, 12, 5)
+    cells = [(x, y) for y in range(5) for x in range(12)]
+    occupied = [cell for cell in cells if masks[0][cell[1], cell[0]]]
+    # 일부 셀만 다시 캡처한 버퍼에서도 같은 결과
+    sample = [(11, 4), (0, 0), (5, 2), (11, 0)]
+    frame = engine.grab_cells(sample)
+    assert profile.still_occupied(frame, sample) == [c for c in sample if c in occupied]
+    assert profile.still_occupied(engine.grab(), cells) == occupied
+
+
+@pytest.mark.parametrize('size, grid', [((633, 264), (12, 5)), ((1262, 527), (12, 5)), ((633, 633), (24, 24))])
+def test_bright_ratios_match_per_cell_pil(size, grid):
+    from PIL import Image
+
+    width, height = size
+    grid_width, grid_height = grid
+    image = np.random.default_rng(1).integers(0, 110, (height, width, 3), dtype=np.uint8)
+    ratios = cell_bright_ratios(image, grid_width, grid_height)
+    pil_image = Image.fromarray(image)
+    cell_width, cell_height = width / grid_width, height / grid_height
+    for y in range(grid_height):
+        for x in range(grid_width):
+            # compare_cell_images와 같은 셀 자르기와 흑백 변환
+            box = (int(x * cell_width), int(y * cell_height),
+                   int((x + 1) * cell_width), int((y + 1) * cell_height))
+            expected = np.mean(np.array(pil_image.crop(box).convert('L')) > BRIGHT_THRESHOLD)
+            assert ratios[y, x] == expected
+
+
+def test_sampled_ratios_are_opt_in():
+    image = np.random.default_rng(2).integers(0, 110, (527, 1262, 3), dtype=np.uint8)
+    exact = cell_bright_ratios(image, 12, 5)
+    sampled = cell_bright_ratios(image, 12, 5, samples=RATIO_SAMPLES)
+    assert not np.array_equal(exact, sampled)
+    assert np.abs(exact - sampled).max() < 0.05
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from poe_macro import CancelToken, ClickExecutor, ClickPlan, ClickTiming, RecordingInput
+
+POINTS = [(100, 200), (150, 200), (200, 250)]
+
+
+def no_wait(deadline, cancel=None):
+    return cancel is not None and cancel.cancelled
+
+
+def cancel_on_call(token, call):
+    """call번째 대기에서 중지 요청 (예정 시각을 기다리는 동안 중지 단축키를 누른 경우)"""
+    calls = []
+
+    def wait_until(deadline, cancel=None):
+        calls.append(deadline)
+        if len(calls) == call:
+            token.cancel()
+        return token.cancelled
+
+    return wait_until
+
+
+def assert_all_released(events):
+    held = set()
+    for action, value in events:
+        if action in ('press', 'key_down'):
+            assert (action, value) not in held
+            held.add((action, value))
+        elif action == 'release':
+            held.discard(('press', value))
+        elif action == 'key_up':
+            held.discard(('key_down', value))
+    assert not held
+
+
+@pytest.fixture
+def executor():
+    executor = ClickExecutor(RecordingInput(), wait_until=no_wait)
+    yield executor
+    executor.close()
+
+
+def test_clicks_with_modifier(executor):
+    report = executor.run(ClickPlan(iter(POINTS), modifier='ctrl', timing=ClickTiming(delay=0.01)))
+    events = executor.backend.events
+    assert events[0] == ('key_down', 'ctrl') and events[-1] == ('key_up', 'ctrl')
+    assert executor.backend.clicks() == POINTS
+    assert report.clicks == 3
+    assert_all_released(events)
+
+
+@pytest.mark.parametrize('call', range(1, 9))
+def test_cancel_releases_held_inputs(call):
+    token = CancelToken()
+    backend = RecordingInput()
+    executor = ClickExecutor(backend, wait_until=cancel_on_call(token, call))
+    try:
+        clicked = []
+        executor.run(ClickPlan(iter(POINTS), modifier='shift'), cancel=token, after_click=clicked.append)
+    finally:
+        executor.close()
+    events = backend.events
+    assert_all_released(events)
+    # 중지 후에는 새로 누르지 않음
+    assert len(backend.clicks()) < len(POINTS)
+    assert len(clicked) <= len(backend.clicks())
+
+
+def test_callback_error_releases_held_inputs(executor):
+    def after_click(index):
+        raise RuntimeError("preview failed")
+
+    with pytest.raises(RuntimeError, match="preview failed"):
+        executor.run(ClickPlan(iter(POINTS), modifier='ctrl'), after_click=after_click)
+    events = executor.backend.events
+    assert executor.backend.clicks()[:1] == POINTS[:1]
+    assert events[-1] == ('key_up', 'ctrl')
+    assert_all_released(events)
+    # 오류 뒤에도 실행기는 계속 사용 가능
+    executor.backend.clear()
+    assert executor.run(ClickPlan(iter(POINTS[:1]))).clicks == 1
+
+
+def test_callbacks_run_on_calling_thread_without_delaying_clicks(executor):
+    calls = []
+
+    def after_click(index):
+        calls.append((index, threading.current_thread(), len(executor.backend.clicks())))
+        # 확인 캡처처럼 느린 콜백
+        time.sleep(0.05)
+
+    executor.run(ClickPlan(iter(POINTS)), after_click=after_click)
+    assert [index for index, _, _ in calls] == [0, 1, 2]
+    assert all(thread is threading.current_thread() for _, thread, _ in calls)
+    # 첫 콜백이 끝나기 전에 클릭 스레드는 이미 다음 클릭을 보냄
+    assert calls[1][2] == len(POINTS)
+
+
+def test_generator_points_are_pulled_lazily(executor):
+    token = CancelToken()
+
+    def points():
+        yield POINTS[0]
+        token.cancel()
+        yield POINTS[1]
+
+    executor.run(ClickPlan(points()), cancel=token)
+    assert executor.backend.clicks() == POINTS[:1]
+    assert_all_released(executor.backend.events)
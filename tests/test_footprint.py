@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from poe_macro import ReferenceProfile, iter_item_cells, seam_strengths
+
+
+def item_cells(board, size, grid, items, **kwargs):
+    empty = board(*size, *grid)
+    profile = ReferenceProfile.from_image(empty, (0, 0), size, (1920, 1080), *grid)
+    footprints = {}
+    cells = list(profile.iter_items(board(*size, *grid, items), footprints=footprints, **kwargs))
+    return cells, footprints
+
+
+@pytest.mark.parametrize('size, grid', [
+    ((633, 264), (12, 5)),
+    ((640, 265), (12, 5)),
+    ((1262, 527), (12, 5)),
+    ((633, 633), (24, 24)),
+])
+def test_multi_cell_items_click_once(board, size, grid):
+    items = [(0, 0, 2, 3), (3, 1, 1, 1), (5, 0, 1, 4), (8, 2, 2, 2), (grid[0] - 1, grid[1] - 1, 1, 1)]
+    cells, footprints = item_cells(board, size, grid, items)
+    assert cells == [(0, 0), (5, 0), (3, 1), (8, 2), (grid[0] - 1, grid[1] - 1)]
+    assert footprints == {(0, 0): [2, 3], (5, 0): [1, 4], (3, 1): [1, 1], (8, 2): [2, 2],
+                          (grid[0] - 1, grid[1] - 1): [1, 1]}
+
+
+def test_adjacent_single_items_stay_separate(board):
+    items = [(x, y, 1, 1) for y in range(2) for x in range(4)]
+    cells, footprints = item_cells(board, (633, 264), (12, 5), items)
+    assert cells == [(x, y) for y in range(2) for x in range(4)]
+    assert all(size == [1, 1] for size in footprints.values())
+
+
+def test_wider_than_max_footprint_is_not_merged(board):
+    cells, _ = item_cells(board, (633, 264), (12, 5), [(0, 0, 3, 1)])
+    assert cells == [(0, 0), (1, 0), (2, 0)]
+
+
+def test_seam_strengths_shape(board):
+    columns, rows = seam_strengths(board(633, 264, 12, 5), 12, 5)
+    assert columns.shape == (5, 11) and rows.shape == (4, 12)
+    # 합성 격자선은 모든 경계에서 보여야 함 (잘린 셀 경계를 쓰면 오른쪽/아래쪽 경계를 놓침)
+    assert columns.min() > 10 and rows.min() > 10
+
+
+def test_reused_capture_buffer_does_not_change_result(board):
+    size, grid = (633, 264), (12, 5)
+    empty = board(*size, *grid)
+    profile = ReferenceProfile.from_image(empty, (0, 0), size, (1920, 1080), *grid)
+    frame = board(*size, *grid, [(0, 0, 2, 2)])
+    buffer = frame.copy()
+    cells = []
+    for cell in profile.iter_items(buffer):
+        cells.append(cell)
+        # 감지 중 클릭 모드처럼 yield 사이에 같은 버퍼가 다음 캡처(빈 인벤토리)로 덮어써짐
+        buffer[:] = empty
+    assert cells == [(0, 0)]
+
+
+def test_serpentine_and_skip(board):
+    size, grid = (633, 264), (12, 5)
+    empty = board(*size, *grid)
+    reference = seam_strengths(empty, *grid)
+    ratios = ReferenceProfile.from_image(empty, (0, 0), size, (1920, 1080), *grid).ratios
+    frame = board(*size, *grid, [(0, 0, 1, 1), (2, 0, 1, 1), (0, 1, 1, 1), (2, 1, 1, 1)])
+    cells = list(iter_item_cells(ratios, reference, frame, *grid, serpentine=True, skip={(2, 0)}))
+    assert cells == [(0, 0), (2, 1), (0, 1)]
+    active = np.ones((5, 12), dtype=bool)
+    active[1, 0] = False
+    assert list(iter_item_cells(ratios, reference, frame, *grid, active=active)) == [(0, 0), (2, 0), (2, 1)]
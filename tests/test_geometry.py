@@ -0,0 +1,42 @@
+import pytest
+
+from poe_macro import GridPlan
+from poe_macro.detection import cell_edges
+from poe_macro.geometry import canvas_cell, drag_region
+
+
+def test_grid_plan_cell_rects():
+    plan = GridPlan((100, 50, 733, 314), 12, 5)
+    xs, ys = cell_edges(633, 12), cell_edges(264, 5)
+    for y in range(5):
+        for x in range(12):
+            assert tuple(plan.rects[y, x]) == (100 + xs[x], 50 + ys[y], 100 + xs[x + 1], 50 + ys[y + 1])
+    assert plan.center(0, 0) == (126, 76)
+
+
+def test_grid_plan_accepts_json_cells():
+    plan = GridPlan([100, 50, 733, 314], 12, 5, excluded=[[0, 0], [11, 4], [20, 20]], scroll_cells=[[5, 2]])
+    assert plan.excluded == frozenset({(0, 0), (11, 4), (20, 20)})
+    assert plan.scroll_cells == ((5, 2),)
+    assert not plan.is_active(0, 0) and plan.is_active(1, 0)
+    assert len(plan.cells) == 58
+    assert (5, 2) in plan.cells and (5, 2) not in plan.appraisal_cells
+    # JSON 리스트와 튜플 입력은 같은 계획
+    assert plan.key == GridPlan.make_key((100, 50, 733, 314), 12, 5, {(0, 0), (11, 4), (20, 20)}, [(5, 2)])
+
+
+def test_grid_plan_is_immutable():
+    plan = GridPlan((0, 0, 633, 264), 12, 5)
+    with pytest.raises(AttributeError):
+        plan.region = (0, 0, 1, 1)
+    with pytest.raises(ValueError):
+        plan.active[0, 0] = False
+
+
+def test_drag_and_canvas_cell():
+    assert drag_region((50, 40), (10, 5)) == ((10, 5), (50, 40))
+    assert drag_region((0, 0), (5, 100)) is None
+    # 미리보기 캔버스(280x117)에 비율 유지로 그린 279x116 이미지에서 클릭한 셀
+    assert canvas_cell(278, 115, (280, 117), (633, 264), 12, 5) == (11, 4)
+    assert canvas_cell(290, 50, (280, 117), (633, 264), 12, 5) is None
+    assert canvas_cell(0, 0, (280, 117), (633, 264), 12, 5) == (0, 0)
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from poe_macro import HotkeyDispatcher, hotkey_name
+
+
+def key_event(name, event_type='down'):
+    return SimpleNamespace(name=name, event_type=event_type, time=None)
+
+
+@pytest.fixture
+def hooks():
+    return SimpleNamespace(callbacks=[], removed=[])
+
+
+@pytest.fixture
+def dispatcher(hooks):
+    def hook(callback):
+        hooks.callbacks.append(callback)
+        return len(hooks.callbacks)
+
+    dispatcher = HotkeyDispatcher(hook=hook, unhook=hooks.removed.append)
+    dispatcher.start()
+    return dispatcher
+
+
+def press(hooks, name, event_type='down'):
+    hooks.callbacks[-1](key_event(name, event_type))
+
+
+def test_fires_once_per_press(hooks, dispatcher):
+    fired = []
+    dispatcher.register('start', 'F1', lambda: fired.append('start'))
+    press(hooks, 'f1')
+    press(hooks, 'f1')  # 자동 반복
+    press(hooks, 'F1')
+    press(hooks, 'f1', 'up')
+    press(hooks, 'f1')
+    assert fired == ['start', 'start']
+    assert dispatcher.last_latency['start'] >= 0
+
+
+def test_set_key_and_unregister(hooks, dispatcher):
+    fired = []
+    dispatcher.register('stop', 'f2', lambda: fired.append('stop'))
+    dispatcher.set_key('stop', 'F3')
+    press(hooks, 'f2')
+    press(hooks, 'f3')
+    dispatcher.unregister('stop')
+    press(hooks, 'f3', 'up')
+    press(hooks, 'f3')
+    assert fired == ['stop']
+
+
+def test_shared_key_runs_every_binding(hooks, dispatcher):
+    fired = []
+    dispatcher.register('a', 'f5', lambda: fired.append('a'))
+    dispatcher.register('b', 'f5', lambda: fired.append('b'))
+    press(hooks, 'f5')
+    assert sorted(fired) == ['a', 'b']
+
+
+def test_stop_forgets_pressed_keys(hooks, dispatcher):
+    fired = []
+    dispatcher.register('start', 'f1', lambda: fired.append('start'))
+    press(hooks, 'f1')
+    dispatcher.stop()
+    dispatcher.stop()
+    assert hooks.removed == [1]
+    # 훅이 없는 동안 뗀 키도 다시 시작하면 새로 누른 것으로 봄
+    dispatcher.start()
+    press(hooks, 'f1')
+    assert fired == ['start', 'start']
+
+
+def test_schedule_moves_action_off_hook_thread(hooks):
+    scheduled = []
+    fired = []
+    dispatcher = HotkeyDispatcher(schedule=scheduled.append, hook=hooks.callbacks.append,
+                                  unhook=hooks.removed.append)
+    dispatcher.start()
+    dispatcher.register('start', 'f1', lambda: fired.append('start'))
+    press(hooks, 'f1')
+    assert fired == [] and len(scheduled) == 1
+    scheduled[0]()
+    assert fired == ['start']
+
+
+def test_events_without_name_are_ignored(hooks, dispatcher):
+    dispatcher.register('start', 'f1', lambda: pytest.fail("unexpected"))
+    press(hooks, None)
+
+
+def test_hotkey_name():
+    assert hotkey_name('F10') == 'f10'
+    assert hotkey_name('Escape') == 'esc'
+    assert hotkey_name('A') == 'a'
@@ -0,0 +1,44 @@
+import json
+
+from poe_macro import LayoutProfile, load_config, load_layouts, layouts_config, next_layout, save_config
+
+
+def test_layouts_round_trip(tmp_path):
+    path = str(tmp_path / 'config.json')
+    save_config(path, {'delay': 0.1})
+    layouts = load_layouts(load_config(path))
+    assert list(layouts)[:3] == ['inventory', 'stash', 'quad']
+    quad = layouts['quad']
+    quad.start_pos, quad.end_pos = (10, 20), (643, 653)
+    quad.excluded_cells = [(0, 0), (23, 23)]
+    quad.appraisal_spare_scroll_cells = [(1, 0)]
+    layouts['inventory'].excluded_cells = [(11, 4)]
+    layouts['tab'] = LayoutProfile('tab', 6, 4)
+
+    save_config(path, layouts_config(layouts))
+    config = load_config(path)
+    # 다른 GUI가 읽는 최상위 키와 기존 설정 유지
+    assert config['delay'] == 0.1
+    assert config['excluded_cells'] == [[11, 4]]
+
+    loaded = load_layouts(config)
+    assert list(loaded) == ['inventory', 'stash', 'quad', 'tab']
+    assert loaded['quad'].start_pos == (10, 20)
+    assert loaded['quad'].excluded_cells == [(0, 0), (23, 23)]
+    assert loaded['quad'].appraisal_spare_scroll_cells == [(1, 0)]
+    assert loaded['inventory'].excluded_cells == [(11, 4)]
+    assert (loaded['tab'].grid_width, loaded['tab'].grid_height) == (6, 4)
+    assert json.loads(json.dumps(layouts_config(loaded))) == json.loads(json.dumps(layouts_config(layouts)))
+
+
+def test_next_layout():
+    layouts = load_layouts({})
+    assert next_layout(layouts, 'inventory') == 'stash'
+    assert next_layout(layouts, 'quad') == 'inventory'
+    assert next_layout(layouts, 'missing') == 'inventory'
+
+
+def test_load_config_ignores_broken_file(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text('{broken')
+    assert load_config(str(path)) == {}
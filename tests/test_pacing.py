@@ -0,0 +1,59 @@
+import pytest
+
+from poe_macro import ClickPacer
+from poe_macro.pacing import BACKOFF_FACTOR, FAILURE_MARGIN, MIN_MOVE_SETTLE, MIN_SCALE, SHRINK_FACTOR
+
+
+def test_shrinks_while_samples_clear():
+    pacer = ClickPacer(click_delay=0.1)
+    for _ in range(3):
+        pacer.record(8, 0)
+    assert pacer.scale == pytest.approx(SHRINK_FACTOR ** 3)
+    assert pacer.delay == pytest.approx(0.1 * SHRINK_FACTOR ** 3)
+    for _ in range(100):
+        pacer.record(8, 0)
+    assert pacer.scale == pytest.approx(MIN_SCALE)
+    assert pacer.move_settle == MIN_MOVE_SETTLE
+
+
+def test_backs_off_and_keeps_floor_after_failure():
+    pacer = ClickPacer(click_delay=0.1)
+    for _ in range(5):
+        pacer.record(8, 0)
+    failed_scale = pacer.scale
+    pacer.record(8, 1)
+    assert pacer.scale == pytest.approx(failed_scale * BACKOFF_FACTOR)
+    assert pacer.floor == pytest.approx(failed_scale * FAILURE_MARGIN)
+    for _ in range(100):
+        pacer.record(8, 0)
+    # 실패한 배율 근처 아래로는 다시 내려가지 않음
+    assert pacer.scale == pytest.approx(failed_scale * FAILURE_MARGIN)
+    assert pacer.profile()['failures'] == 1
+
+
+def test_backoff_is_capped():
+    pacer = ClickPacer()
+    pacer.record(8, 8)
+    assert pacer.scale == 1.0 and pacer.floor == 1.0
+    pacer.record(0, 0)
+    assert pacer.samples == 8
+
+
+def test_sample_skips_recent_clicks():
+    pacer = ClickPacer(sample_every=4)
+    clicked = [(x, 0) for x in range(10)]
+    assert [pacer.count_click() for _ in range(8)] == [False, False, False, True] * 2
+    assert pacer.next_sample(clicked[:4]) == []
+    assert pacer.next_sample(clicked[:8]) == clicked[:4]
+    assert pacer.next_sample(clicked) == clicked[4:6]
+    assert pacer.remaining_sample(clicked) == clicked[6:]
+
+
+def test_learned_scale_survives_new_run():
+    pacer = ClickPacer()
+    pacer.record(8, 0)
+    pacer.count_click()
+    pacer.begin_run(0.2)
+    assert pacer.clicks == 0 and pacer.scale == pytest.approx(SHRINK_FACTOR)
+    pacer.reset()
+    assert pacer.scale == 1.0 and pacer.floor == MIN_SCALE
@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from poe_macro import stream_cells
+
+
+def test_yields_in_order():
+    cells = [(x, y) for y in range(5) for x in range(12)]
+    assert list(stream_cells(iter(cells), maxsize=4)) == cells
+
+
+def test_early_stop_shuts_down_producer():
+    produced = []
+    finished = threading.Event()
+
+    def cells():
+        try:
+            for x in range(1000):
+                produced.append(x)
+                yield (x, 0)
+        finally:
+            finished.set()
+
+    stream = stream_cells(cells(), maxsize=2)
+    assert next(stream) == (0, 0)
+    stream.close()
+    # 큐가 가득 찬 생산자도 멈춘 것을 알아채고 종료해야 함
+    assert finished.wait(1.0)
+    assert len(produced) < 10
+
+
+def test_producer_error_reaches_consumer():
+    def cells():
+        yield (0, 0)
+        raise RuntimeError("capture failed")
+
+    stream = stream_cells(cells())
+    assert next(stream) == (0, 0)
+    with pytest.raises(RuntimeError, match="capture failed"):
+        next(stream)
@@ -0,0 +1,45 @@
+from itertools import permutations
+
+import pytest
+
+from poe_macro import ROUTE_METHODS, plan_route, route_length, travel_saving
+from poe_macro.route import ROUTE_EXACT, ROUTE_NEAREST, ROUTE_ROW, ROUTE_SERPENTINE
+
+CELLS = [(5, 2), (0, 0), (11, 4), (3, 0), (1, 2), (7, 1), (0, 4), (9, 3)]
+
+
+def test_row_order():
+    assert plan_route(CELLS, ROUTE_ROW) == sorted(CELLS, key=lambda c: (c[1], c[0]))
+
+
+def test_serpentine_reverses_every_other_row():
+    cells = [(0, 0), (2, 0), (1, 1), (3, 1), (0, 2)]
+    assert plan_route(cells, ROUTE_SERPENTINE) == [(0, 0), (2, 0), (3, 1), (1, 1), (0, 2)]
+
+
+@pytest.mark.parametrize('method', ROUTE_METHODS)
+def test_every_cell_visited_once(method):
+    cells = [(x, y) for y in range(5) for x in range(12) if (x * 7 + y * 3) % 4]
+    ordered = plan_route(cells, method, cell_width=52.75, cell_height=52.8)
+    assert sorted(ordered) == sorted(cells)
+
+
+def test_nearest_is_not_longer_than_row_order():
+    cells = [(x, y) for y in range(5) for x in range(12) if (x + y) % 3 == 0]
+    ordered = plan_route(cells, ROUTE_NEAREST, 52.75, 52.8)
+    baseline, planned = travel_saving(ordered, 52.75, 52.8)
+    assert planned <= baseline
+    assert planned == pytest.approx(route_length(ordered, 52.75, 52.8))
+
+
+def test_exact_matches_brute_force():
+    start = (0.0, 0.0)
+    best = min(route_length(list(order), start=start) for order in permutations(CELLS))
+    ordered = plan_route(CELLS, ROUTE_EXACT, start=start)
+    assert sorted(ordered) == sorted(CELLS)
+    assert route_length(ordered, start=start) == pytest.approx(best)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        plan_route(CELLS, 'zigzag')
@@ -0,0 +1,127 @@
+import threading
+
+from poe_macro import (
+    ArrayCapture, CancelToken, CaptureCache, Clicker, MacroEngine, MacroRunner, RecordingMouse, run_inventory_pass,
+    wait_for_game,
+)
+from poe_macro.bench import synthetic_frames
+
+
+def _no_sleep(seconds):
+    pass
+
+
+def _focused():
+    return True
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append(('press', key))
+
+    def release(self, key):
+        self.events.append(('release', key))
+
+
+def make_engine(frames):
+    return MacroEngine(12, 5, capture=CaptureCache(lambda region: ArrayCapture(frames, region)),
+                       clicker=Clicker(RecordingMouse(), sleep=_no_sleep), jitter=0)
+
+
+def test_runner_stop_wakes_work_and_schedules_finish():
+    scheduled = []
+    finished = threading.Event()
+    runner = MacroRunner(schedule=scheduled.append)
+
+    def work(token, seconds):
+        token.sleep(seconds)
+
+    assert runner.start(work, 10.0, on_finish=lambda token: finished.set())
+    assert runner.running
+    assert not runner.start(work, 10.0)
+    assert runner.stop()
+    assert not runner.stop()
+    for _ in range(100):
+        if scheduled:
+            break
+        threading.Event().wait(0.01)
+    # on_finish는 schedule로 넘겨 UI 스레드에서 실행
+    assert not finished.is_set()
+    scheduled[0]()
+    assert finished.is_set()
+    assert not runner.running
+    assert runner.last_stop_latency is not None and runner.last_stop_latency < 1.0
+
+
+def test_runner_reports_finish_after_error():
+    done = threading.Event()
+
+    def work(token):
+        raise RuntimeError("capture failed")
+
+    runner = MacroRunner()
+    runner.start(work, on_finish=lambda token: done.set())
+    assert done.wait(1.0)
+    assert runner.token is None
+
+
+def test_inventory_pass_clicks_detected_cells_with_modifier():
+    size = (633, 264)
+    masks = []
+    empty, frames = synthetic_frames(size, count=1, masks=masks)
+    engine = make_engine(frames)
+    keyboard = FakeKeyboard()
+    detected = []
+    clicked = run_inventory_pass(engine, (0, 0), size, [(0, 0)], empty, 0, modifier='ctrl',
+                                 keyboard=keyboard, is_focused=_focused, on_detect=detected.extend)
+    mask = masks[0].copy()
+    mask[0, 0] = False
+    expected = [(x, y) for y in range(5) for x in range(12) if mask[y, x]]
+    assert clicked == detected == expected
+    assert len(engine.clicker.backend.clicks()) == len(expected)
+    assert keyboard.events == [('press', 'ctrl'), ('release', 'ctrl')]
+
+
+def test_inventory_pass_without_reference_clicks_every_cell():
+    engine = make_engine([synthetic_frames((633, 264), count=1)[0]])
+    clicked = run_inventory_pass(engine, (0, 0), (633, 264), [[11, 4]], None, 0, is_focused=_focused)
+    assert len(clicked) == 59 and (11, 4) not in clicked
+
+
+def test_inventory_pass_stops_when_cancelled():
+    size = (633, 264)
+    empty, frames = synthetic_frames(size, count=1)
+    engine = make_engine(frames)
+    token = CancelToken()
+    keyboard = FakeKeyboard()
+
+    def on_detect(cells):
+        token.cancel()
+
+    assert run_inventory_pass(engine, (0, 0), size, [], empty, 0, cancel=token, modifier='ctrl',
+                              keyboard=keyboard, is_focused=_focused, on_detect=on_detect) is None
+    assert engine.clicker.backend.clicks() == []
+    assert keyboard.events == []
+
+
+def test_wait_for_game_proceeds_after_timeout(caplog):
+    engine = make_engine([synthetic_frames((633, 264), count=1)[0]])
+    engine.configure((0, 0), (633, 264))
+    with caplog.at_level('WARNING', logger='poe_macro.runner'):
+        assert wait_for_game(engine, timeout=0.05, is_focused=lambda: False) is False
+    assert '그대로 진행' in caplog.text
+    assert wait_for_game(engine, timeout=0.5, is_focused=_focused) is True
+
+
+def test_wait_for_game_ignores_focus_errors():
+    engine = make_engine([synthetic_frames((633, 264), count=1)[0]])
+    engine.configure((0, 0), (633, 264))
+
+    def broken():
+        raise NotImplementedError("no window manager")
+
+    # 포커스를 확인할 수 없으면 화면 안정만 확인
+    assert wait_for_game(engine, timeout=0.5, is_focused=broken) is True
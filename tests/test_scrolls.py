@@ -0,0 +1,138 @@
+import numpy as np
+
+from poe_macro import (
+    ArrayCapture, CaptureCache, Clicker, MacroEngine, RecordingMouse, ReferenceProfile, ScrollStacks,
+    StackCountReader, appraise_cells, stack_digits,
+)
+from poe_macro.detection import cell_edges
+from poe_macro.scrolls import cell_image, min_stack_size
+
+SIZE = (633, 264)
+STACKS = [(11, 0), (11, 1)]
+PARCHMENT = (200, 170, 120)
+
+
+def _no_sleep(seconds):
+    pass
+
+
+def stack_frame(board, counts):
+    """주문서 묶음 셀마다 수량 (None이면 빈 셀), 수량마다 글자 모양이 다름"""
+    image = board(*SIZE, 12, 5)
+    xs, ys = cell_edges(SIZE[0], 12), cell_edges(SIZE[1], 5)
+    for (x, y), count in zip(STACKS, counts):
+        if count is None:
+            continue
+        left, top = xs[x], ys[y]
+        width = xs[x + 1] - left
+        image[top + 2:ys[y + 1] - 2, left + 2:xs[x + 1] - 2] = PARCHMENT
+        text = int(round(width * 0.16 * len(str(count))))
+        image[top + 3:top + 12, left + 3:left + 3 + text] = 255
+        # 가운데 한 줄을 수량마다 다른 위치만큼 비워 글자 모양을 구분 (글자 상자 크기는 같음)
+        image[top + 4 + count % 7, left + 4:left + 2 + text] = PARCHMENT
+    return image
+
+
+def setup(board, frames, start_counts, reader=None):
+    empty = board(*SIZE, 12, 5)
+    profile = ReferenceProfile.from_image(empty, (0, 0), SIZE, (1920, 1080), 12, 5)
+    engine = MacroEngine(12, 5, capture=CaptureCache(lambda region: ArrayCapture(frames, region)),
+                         clicker=Clicker(RecordingMouse(), sleep=_no_sleep))
+    engine.configure((0, 0), SIZE, scroll_cells=STACKS)
+    start = stack_frame(board, start_counts)
+    stacks = ScrollStacks(STACKS, reader=reader)
+    stacks.select_first(start, profile.still_occupied(start, STACKS), 12, 5)
+    return engine, profile, stacks
+
+
+def test_stack_digits(board):
+    for count, expected in ((None, 0), (5, 1), (20, 2)):
+        image = cell_image(stack_frame(board, [count]), STACKS[0], 12, 5)
+        assert stack_digits(image) == expected
+    # 양피지 색(채도 높음)은 글자로 보지 않음
+    assert stack_digits(np.full((52, 52, 3), PARCHMENT, np.uint8)) == 0
+    assert (min_stack_size(0), min_stack_size(1), min_stack_size(2)) == (1, 1, 9)
+
+
+def test_select_first_skips_empty_stack(board):
+    _, _, stacks = setup(board, [stack_frame(board, [None, 1])], [None, 1])
+    assert stacks.current == STACKS[1] and stacks.remaining == 1
+
+
+def test_switches_to_next_stack(board):
+    frames = [stack_frame(board, [1, 1]), stack_frame(board, [None, 1]), stack_frame(board, [None, 1])]
+    engine, profile, stacks = setup(board, frames, [2, 1])
+    selected = []
+    cells = [(0, 0), (1, 0), (2, 0)]
+    appraised, remaining = appraise_cells(engine, profile, stacks, iter(cells), 0, selected.append,
+                                          settle_delay=0)
+    assert appraised == cells and remaining == []
+    assert selected == STACKS
+    assert stacks.used == {STACKS[0]: 2, STACKS[1]: 1}
+    assert len(engine.clicker.backend.clicks()) == 3
+
+
+def test_does_not_pick_up_stack_without_cells(board):
+    engine, profile, stacks = setup(board, [stack_frame(board, [None, 1])], [1, 1])
+    selected = []
+    appraised, remaining = appraise_cells(engine, profile, stacks, [(0, 0)], 0, selected.append,
+                                          settle_delay=0)
+    assert appraised == [(0, 0)] and remaining == []
+    # 첫 묶음이 비었지만 감정할 셀이 없으므로 다음 묶음을 들지 않음
+    assert selected == [STACKS[0]] and stacks.current == STACKS[1]
+
+
+def test_two_digit_stack_is_checked_per_chunk(board):
+    engine, profile, stacks = setup(board, [stack_frame(board, [20, None])], [20, None])
+    capture = engine.capture.get(engine.region)
+    cells = [(x, y) for y in range(2, 4) for x in range(10)]
+    appraised, _ = appraise_cells(engine, profile, stacks, cells, 0, lambda cell: None, settle_delay=0)
+    assert appraised == cells
+    # 9개씩 나눠 클릭하고 나눈 묶음마다 한 번만 다시 캡처 (20셀 → 9 + 9 + 2)
+    assert capture.index == 3
+
+
+def test_returns_cells_left_when_stacks_run_out(board):
+    engine, profile, stacks = setup(board, [stack_frame(board, [None, None])], [1, None])
+    cells = [(0, 0), (1, 0), (2, 0)]
+    appraised, remaining = appraise_cells(engine, profile, stacks, iter(cells), 0, lambda cell: None,
+                                          settle_delay=0)
+    # 다음 묶음은 들어서 한 번 사용해 본 뒤에야 빈 것을 확인함
+    assert appraised == [(0, 0), (1, 0)]
+    assert remaining == [(2, 0)]
+    assert stacks.current is None
+
+
+def test_single_digit_count_is_learned_then_read_once(board):
+    reader = StackCountReader()
+    frames = [stack_frame(board, [2, None]), stack_frame(board, [1, None]), stack_frame(board, [None, None])]
+    engine, profile, stacks = setup(board, frames, [3, None], reader)
+    capture = engine.capture.get(engine.region)
+    cells = [(0, 0), (1, 0), (2, 0)]
+    appraised, _ = appraise_cells(engine, profile, stacks, cells, 0, lambda cell: None, settle_delay=0)
+    assert appraised == cells
+    # 글자를 모르는 동안은 한 번 클릭할 때마다 확인하고, 묶음이 비면 본 글자(3, 2, 1)를 배움
+    assert capture.index == 3
+    assert sorted(reader.templates) == [1, 2, 3]
+
+    # 다음 실행: 묶음을 들 때 읽은 수량만큼 다시 캡처하지 않고 클릭한 뒤 한 번만 확인
+    engine, profile, stacks = setup(board, [stack_frame(board, [None, None])], [3, None], reader)
+    capture = engine.capture.get(engine.region)
+    assert stacks.remaining == 3
+    appraised, _ = appraise_cells(engine, profile, stacks, cells, 0, lambda cell: None, settle_delay=0)
+    assert appraised == cells and capture.index == 1
+    assert stacks.used == {STACKS[0]: 3, STACKS[1]: 0}
+
+
+def test_reader_ignores_unknown_glyphs(board):
+    reader = StackCountReader()
+    glyph = np.ones((9, 8), bool)
+    reader.learn([(glyph, 0)], 4)
+    assert reader.read(glyph) == 4
+    assert reader.read(np.ones((9, 16), bool)) is None
+    other = glyph.copy()
+    other[4] = False
+    assert reader.read(other) is None
+    # 같은 모양을 다른 수량으로 다시 배우면 이전 견본을 버림
+    reader.learn([(glyph, 1)], 4)
+    assert reader.read(glyph) == 3
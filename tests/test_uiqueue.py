@@ -0,0 +1,86 @@
+import threading
+
+from poe_macro import UiUpdateQueue
+
+
+class FakeLoop:
+    """Tk root.after/after_cancel 대용 (예약한 콜백을 직접 실행)"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.cancelled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+        return f"after#{len(self.scheduled)}"
+
+    def after_cancel(self, timer):
+        self.cancelled.append(timer)
+
+    def tick(self):
+        _, callback = self.scheduled.pop(0)
+        callback()
+
+
+def test_post_does_not_touch_ui_loop():
+    loop = FakeLoop()
+    updates = UiUpdateQueue()
+    updates.start(loop.after, loop.after_cancel)
+    assert len(loop.scheduled) == 1
+
+    def post_from_worker():
+        for _ in range(100):
+            updates.post(lambda: None)
+
+    worker = threading.Thread(target=post_from_worker)
+    worker.start()
+    worker.join()
+    # 작업 스레드의 post()는 예약을 만들지 않음 (UI 스레드의 주기 처리만 예약)
+    assert len(loop.scheduled) == 1
+    loop.tick()
+    assert len(loop.scheduled) == 1 and loop.scheduled[0][0] == 16
+
+
+def test_keyed_updates_are_merged():
+    loop = FakeLoop()
+    updates = UiUpdateQueue()
+    updates.start(loop.after, loop.after_cancel)
+    seen = []
+    updates.post(lambda: seen.append('status 1'), key='status')
+    updates.post(lambda: seen.append('click'))
+    updates.post(lambda: seen.append('status 2'), key='status')
+    loop.tick()
+    assert seen == ['click', 'status 2']
+    assert updates.drain() == 0
+
+
+def test_posts_before_start_run_on_first_tick():
+    loop = FakeLoop()
+    updates = UiUpdateQueue()
+    seen = []
+    updates.post(lambda: seen.append(1))
+    updates.start(loop.after, loop.after_cancel)
+    assert seen == [1]
+
+
+def test_failing_action_does_not_block_others():
+    updates = UiUpdateQueue()
+    seen = []
+    updates.post(lambda: 1 / 0)
+    updates.post(lambda: seen.append(2))
+    assert updates.drain() == 2
+    assert seen == [2]
+
+
+def test_stop_cancels_pending_tick():
+    loop = FakeLoop()
+    updates = UiUpdateQueue()
+    updates.start(loop.after, loop.after_cancel)
+    seen = []
+    updates.post(lambda: seen.append(1))
+    updates.stop()
+    assert loop.cancelled == ['after#1']
+    assert updates.drain() == 0 and seen == []
+    # 취소되지 못하고 실행된 처리도 다시 예약하지 않음
+    loop.tick()
+    assert loop.scheduled == []